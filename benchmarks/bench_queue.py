@@ -0,0 +1,90 @@
+"""
+Fill and drain a queue of N items, for the old list-backed Queue and the deque-backed
+dom.my_queue.Queue / BlockingQueue.
+
+The list version pops from the front (list.pop(0)), so a drain is quadratic; above
+--list-limit items it is skipped rather than left running for minutes.
+
+    python -m benchmarks.bench_queue --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import threading
+import time
+
+from dom.my_queue import BlockingQueue, Queue
+
+
+class ListQueue:
+    """dom.my_queue.Queue as it was: a plain list, dequeued from the front."""
+
+    def __init__(self):
+        self.items = []
+
+    def enqueue(self, item):
+        self.items.append(item)
+
+    def dequeue(self):
+        if len(self.items) == 0:
+            return None
+        return self.items.pop(0)
+
+
+def fill_and_drain(queue, items: int) -> float:
+    started = time.perf_counter()
+    for i in range(items):
+        queue.enqueue(i)
+    for _ in range(items):
+        queue.dequeue()
+    return time.perf_counter() - started
+
+
+def blocking_fill_and_drain(items: int) -> float:
+    queue = BlockingQueue()
+    started = time.perf_counter()
+    for i in range(items):
+        queue.put(i)
+    for _ in range(items):
+        queue.get()
+    return time.perf_counter() - started
+
+
+def producer_consumer(items: int, maxsize: int) -> float:
+    """One producer thread, one consumer (this thread), bounded queue."""
+    queue = BlockingQueue(maxsize)
+
+    def produce():
+        for i in range(items):
+            queue.put(i)
+        queue.close()
+
+    producer = threading.Thread(target=produce)
+    started = time.perf_counter()
+    producer.start()
+    for _ in queue:
+        pass
+    producer.join()
+    return time.perf_counter() - started
+
+
+def run(sizes, list_limit: int, maxsize: int) -> None:
+    print(f"{'items':>10} {'list Queue':>12} {'deque Queue':>12} {'Blocking':>12} {f'threads, max {maxsize}':>20}")
+    for items in sizes:
+        list_time = f"{fill_and_drain(ListQueue(), items):.4f}s" if items <= list_limit else "skipped"
+        print(
+            f"{items:>10} {list_time:>12} {fill_and_drain(Queue(), items):>11.4f}s "
+            f"{blocking_fill_and_drain(items):>11.4f}s {producer_consumer(items, maxsize):>19.4f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument("--list-limit", type=int, default=10 ** 5, help="largest size run against the list queue")
+    parser.add_argument("--maxsize", type=int, default=1024, help="bound of the producer/consumer queue")
+    args = parser.parse_args()
+    run(args.sizes, args.list_limit, args.maxsize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Build the gaokao main page tree N times against an in-memory page.
+
+The page is a SnapshotElement tree shaped like the live main page (31 exam
+variants, a few subjects each) and the stub finder memoizes every lookup after
+the warm-up build, so the timing is the tree builder's own cost: node
+construction, selector building, landmark caching and condition handling.
+
+    python -m benchmarks.bench_tree_build --iterations 1000 --subjects 12
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from dom_processing.dom_tree_builder.caching.cache import HandleCaching
+from dom_processing.dom_tree_builder.caching.coordinators import CachingCoordinator
+from dom_processing.dom_tree_builder.caching.finders import SeleniumElementFinder
+from dom_processing.dom_tree_builder.caching.selectors import SelectorBuilder
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement
+from dom_processing.dom_tree_builder.tree_building.tree_building_entry_point import BuildTree
+from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry
+from dom_processing.schema_compiler import compile_schema
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_DIR = PROJECT_ROOT / "json_schemas" / "main_page_schemas"
+
+
+def el(tag, attrs=None, children=None, text="", **properties):
+    return {"tag": tag, "attrs": attrs or {}, "text": text, "properties": properties, "children": children or []}
+
+
+def subject_li(variant, subject):
+    base = f"https://gaokao.eol.cn/{variant}/{subject}"
+    return el("li", children=[
+        el("div", {"class": "word-xueke"}, [
+            el("div", {"class": "xueke-a"}, [
+                el("a", {"href": f"{subject}_exam.shtml"}, text="真题", href=f"{base}_exam.shtml"),
+                el("a", {"href": f"{subject}_answer.shtml"}, text="答案", href=f"{base}_answer.shtml"),
+            ]),
+        ]),
+    ])
+
+
+def main_page(subjects: int) -> dict:
+    def exam_variant(index):
+        return el("div", {"class": "test", "id": f"st{index}"}, [
+            el("div", {"class": "sline"}, [
+                el("div", {"class": "gkzt-xueke mtT_30 clearfix"},
+                   [subject_li(index, f"subject{s}") for s in range(subjects)]),
+            ]),
+        ])
+
+    indices = [i for i in range(1, 34) if i not in (2, 4)]
+    return el("div", {"class": "center point-center"}, [
+        el("div", {"class": "sline"}, [exam_variant(i) for i in indices if i <= 8]),
+        *[exam_variant(i) for i in indices if i > 8],
+    ])
+
+
+class StubFinder(SeleniumElementFinder):
+    """Looks each (parent, by, selector) up in the snapshot once, then answers from memory."""
+
+    def __init__(self):
+        self._single = {}
+        self._multiple = {}
+
+    def find_single(self, parent, by_suffix, selector):
+        key = (id(parent), by_suffix, selector)
+        if key not in self._single:
+            self._single[key] = super().find_single(parent, by_suffix, selector)
+        return self._single[key]
+
+    def find_multiple(self, parent, by_suffix, selector):
+        key = (id(parent), by_suffix, selector)
+        if key not in self._multiple:
+            self._multiple[key] = super().find_multiple(parent, by_suffix, selector)
+        return self._multiple[key]
+
+
+def build_once(builder, finder, root_element, schema_queries, config_queries, template_registry):
+    """BuildTree.build with the finder swapped for the stub."""
+    coordinator = CachingCoordinator(
+        HandleCaching(finder), SelectorBuilder(template_registry, config_queries), schema_queries
+    )
+    coordinator.initialize_with_root(root_element)
+    return builder.build_tree(
+        builder.decide_strategy(schema_queries), schema_queries, config_queries, template_registry, coordinator
+    )
+
+
+def load(name: str) -> dict:
+    with open(SCHEMA_DIR / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def count_nodes(node) -> int:
+    total, stack = 0, [node]
+    while stack:
+        current = stack.pop()
+        total += 1
+        stack.extend(current.children)
+    return total
+
+
+def run(iterations: int, subjects: int) -> None:
+    schema_queries = SchemaQueries(load("gaokao_main_page.json"))
+    config_queries = ConfigQueries(load("templates_config.json"))
+    template_registry = TemplateRegistry(load("templates.json"))
+    schema_queries.attach_compiled(compile_schema(schema_queries, template_registry))  # as QueryServices does
+
+    root_element = SnapshotElement.from_dict(main_page(subjects))
+    builder = BuildTree()
+    finder = StubFinder()
+    args = (builder, finder, root_element, schema_queries, config_queries, template_registry)
+
+    nodes = count_nodes(build_once(*args))  # warm-up fills the finder memo
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build_once(*args)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{iterations} builds, {nodes} nodes each: {elapsed:.2f}s total, "
+        f"{elapsed / iterations * 1000:.2f} ms/build, {nodes * iterations / elapsed:,.0f} nodes/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--subjects", type=int, default=12, help="subjects per exam variant")
+    args = parser.parse_args()
+    run(args.iterations, args.subjects)
+
+
+if __name__ == "__main__":
+    main()
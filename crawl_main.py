@@ -0,0 +1,62 @@
+import os
+
+from dotenv import load_dotenv
+from dom_processing.instrumentation import configure_logging
+from dom_processing.instance_tracker import Tracker
+from dom_processing.my_scraper.crawl_manager import CrawlJob, CrawlLedger, CrawlManager, load_links
+from dom_processing.my_scraper.scraper_orchestrator.factory_functions import FactoryFunctions
+from dom_processing.my_scraper.scraper_orchestrator.scraper_orchestrator import ScraperOrchestrator
+from db.backend import create_database_client, create_database_repository
+
+
+def main():
+    load_dotenv()
+    configure_logging()
+
+    supabase = create_database_client()
+    db_repository = create_database_repository(supabase)
+    instance_tracker = Tracker(supabase)
+    if os.getenv("TRACKER_PRELOAD", "").lower() in ("1", "true", "yes"):
+        preload_years = [int(year) for year in os.getenv("TRACKER_PRELOAD_YEARS", "").split(",") if year.strip()]
+        instance_tracker.preload(preload_years or None)
+
+    # one pool for all parallel jobs, so CRAWL_WORKERS doesn't multiply the browsers
+    workers = int(os.getenv("SCRAPER_WORKERS", "1"))
+    driver_pool = FactoryFunctions.create_driver_pool(max_size=int(os.getenv("DRIVER_POOL_SIZE", str(workers))))
+
+    def run_job(job: CrawlJob):
+        orchestrator = ScraperOrchestrator(
+            main_scraper_config_path="dom_processing/config/main_scraper_config.json",
+            document_scraper_config_path="dom_processing/config/document_scraper_config.json",
+            fallback_document_scraper_config_path="dom_processing/config/fallback_document_scraper_config.json",
+            database_repository=db_repository,
+            instance_tracker=instance_tracker,
+            workers=workers,
+            main_page_url=job.url,
+            driver_pool=driver_pool,
+        )
+        # both raise when no branch or subject was scraped; CrawlManager then marks the job failed
+        if os.getenv("SCRAPER_PIPELINE", "").lower() == "async":
+            orchestrator.run_pipeline()
+        else:
+            orchestrator.run()
+
+    ledger = CrawlLedger(os.getenv("CRAWL_LEDGER_PATH", "crawl_ledger.sqlite"))
+    try:
+        manager = CrawlManager(
+            ledger,
+            run_job,
+            workers=int(os.getenv("CRAWL_WORKERS", "1")),
+            max_attempts=int(os.getenv("CRAWL_MAX_ATTEMPTS", "3")),
+        )
+        manager.run(load_links(os.getenv("CRAWL_LINKS_PATH", "gaokao_links.json")))
+    except Exception as e:
+        print(f"Fatal error in crawl: {type(e).__name__}: {e}")
+        raise
+    finally:
+        ledger.close()
+        driver_pool.close()
+
+
+if __name__ == "__main__":
+    main()
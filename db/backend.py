@@ -0,0 +1,56 @@
+"""
+Database setup shared by the entry points, from environment variables.
+
+Call these after load_dotenv(), so the values from .env apply.
+"""
+
+import os
+from typing import Union
+
+from supabase import Client, create_client
+from db.batching_repo import BatchingRepository
+from db.database_repo import DatabaseRepository
+from db.local_client import LocalSupabaseClient
+
+
+def upsert_enabled() -> bool:
+    """DB_UPSERT: write with upserts on the unique keys instead of plain inserts."""
+    return os.getenv("DB_UPSERT", "").lower() in ("1", "true", "yes")
+
+
+def create_remote_client() -> Client:
+    """Supabase client from SUPABASE_URL / SUPABASE_KEY."""
+    # Get Supabase credentials from environment
+    SUPABASE_URL = os.getenv("SUPABASE_URL")
+    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+    # Validate credentials exist
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+def create_local_client() -> LocalSupabaseClient:
+    return LocalSupabaseClient(os.getenv("LOCAL_DB_PATH", "local_db.sqlite"))
+
+
+def create_database_client() -> Union[Client, LocalSupabaseClient]:
+    """DB_BACKEND=local: SQLite stand-in, pushed to Supabase later with sync_main.py; otherwise Supabase."""
+    if os.getenv("DB_BACKEND", "supabase").lower() == "local":
+        return create_local_client()
+    return create_remote_client()
+
+
+def create_database_repository(client) -> Union[BatchingRepository, DatabaseRepository]:
+    """BatchingRepository when DB_BATCH_SIZE > 0, else a DatabaseRepository writing each record."""
+    batch_size = int(os.getenv("DB_BATCH_SIZE", "0"))
+    if batch_size > 0:
+        return BatchingRepository(
+            client,
+            max_batch=batch_size,
+            max_age=float(os.getenv("DB_BATCH_MAX_AGE", "5")),
+            upsert=upsert_enabled(),
+            max_attempts=int(os.getenv("DB_BATCH_MAX_ATTEMPTS", "3")),
+        )
+    return DatabaseRepository(client)
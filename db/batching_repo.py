@@ -0,0 +1,338 @@
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from supabase import Client
+from db.database_models import ExamRecord, SolutionRecord
+from dom_processing.instrumentation import span
+
+
+@dataclass
+class PendingSubject:
+    """Records of one subject waiting for the next flush."""
+    exam_records: List[ExamRecord]
+    solution_record: Optional[SolutionRecord] = None
+    exam_id: Optional[int] = None  # already stored exam the solution belongs to
+    exam_url: Optional[str] = None  # or: entry page of an exam this repository buffered
+    on_flushed: Optional[Callable[[List[int], Optional[int]], None]] = None
+    exam_ids: List[int] = field(default_factory=list)
+    solution_id: Optional[int] = None
+    attempts: int = 0  # failed flushes this subject was part of
+
+
+class BatchingRepository:
+    """
+    Buffers exam/solution records and writes them in bulk.
+
+    A flush costs three requests whatever the batch size: one bulk insert of the
+    exams, one of the solutions (exam_id resolved from the first response) and one
+    bulk upsert on exam_id linking the exams to their solutions.
+
+    Subjects are flushed when the batch is full or, from a background timer, when
+    the oldest one has waited max_age seconds.
+
+    In upsert mode a failed flush is retried by the next one, resuming after the
+    last step that went through (the ids each step gets back are kept on the
+    buffered subjects); after max_attempts failures a subject is moved to
+    dead_letters. In insert mode a failed write may still have stored rows, so the
+    batch is moved to dead_letters straight away rather than inserted twice.
+    """
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        max_batch: int = 50,
+        max_age: float = 5.0,
+        upsert: bool = False,
+        exam_conflict_columns: str = "entry_page_url,exam_variant",
+        solution_conflict_columns: str = "entry_page_url",
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Input:
+            - supabase_client: Supabase client
+            - max_batch: flush once this many exam + solution records are buffered
+            - max_age: flush once the oldest buffered subject is this many seconds old
+            - upsert: upsert on the conflict columns instead of inserting, so rows
+              already in the table are updated (needs matching unique constraints)
+            - max_attempts: failed flushes a subject survives in upsert mode
+            - clock: time source for max_age (injected for testing)
+        """
+        if not isinstance(max_batch, int) or max_batch < 1:
+            raise ValueError(f"max_batch must be a positive integer, got {max_batch}")
+        if max_age <= 0:
+            raise ValueError(f"max_age must be positive, got {max_age}")
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError(f"max_attempts must be a positive integer, got {max_attempts}")
+
+        self.supabase = supabase_client
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.upsert = upsert
+        self.exam_conflict_columns = exam_conflict_columns
+        self.solution_conflict_columns = solution_conflict_columns
+        self.max_attempts = max_attempts
+        self.dead_letters: List[PendingSubject] = []  # subjects given up on, for inspection
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._pending: List[PendingSubject] = []
+        self._oldest: Optional[float] = None
+        self._exam_ids_by_url: Dict[str, int] = {}  # exam entry_page_url -> exam_id stored by a flush
+        self._closed = threading.Event()
+        self._timer: Optional[threading.Thread] = None  # started by the first add_subject
+
+    # ==================== PUBLIC API ====================
+
+    def add_subject(
+        self,
+        exam_records: List[ExamRecord],
+        solution_record: Optional[SolutionRecord] = None,
+        exam_id: Optional[int] = None,
+        on_flushed: Optional[Callable[[List[int], Optional[int]], None]] = None,
+        exam_url: Optional[str] = None,
+    ) -> None:
+        """
+        Buffer one subject; flushes when the batch is full or too old.
+
+        A failure of that flush is logged, not raised: it concerns the whole batch,
+        not this subject, and the records stay buffered or are dead-lettered.
+
+        Input:
+            - exam_records: new exam rows (one per variant), may be empty
+            - solution_record: new solution row, linked to the subject's exams
+            - exam_id: existing exam to link the solution to when exam_records is empty
+            - on_flushed: called with (exam_ids, solution_id) once the rows are stored
+            - exam_url: instead of exam_id, the entry page of an exam handed to this
+              repository earlier (see has_exam), resolved when the batch is written
+        """
+        if not exam_records and solution_record is None:
+            return
+        if solution_record is not None and not exam_records and exam_id is None and exam_url is None:
+            raise ValueError("solution_record needs exam_records, an existing exam_id or a buffered exam_url")
+
+        with self._lock:
+            if exam_url is not None and exam_id is None and not self._has_exam_locked(exam_url):
+                raise ValueError(f"No exam buffered or stored for '{exam_url}'")
+            self._pending.append(PendingSubject(
+                list(exam_records), solution_record, exam_id=exam_id, exam_url=exam_url, on_flushed=on_flushed
+            ))
+            if self._oldest is None:
+                self._oldest = self._clock()
+            if self._timer is None:
+                self._start_timer()
+            if not self._should_flush():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: {e}")
+
+    def flush(self) -> int:
+        """
+        Write every buffered subject.
+
+        Returns:
+            int: number of subjects written
+
+        Raises:
+            RuntimeError: if the batch could not be written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+
+            try:
+                with span("db_flush"):
+                    self._write_exams(batch)
+                    self._write_solutions(batch)
+                    self._link_solutions(batch)
+            except Exception as e:
+                dropped = self._give_up_on(batch, e)
+                raise RuntimeError(
+                    f"Failed to flush {len(batch)} subject(s) to database "
+                    f"({len(dropped)} dead-lettered): {type(e).__name__}: {e}"
+                )
+
+            self._pending = []
+            self._oldest = None
+
+        for subject in batch:
+            if subject.on_flushed:
+                try:
+                    subject.on_flushed(subject.exam_ids, subject.solution_id)
+                except Exception as e:
+                    print(f"Warning: Flush callback failed: {type(e).__name__}: {e}")
+        return len(batch)
+
+    def has_exam(self, url: str) -> bool:
+        """Whether an exam with this entry page is buffered, or was stored by a flush."""
+        with self._lock:
+            return self._has_exam_locked(url)
+
+    def pending_records(self) -> int:
+        with self._lock:
+            return self._pending_records_locked()
+
+    def close(self) -> None:
+        """Stop the flush timer and write what is still buffered."""
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+
+    # ==================== INTERNALS ====================
+
+    def _should_flush(self) -> bool:
+        if self._pending_records_locked() >= self.max_batch:
+            return True
+        return self._oldest is not None and self._clock() - self._oldest >= self.max_age
+
+    def _start_timer(self) -> None:
+        self._timer = threading.Thread(target=self._flush_when_due, name="batch-flush-timer", daemon=True)
+        self._timer.start()
+
+    def _flush_when_due(self) -> None:
+        """Timer thread: flush batches that reached max_age while no subject was added."""
+        while not self._closed.wait(self.max_age / 2):
+            with self._lock:
+                due = bool(self._pending) and self._should_flush()
+            if not due:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                # subjects not dead-lettered are retried on the next tick
+                print(f"Warning: Timed flush failed: {e}")
+
+    def _give_up_on(self, batch: List[PendingSubject], error: Exception) -> List[PendingSubject]:
+        """Count the failed attempt; move the subjects that won't be retried to dead_letters."""
+        for subject in batch:
+            subject.attempts += 1
+        if self.upsert:
+            dropped = [subject for subject in batch if subject.attempts >= self.max_attempts]
+        else:
+            dropped = list(batch)  # rows of the failed insert may be stored: never insert them again
+        if not dropped:
+            return dropped
+
+        dropped_ids = {id(subject) for subject in dropped}
+        self._pending = [subject for subject in self._pending if id(subject) not in dropped_ids]
+        self._oldest = self._clock() if self._pending else None
+        self.dead_letters.extend(dropped)
+        urls = [record.entry_page_url for subject in dropped for record in subject.exam_records]
+        urls += [subject.solution_record.entry_page_url for subject in dropped if subject.solution_record]
+        print(
+            f"Error: Dead-lettered {len(dropped)} subject(s) after a failed flush "
+            f"({type(error).__name__}: {error}): {urls}"
+        )
+
+        # rows stored before the failing step are real: report them like a flush would
+        for subject in dropped:
+            if subject.on_flushed and (subject.exam_ids or subject.solution_id is not None):
+                try:
+                    subject.on_flushed(subject.exam_ids, subject.solution_id)
+                except Exception as e:
+                    print(f"Warning: Flush callback failed: {type(e).__name__}: {e}")
+        return dropped
+
+    def _has_exam_locked(self, url: str) -> bool:
+        if url in self._exam_ids_by_url:
+            return True
+        return any(record.entry_page_url == url for s in self._pending for record in s.exam_records)
+
+    def _pending_records_locked(self) -> int:
+        return sum(len(s.exam_records) + (s.solution_record is not None) for s in self._pending)
+
+    def _write_exams(self, batch: List[PendingSubject]) -> None:
+        # exams stored by an earlier, failed flush already have their ids
+        unwritten = [subject for subject in batch if subject.exam_records and not subject.exam_ids]
+        rows = []
+        for subject in unwritten:
+            rows.extend(self._exam_row(record) for record in subject.exam_records)
+        if not rows:
+            return
+
+        stored = self._write("exams", rows, self.exam_conflict_columns)
+        ids = {(row.get("entry_page_url"), row.get("exam_variant")): row["exam_id"] for row in stored}
+        for subject in unwritten:
+            subject.exam_ids = [ids[(r.entry_page_url, r.exam_variant)] for r in subject.exam_records]
+            for record, exam_id in zip(subject.exam_records, subject.exam_ids):
+                self._exam_ids_by_url[record.entry_page_url] = exam_id
+
+    def _write_solutions(self, batch: List[PendingSubject]) -> None:
+        unwritten = [
+            subject for subject in batch
+            if subject.solution_record is not None and subject.solution_id is None
+        ]
+        rows = []
+        for subject in unwritten:
+            if subject.exam_id is None and subject.exam_url is not None:
+                # exam written by this flush or an earlier one
+                subject.exam_id = self._exam_ids_by_url[subject.exam_url]
+            row = self._solution_row(subject.solution_record)
+            # same rule as DatabaseRepository: the solution points at the last exam stored
+            row["exam_id"] = subject.exam_ids[-1] if subject.exam_ids else subject.exam_id
+            rows.append(row)
+        if not rows:
+            return
+
+        stored = self._write("solutions", rows, self.solution_conflict_columns)
+        ids = {row.get("entry_page_url"): row["solution_id"] for row in stored}
+        for subject in unwritten:
+            subject.solution_id = ids[subject.solution_record.entry_page_url]
+
+    def _link_solutions(self, batch: List[PendingSubject]) -> None:
+        """One upsert on exam_id sets solution_id / solution_exists on every linked exam."""
+        rows, existing_links = [], []
+        for subject in batch:
+            if subject.solution_id is None:
+                continue
+            if not subject.exam_records:
+                existing_links.append((subject.exam_id, subject.solution_id))
+                continue
+            for record, exam_id in zip(subject.exam_records, subject.exam_ids):
+                # full rows, so the upsert never trips NOT NULL columns
+                row = self._exam_row(record)
+                row.update(exam_id=exam_id, solution_id=subject.solution_id, solution_exists=True)
+                rows.append(row)
+
+        if rows:
+            self.supabase.table("exams").upsert(rows, on_conflict="exam_id").execute()
+        for exam_id, solution_id in existing_links:
+            # exam stored in an earlier run: only the link columns are known here
+            self.supabase.table("exams").update({
+                "solution_id": solution_id,
+                "solution_exists": True
+            }).eq("exam_id", exam_id).execute()
+
+    def _write(self, table: str, rows: List[dict], conflict_columns: str) -> List[dict]:
+        query = self.supabase.table(table)
+        if self.upsert:
+            response = query.upsert(rows, on_conflict=conflict_columns).execute()
+        else:
+            response = query.insert(rows).execute()
+        if not response.data or len(response.data) != len(rows):
+            raise RuntimeError(
+                f"Bulk write to '{table}' returned {len(response.data or [])} rows for {len(rows)} records"
+            )
+        return response.data
+
+    @staticmethod
+    def _exam_row(exam_record: ExamRecord) -> dict:
+        return BatchingRepository._serialise(asdict(exam_record), {"exam_id"})
+
+    @staticmethod
+    def _solution_row(solution_record: SolutionRecord) -> dict:
+        return BatchingRepository._serialise(asdict(solution_record), {"solution_id", "exam_id"})
+
+    @staticmethod
+    def _serialise(record: dict, excluded: set) -> dict:
+        row = {k: v for k, v in record.items() if v is not None and k not in excluded}
+        for key, value in row.items():
+            if isinstance(value, datetime):
+                row[key] = value.isoformat()
+        return row
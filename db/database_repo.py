@@ -2,6 +2,7 @@ from datetime import datetime
 from supabase import Client
 from db.database_models import ExamRecord, SolutionRecord
 from dataclasses import asdict
+from dom_processing.instrumentation import span
 
 
 class DatabaseRepository:
@@ -19,7 +20,8 @@ class DatabaseRepository:
                 if isinstance(value, datetime):
                     exam_dict[key] = value.isoformat()
                 
-            response = self.supabase.table("exams").insert(exam_dict).execute()
+            with span("db_insert", table="exams"):
+                response = self.supabase.table("exams").insert(exam_dict).execute()
             exam_id = response.data[0]["exam_id"]
             return exam_id
             
@@ -37,7 +39,8 @@ class DatabaseRepository:
                 if isinstance(value, datetime):
                     solution_dict[key] = value.isoformat()
             
-            response = self.supabase.table("solutions").insert(solution_dict).execute()
+            with span("db_insert", table="solutions"):
+                response = self.supabase.table("solutions").insert(solution_dict).execute()
             solution_id = response.data[0]["solution_id"]
             
             # Update exam with solution_id
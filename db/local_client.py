@@ -0,0 +1,468 @@
+"""
+SQLite stand-in for the subset of supabase.Client the scraper uses.
+
+LocalSupabaseClient.table(name) supports select/eq/in_/order/range/limit and
+insert/upsert/update followed by execute(), returning an object with .data like
+the real client. Every write is also appended to a spool table so the rows can be
+pushed to Supabase later with sync_to(); local ids are translated to the ids the
+remote database hands out, and sync progress is stored, so an interrupted sync
+picks up where it stopped.
+"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, get_args
+
+from db.database_models import ExamRecord, SolutionRecord
+
+
+# table -> (record dataclass, id column)
+TABLES = {
+    "exams": (ExamRecord, "exam_id"),
+    "solutions": (SolutionRecord, "solution_id"),
+}
+# foreign key columns: (table, column) -> referenced table
+REFERENCES = {
+    ("exams", "solution_id"): "solutions",
+    ("solutions", "exam_id"): "exams",
+}
+# unique business keys: sync_to(upsert=True) pushes inserts as upserts on these
+NATURAL_KEYS = {"exams": "entry_page_url,exam_variant", "solutions": "entry_page_url"}
+INDEXED_COLUMNS = {"exams": ("entry_page_url", "year"), "solutions": ("entry_page_url", "exam_id")}
+
+
+class LocalResponse:
+    """Mimics postgrest's APIResponse: rows are in .data."""
+
+    def __init__(self, data: List[dict]):
+        self.data = data
+        self.count = len(data)
+
+
+def _column_kind(annotation) -> str:
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    base = args[0] if args else annotation
+    if getattr(base, "__origin__", None) is list or base is list:
+        return "json"
+    if base is bool:
+        return "bool"
+    if base is int:
+        return "int"
+    return "text"
+
+
+class LocalSupabaseClient:
+    """Drop-in for supabase.Client backed by one SQLite file."""
+
+    def __init__(self, path: str):
+        """
+        Input:
+            - path: SQLite file (":memory:" for tests)
+        """
+        if not path:
+            raise ValueError("path cannot be empty")
+
+        self.path = path
+        self._lock = threading.RLock()
+        self.columns: Dict[str, Dict[str, str]] = {
+            table: {f.name: _column_kind(f.type) for f in fields(record)}
+            for table, (record, _) in TABLES.items()
+        }
+
+        try:
+            # scraper threads share one connection, serialised by self._lock
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._create_schema()
+        except Exception as e:
+            raise RuntimeError(f"Failed to open local database at '{path}': {type(e).__name__}: {e}")
+
+    def table(self, name: str) -> "LocalQuery":
+        if name not in TABLES:
+            raise RuntimeError(f"Unknown table '{name}' (local backend supports {sorted(TABLES)})")
+        return LocalQuery(self, name)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ==================== SPOOL SYNC ====================
+
+    def pending_sync(self) -> int:
+        """Number of spooled writes not yet pushed to the remote database."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM _spool WHERE synced = 0").fetchone()[0]
+
+    def sync_to(self, remote, batch_size: int = 500, upsert: bool = False) -> int:
+        """
+        Replay spooled writes on remote (a supabase.Client), oldest first.
+
+        Consecutive inserts/upserts into the same table go out as one bulk request
+        of up to batch_size rows. The remote ids and the synced flags of a request
+        are committed in one transaction, so only a crash between the remote write
+        and that commit replays the request.
+
+        Input:
+            - upsert: push inserts as upserts on NATURAL_KEYS so even that replay
+              does not duplicate rows (needs matching unique constraints remotely)
+
+        Returns:
+            int: number of spooled writes pushed
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+
+        pushed = 0
+        while True:
+            group = self._next_sync_group(batch_size)
+            if not group:
+                return pushed
+            try:
+                self._push_group(remote, group, upsert)
+            except Exception as e:
+                raise RuntimeError(
+                    f"Sync stopped at spool entry {group[0][0]} ({pushed} pushed): {type(e).__name__}: {e}"
+                )
+            pushed += len(group)
+
+    def _next_sync_group(self, batch_size: int) -> List[Tuple[int, str, str, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, table_name, op, payload FROM _spool WHERE synced = 0 ORDER BY seq LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+
+        group = []
+        for seq, table, op, payload in rows:
+            entry = (seq, table, op, json.loads(payload))
+            if not group:
+                group.append(entry)
+                if op == "update":
+                    break
+                continue
+            first = group[0]
+            if op != first[2] or table != first[1] or entry[3].get("on_conflict") != first[3].get("on_conflict"):
+                break
+            group.append(entry)
+        return group
+
+    def _push_group(self, remote, group, upsert: bool = False) -> None:
+        _, table, op, first_payload = group[0]
+        id_column = TABLES[table][1]
+
+        if op == "update":
+            values = self._to_remote_refs(table, first_payload["values"])
+            query = remote.table(table).update(values)
+            for column, operator, value in first_payload["filters"]:
+                if column == id_column:
+                    value = self._to_remote_id(table, value)
+                elif (table, column) in REFERENCES:
+                    value = self._to_remote_id(REFERENCES[(table, column)], value)
+                query = query.in_(column, value) if operator == "in" else query.eq(column, value)
+            query.execute()
+            self._mark_synced(group, [])
+            return
+
+        # upserts keyed on the id column update rows the remote already has
+        keyed_on_id = op == "upsert" and id_column in first_payload["on_conflict"].split(",")
+        local_ids, rows = [], []
+        for _, _, _, payload in group:
+            row = dict(payload["row"])
+            local_ids.append(row.pop(id_column))
+            if keyed_on_id:
+                row[id_column] = self._to_remote_id(table, local_ids[-1])
+            rows.append(self._to_remote_refs(table, row))
+
+        query = remote.table(table)
+        if op == "upsert":
+            response = query.upsert(rows, on_conflict=first_payload["on_conflict"]).execute()
+        elif upsert:
+            response = query.upsert(rows, on_conflict=NATURAL_KEYS[table]).execute()
+        else:
+            response = query.insert(rows).execute()
+
+        remote_rows = response.data or []
+        if len(remote_rows) != len(rows):
+            raise RuntimeError(f"Remote returned {len(remote_rows)} rows for {len(rows)} {table} records")
+        self._mark_synced(
+            group,
+            [(table, local_id, remote_row[id_column]) for local_id, remote_row in zip(local_ids, remote_rows)],
+        )
+
+    def _mark_synced(self, group, id_rows: List[Tuple[str, Any, Any]]) -> None:
+        """Record the remote ids and flag the spool entries in one transaction."""
+        with self._lock:
+            with self._conn:  # commits both statements or neither
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO _id_map (table_name, local_id, remote_id) VALUES (?, ?, ?)", id_rows
+                )
+                self._conn.executemany("UPDATE _spool SET synced = 1 WHERE seq = ?", [(seq,) for seq, *_ in group])
+
+    def _to_remote_refs(self, table: str, row: dict) -> dict:
+        row = dict(row)
+        for column, value in list(row.items()):
+            referenced = REFERENCES.get((table, column))
+            if referenced and value is not None:
+                row[column] = self._to_remote_id(referenced, value)
+        return row
+
+    def _to_remote_id(self, table: str, local_id):
+        if isinstance(local_id, list):
+            return [self._to_remote_id(table, value) for value in local_id]
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT remote_id FROM _id_map WHERE table_name = ? AND local_id = ?", (table, local_id)
+            ).fetchone()
+        if found is None:
+            raise RuntimeError(f"{table} row {local_id} has not been synced yet")
+        return found[0]
+
+    # ==================== STORAGE ====================
+
+    def _create_schema(self) -> None:
+        statements = []
+        for table, (_, id_column) in TABLES.items():
+            columns = []
+            for name, kind in self.columns[table].items():
+                if name == id_column:
+                    columns.append(f"{name} INTEGER PRIMARY KEY AUTOINCREMENT")
+                else:
+                    columns.append(f"{name} {'INTEGER' if kind in ('int', 'bool') else 'TEXT'}")
+            statements.append(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)});")
+            for column in INDEXED_COLUMNS[table]:
+                statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column});")
+        statements.append(
+            """
+            CREATE TABLE IF NOT EXISTS _spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                op TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                synced INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_spool_synced ON _spool(synced, seq);
+            CREATE TABLE IF NOT EXISTS _id_map (
+                table_name TEXT NOT NULL,
+                local_id INTEGER NOT NULL,
+                remote_id INTEGER NOT NULL,
+                PRIMARY KEY (table_name, local_id)
+            );
+            """
+        )
+        self._conn.executescript("\n".join(statements))
+        self._conn.commit()
+
+    def _encode(self, table: str, row: dict) -> dict:
+        encoded = {}
+        for column, value in row.items():
+            kind = self.columns[table].get(column)
+            if kind is None:
+                raise RuntimeError(f"Unknown column '{column}' for table '{table}'")
+            if value is None:
+                encoded[column] = None
+            elif kind == "json":
+                encoded[column] = json.dumps(value, ensure_ascii=False)
+            elif kind == "bool":
+                encoded[column] = int(bool(value))
+            elif isinstance(value, datetime):
+                encoded[column] = value.isoformat()
+            else:
+                encoded[column] = value
+        return encoded
+
+    def _decode(self, table: str, row: sqlite3.Row) -> dict:
+        decoded = {}
+        for column in row.keys():
+            value = row[column]
+            kind = self.columns[table][column]
+            if value is not None and kind == "json":
+                value = json.loads(value)
+            elif value is not None and kind == "bool":
+                value = bool(value)
+            decoded[column] = value
+        return decoded
+
+    def _spool(self, table: str, op: str, payload: dict) -> None:
+        self._conn.execute(
+            "INSERT INTO _spool (table_name, op, payload) VALUES (?, ?, ?)",
+            (table, op, json.dumps(payload, ensure_ascii=False, default=str)),
+        )
+
+
+class LocalQuery:
+    """Builder returned by LocalSupabaseClient.table(); same chaining as postgrest."""
+
+    def __init__(self, client: LocalSupabaseClient, table: str):
+        self.client = client
+        self.table_name = table
+        self.id_column = TABLES[table][1]
+        self._op = "select"
+        self._columns = "*"
+        self._rows: List[dict] = []
+        self._values: Dict[str, Any] = {}
+        self._on_conflict: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # ---------- operations ----------
+
+    def select(self, columns: str = "*") -> "LocalQuery":
+        self._op, self._columns = "select", columns
+        return self
+
+    def insert(self, rows) -> "LocalQuery":
+        self._op, self._rows = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = "") -> "LocalQuery":
+        self._op, self._rows = "upsert", rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict or self.id_column
+        return self
+
+    def update(self, values: dict) -> "LocalQuery":
+        self._op, self._values = "update", dict(values)
+        return self
+
+    # ---------- filters / modifiers ----------
+
+    def eq(self, column: str, value) -> "LocalQuery":
+        self._filters.append((column, "=", value))
+        return self
+
+    def in_(self, column: str, values) -> "LocalQuery":
+        self._filters.append((column, "in", list(values)))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "LocalQuery":
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> "LocalQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    # ---------- execution ----------
+
+    def execute(self) -> LocalResponse:
+        client = self.client
+        try:
+            with client._lock:
+                if self._op == "select":
+                    return LocalResponse(self._select())
+                if self._op == "update":
+                    data = self._update()
+                else:
+                    data = [self._write_row(row) for row in self._rows]
+                client._conn.commit()
+                return LocalResponse(data)
+        except sqlite3.Error as e:
+            client._conn.rollback()
+            raise RuntimeError(f"Local {self._op} on '{self.table_name}' failed: {type(e).__name__}: {e}")
+
+    def _where(self) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, operator, value in self._filters:
+            self._check_column(column)
+            if operator == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                params.extend(self._encode_value(column, v) for v in value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(self._encode_value(column, value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _select(self) -> List[dict]:
+        if self._columns.strip() == "*":
+            columns = list(self.client.columns[self.table_name])
+        else:
+            columns = [c.strip() for c in self._columns.split(",") if c.strip()]
+        for column in columns:
+            self._check_column(column)
+
+        where, params = self._where()
+        sql = f"SELECT {', '.join(columns)} FROM {self.table_name}{where}"
+        if self._order:
+            for column, _ in self._order:
+                self._check_column(column)
+            sql += " ORDER BY " + ", ".join(f"{c} {'DESC' if d else 'ASC'}" for c, d in self._order)
+        if self._limit is not None or self._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [self._limit if self._limit is not None else -1, self._offset]
+
+        rows = self.client._conn.execute(sql, params).fetchall()
+        return [self.client._decode(self.table_name, row) for row in rows]
+
+    def _write_row(self, row: dict) -> dict:
+        client, table = self.client, self.table_name
+        encoded = client._encode(table, row)
+
+        existing_id = None
+        if self._op == "upsert":
+            conflict_columns = [c.strip() for c in self._on_conflict.split(",")]
+            where = " AND ".join(f"{c} IS ?" for c in conflict_columns)
+            found = client._conn.execute(
+                f"SELECT {self.id_column} FROM {table} WHERE {where}",
+                [encoded.get(c) for c in conflict_columns],
+            ).fetchone()
+            existing_id = found[0] if found else None
+
+        if existing_id is not None:
+            values = {k: v for k, v in encoded.items() if k != self.id_column}
+            if values:
+                client._conn.execute(
+                    f"UPDATE {table} SET {', '.join(f'{k} = ?' for k in values)} WHERE {self.id_column} = ?",
+                    [*values.values(), existing_id],
+                )
+            row_id = existing_id
+        else:
+            columns = list(encoded)
+            cursor = client._conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+                if columns else f"INSERT INTO {table} DEFAULT VALUES",
+                list(encoded.values()),
+            )
+            row_id = encoded.get(self.id_column) or cursor.lastrowid
+
+        stored = self._fetch_by_id(row_id)
+        spooled = {k: v for k, v in stored.items() if k in row or k == self.id_column}
+        client._spool(table, self._op, {"row": spooled, "on_conflict": self._on_conflict})
+        return stored
+
+    def _update(self) -> List[dict]:
+        client, table = self.client, self.table_name
+        encoded = client._encode(table, self._values)
+        where, params = self._where()
+
+        ids = [r[0] for r in client._conn.execute(f"SELECT {self.id_column} FROM {table}{where}", params).fetchall()]
+        if encoded and ids:
+            client._conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{k} = ?' for k in encoded)}{where}",
+                [*encoded.values(), *params],
+            )
+        client._spool(table, "update", {"values": self._values, "filters": self._filters})
+        return [self._fetch_by_id(row_id) for row_id in ids]
+
+    def _fetch_by_id(self, row_id) -> dict:
+        row = self.client._conn.execute(
+            f"SELECT * FROM {self.table_name} WHERE {self.id_column} = ?", (row_id,)
+        ).fetchone()
+        return self.client._decode(self.table_name, row)
+
+    def _check_column(self, column: str) -> None:
+        if column not in self.client.columns[self.table_name]:
+            raise RuntimeError(f"Unknown column '{column}' for table '{self.table_name}'")
+
+    def _encode_value(self, column: str, value):
+        return self.client._encode(self.table_name, {column: value})[column]
@@ -0,0 +1,157 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from dom.selenium_driver import SeleniumDriver
+
+
+class DriverPool:
+    """
+    Bounded pool of warm SeleniumDriver instances.
+
+    Drivers are leased for one page, reset (windows, cookies, storage) when they
+    come back, and recycled after max_uses leases or as soon as they look dead.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1,
+        max_uses: int = 25,
+        headless: bool = True,
+        driver_factory: Optional[Callable[[], SeleniumDriver]] = None,
+    ):
+        """
+        Input:
+            - max_size: maximum number of live drivers (leased + idle)
+            - max_uses: number of leases before a driver is replaced
+            - headless: forwarded to SeleniumDriver when no factory is given
+            - driver_factory: builds a fresh driver (injected for testing)
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, got {max_size}")
+        if not isinstance(max_uses, int) or max_uses < 1:
+            raise ValueError(f"max_uses must be a positive integer, got {max_uses}")
+
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._driver_factory = driver_factory or (lambda: SeleniumDriver(headless=headless))
+
+        self._idle: List[SeleniumDriver] = []
+        self._uses: Dict[int, int] = {}
+        self._live = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    # ==================== PUBLIC API ====================
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> SeleniumDriver:
+        """
+        Lease a driver and navigate it to url.
+
+        Blocks while max_size drivers are already leased.
+        """
+        if not url:
+            raise ValueError("URL cannot be empty")
+
+        driver = self._take_driver(timeout)
+
+        try:
+            driver.get(url)
+        except Exception as e:
+            self._discard(driver)
+            raise RuntimeError(f"Failed to navigate to URL '{url}': {type(e).__name__}: {e}")
+
+        with self._condition:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        return driver
+
+    def release(self, driver: SeleniumDriver, discard: bool = False) -> None:
+        """Return a leased driver; it is reset, or quit if worn out / broken."""
+        if driver is None:
+            return
+
+        with self._condition:
+            worn_out = self._uses.get(id(driver), 0) >= self.max_uses
+            closed = self._closed
+
+        if discard or worn_out or closed:
+            self._discard(driver)
+            return
+
+        try:
+            driver.reset_state()
+        except Exception as e:
+            print(f"Warning: Failed to reset pooled driver, recycling it: {type(e).__name__}: {e}")
+            self._discard(driver)
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, url: str, timeout: Optional[float] = None):
+        """Context manager around acquire/release."""
+        driver = self.acquire(url, timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def size(self) -> int:
+        """Number of live drivers (leased + idle)."""
+        with self._condition:
+            return self._live
+
+    def idle_count(self) -> int:
+        """Number of warm drivers waiting for a lease."""
+        with self._condition:
+            return len(self._idle)
+
+    def close(self) -> None:
+        """Quit every idle driver; leased drivers are quit when released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for driver in idle:
+            self._discard(driver)
+
+    # ==================== INTERNALS ====================
+
+    def _take_driver(self, timeout: Optional[float]) -> SeleniumDriver:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._live < self.max_size:
+                    self._live += 1
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No driver became available within {timeout}s")
+
+        try:
+            driver = self._driver_factory()
+        except Exception as e:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise RuntimeError(f"Failed to initialize SeleniumDriver: {type(e).__name__}: {e}")
+
+        with self._condition:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver: SeleniumDriver) -> None:
+        try:
+            driver.close()
+        except Exception:
+            pass
+
+        with self._condition:
+            self._uses.pop(id(driver), None)
+            self._live -= 1
+            self._condition.notify()
@@ -0,0 +1,305 @@
+import random
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement
+from dom_processing.instrumentation import span
+from dom_processing.my_scraper.page_cache import PageCache
+from dom_processing.my_scraper.services import (
+    HostRateLimiter,
+    fetch_through_cache,
+    shared_host_rate_limiter,
+    shared_page_cache,
+    user_agent_pool,
+)
+
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# elements whose content is never rendered, so Selenium's .text is empty for them
+NON_RENDERED_TAGS = {"head", "script", "style", "template", "noscript", "title", "meta", "link"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+# start tags that implicitly close an open <p>
+P_CLOSERS = BLOCK_TAGS - {"li", "td", "th", "tr", "tbody", "thead", "tfoot", "dd", "dt"}
+URL_PROPERTIES = {"href": {"a", "area", "link", "base"}, "src": {"img", "script", "iframe", "source", "embed"}}
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w-]+)""", re.IGNORECASE)
+_RETURN_GLOBAL = re.compile(r"^\s*return\s+(?:window\.)?([A-Za-z_$][\w$]*)\s*;?\s*$")
+
+
+class _TreeBuilder(HTMLParser):
+    """Feeds html.parser events into a SnapshotElement tree rooted at a #document node."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = SnapshotElement("#document")
+        self.stack: List[SnapshotElement] = [self.document]
+        # raw content per element: text strings and child elements, in order
+        self.content: Dict[int, list] = {id(self.document): []}
+        self.scripts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        tag = tag.lower()
+        self._close_implied(tag)
+
+        parent = self.stack[-1]
+        element = SnapshotElement(tag, {name.lower(): (value or "") for name, value in attrs}, "", None, parent)
+        parent.children.append(element)
+        self.content[id(parent)].append(element)
+        self.content[id(element)] = []
+
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag.lower() not in VOID_TAGS and self.stack[-1].tag_name == tag.lower():
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        tag = tag.lower()
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag_name == tag:
+                del self.stack[depth:]
+                return
+        # stray end tag: browsers ignore it too
+
+    def handle_data(self, data):
+        current = self.stack[-1]
+        if current.tag_name == "script":
+            self.scripts.append(data)
+        self.content[id(current)].append(data)
+
+    def _close_implied(self, tag: str) -> None:
+        top = self.stack[-1].tag_name
+        if top == "p" and tag in P_CLOSERS:
+            self.stack.pop()
+        elif tag == "li":
+            self._close_open("li", stop_at={"ul", "ol"})
+        elif tag in ("td", "th"):
+            self._close_open(("td", "th"), stop_at={"tr", "table"})
+        elif tag == "tr":
+            self._close_open("tr", stop_at={"table", "tbody", "thead", "tfoot"})
+        elif tag == "option":
+            self._close_open("option", stop_at={"select", "datalist"})
+
+    def _close_open(self, tags, stop_at) -> None:
+        tags = {tags} if isinstance(tags, str) else set(tags)
+        for depth in range(len(self.stack) - 1, 0, -1):
+            name = self.stack[depth].tag_name
+            if name in stop_at:
+                return
+            if name in tags:
+                del self.stack[depth:]
+                return
+
+
+class HtmlDriver:
+    """
+    Browser-less stand-in for SeleniumDriver over the raw HTTP response.
+
+    The page is parsed once into SnapshotElements, so the existing finder, tree
+    builder and annotator run unchanged. `driver` points back at the instance so
+    code written against SeleniumDriver.driver keeps working.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        page_cache: Optional[PageCache] = None,
+    ):
+        """
+        Input:
+            - session: HTTP session (injected for testing / connection reuse)
+            - timeout: request timeout in seconds
+            - rate_limiter: per-host token bucket (the one shared with PageDownloader by default)
+            - page_cache: on-disk response cache (the shared one from PAGE_CACHE_DIR by default)
+        """
+        self.driver = self
+        self._session = session or requests.Session()
+        self._owns_session = session is None
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or shared_host_rate_limiter()
+        self.page_cache = page_cache or shared_page_cache()
+        self.current_url: Optional[str] = None
+        self.page_source: str = ""
+        self.document: Optional[SnapshotElement] = None
+        self._scripts: List[str] = []
+
+    # ==================== SELENIUMDRIVER API ====================
+
+    def get(self, url: str) -> None:
+        if not url:
+            raise ValueError("URL cannot be empty")
+
+        try:
+            if not (self.page_cache is not None and self.page_cache.offline):
+                with span("rate_limit_wait"):
+                    self.rate_limiter.acquire(url)
+            with span("navigation", backend="html"):
+                content, content_type = fetch_through_cache(
+                    self._session,
+                    url,
+                    {"User-Agent": random.choice(user_agent_pool())},
+                    self.page_cache,
+                    timeout=self.timeout,
+                    kind="html",
+                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch page '{url}': {type(e).__name__}: {e}")
+
+        self.current_url = url
+        self.load_html(self._decode(content, content_type), self.current_url)
+
+    def load_html(self, html: str, base_url: str = "") -> None:
+        """Parse html as the current page (also used directly in tests)."""
+        builder = _TreeBuilder()
+        try:
+            builder.feed(html)
+            builder.close()
+        except Exception as e:
+            raise RuntimeError(f"Failed to parse HTML from '{base_url}': {type(e).__name__}: {e}")
+
+        base_url = self._base_href(builder.document, base_url)
+        _finalise(builder, base_url)
+
+        self.page_source = html
+        self.document = builder.document
+        self._scripts = builder.scripts
+
+    def find_element(self, by: str, value: str) -> SnapshotElement:
+        return self._require_document().find_element(by, value)
+
+    def find_elements(self, by: str, value: str) -> List[SnapshotElement]:
+        return self._require_document().find_elements(by, value)
+
+    def execute_script(self, script: str, *args):
+        """
+        Only `return <global>;` is supported: the value is read by regex from the
+        inline <script> blocks (e.g. `var _PAGE_COUNT = 12;`).
+        """
+        match = _RETURN_GLOBAL.match(script)
+        if not match:
+            raise RuntimeError(f"HtmlDriver cannot execute JavaScript: {script.strip()[:80]!r}")
+        return self.read_script_variable(match.group(1))
+
+    def read_script_variable(self, name: str):
+        """Last literal assigned to name in an inline script, or None."""
+        pattern = re.compile(
+            r"(?:^|[;\s{(])(?:var\s+|let\s+|const\s+|window\.)?" + re.escape(name)
+            + r"\s*=\s*(\"[^\"]*\"|'[^']*'|-?\d+(?:\.\d+)?|true|false|null)(?![\w.])"
+        )
+        value = None
+        for script in self._scripts:
+            for match in pattern.finditer(script):
+                value = match.group(1)
+
+        if value is None or value == "null":
+            return None
+        if value[0] in "\"'":
+            return value[1:-1]
+        if value in ("true", "false"):
+            return value == "true"
+        return float(value) if "." in value else int(value)
+
+    def reset_state(self) -> None:
+        self.current_url = None
+        self.page_source = ""
+        self.document = None
+        self._scripts = []
+
+    def close(self) -> None:
+        self.reset_state()
+        if self._owns_session:
+            self._session.close()
+
+    # ==================== INTERNALS ====================
+
+    def _require_document(self) -> SnapshotElement:
+        if self.document is None:
+            raise RuntimeError("HtmlDriver has no page loaded; call get(url) first")
+        return self.document
+
+    @staticmethod
+    def _decode(content: bytes, content_type: str) -> str:
+        """Header charset, then <meta charset>, then UTF-8; GB2312/GBK are read as GB18030."""
+        charset = None
+
+        header_match = re.search(r"charset=([\w-]+)", content_type, re.IGNORECASE)
+        if header_match:
+            charset = header_match.group(1)
+        else:
+            meta_match = _META_CHARSET.search(content[:4096])
+            if meta_match:
+                charset = meta_match.group(1).decode("ascii", "ignore")
+
+        charset = (charset or "utf-8").lower()
+        if charset in ("gb2312", "gbk", "x-gbk"):
+            charset = "gb18030"
+        try:
+            return content.decode(charset, errors="replace")
+        except LookupError:
+            return content.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _base_href(document: SnapshotElement, base_url: str) -> str:
+        for element in document.iter_descendants():
+            if element.tag_name == "base" and element.attributes.get("href"):
+                return urljoin(base_url, element.attributes["href"])
+        return base_url
+
+
+def _finalise(builder: _TreeBuilder, base_url: str) -> None:
+    """Fill in resolved href/src properties and innerText-like .text, bottom-up."""
+    raw_text: Dict[int, str] = {}
+
+    order = [builder.document, *builder.document.iter_descendants()]
+    for element in reversed(order):
+        for prop, tags in URL_PROPERTIES.items():
+            if element.tag_name in tags and prop in element.attributes:
+                element.properties[prop] = urljoin(base_url, element.attributes[prop].strip())
+
+        if element.tag_name in NON_RENDERED_TAGS or _is_hidden(element):
+            raw_text[id(element)] = ""
+            element.text = ""
+            continue
+
+        parts = []
+        for piece in builder.content[id(element)]:
+            if isinstance(piece, str):
+                parts.append(re.sub(r"[ \t\r\n\f]+", " ", piece))
+            elif piece.tag_name == "br":
+                parts.append("\n")
+            elif piece.tag_name in BLOCK_TAGS:
+                parts.append("\n" + raw_text[id(piece)] + "\n")
+            else:
+                parts.append(raw_text[id(piece)])
+
+        raw = "".join(parts)
+        raw_text[id(element)] = raw
+        element.text = _normalise_text(raw)
+
+
+def _is_hidden(element: SnapshotElement) -> bool:
+    if "hidden" in element.attributes:
+        return True
+    style = element.attributes.get("style", "").replace(" ", "").lower()
+    return "display:none" in style
+
+
+def _normalise_text(raw: str) -> str:
+    lines = (line.strip() for line in raw.split("\n"))
+    return "\n".join(line for line in lines if line)
@@ -1,6 +1,11 @@
+import threading
+import time
+from collections import deque
+
+
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()
 
     def enqueue(self, item):
         """Add item to the rear of the queue"""
@@ -10,7 +15,7 @@ class Queue:
         """Remove and return the front item of the queue"""
         if self.is_empty():
             return None
-        return self.items.pop(0)
+        return self.items.popleft()
 
     def front(self):
         """Return the front item without removing it"""
@@ -25,3 +30,99 @@ class Queue:
     def size(self):
         """Return the number of elements in the queue"""
         return len(self.items)
+
+
+class QueueClosed(Exception):
+    """Raised by BlockingQueue.put after close(), and by get once a closed queue is drained."""
+
+
+class BlockingQueue:
+    """
+    Bounded FIFO shared by worker threads.
+
+    put() blocks while the queue is full (backpressure on producers), get()
+    blocks while it is empty. close() replaces per-worker stop markers: items
+    already queued are still handed out, then get() raises QueueClosed, which
+    also ends iteration:
+
+        for job in job_queue:  # returns once the queue is closed and drained
+            ...
+
+    Input:
+        - maxsize: most items held at once; 0 for no bound
+    """
+
+    def __init__(self, maxsize: int = 0):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError(f"maxsize must be a non-negative integer, got {maxsize}")
+        self.maxsize = maxsize
+        self._items = deque()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def put(self, item, timeout: float = None) -> None:
+        """Append item, waiting up to timeout seconds (forever when None) for room; TimeoutError when none frees up."""
+        with self._not_full:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._closed and self.maxsize and len(self._items) >= self.maxsize:
+                if not self._wait(self._not_full, deadline):
+                    raise TimeoutError(f"BlockingQueue still full after {timeout}s")
+            if self._closed:
+                raise QueueClosed("put() on a closed queue")
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def get(self, timeout: float = None):
+        """Pop the front item, waiting up to timeout seconds (forever when None); TimeoutError when nothing arrives."""
+        with self._not_empty:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    raise QueueClosed("queue is closed and drained")
+                if not self._wait(self._not_empty, deadline):
+                    raise TimeoutError(f"BlockingQueue still empty after {timeout}s")
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def close(self) -> None:
+        """Refuse new items and wake every waiting producer and consumer."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def is_empty(self) -> bool:
+        return self.size() == 0
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.get()
+            except QueueClosed:
+                return
+
+    @staticmethod
+    def _wait(condition: threading.Condition, deadline) -> bool:
+        """Wait once; False when the deadline had already passed (callers re-check their condition)."""
+        if deadline is None:
+            condition.wait()
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        condition.wait(remaining)
+        return True
@@ -1,10 +1,58 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-import re
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
 
+from dom.tree_index import TreeIndex, parse_selector_value
 from utils import generate_selector_from_webelement
 
+
+# one shared tuple per distinct target_types list, reused by every node and clone
+_TARGET_TYPES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_target_types(target_types) -> Optional[Tuple[str, ...]]:
+    if target_types is None:
+        return None
+    key = tuple(target_types)
+    return _TARGET_TYPES.setdefault(key, key)
+
+
+# node id -> web element for the page being read on this thread/context; None outside PageBindings
+_ACTIVE_BINDINGS: ContextVar[Optional[Dict[int, Any]]] = ContextVar("page_bindings", default=None)
+
+
+class PageBindings:
+    """
+    Per-page web element table for a shared, never-copied tree.
+
+    While active, node.web_element reads and writes go to this table instead of
+    the node, so any number of pages (one per thread or worker) can annotate the
+    same document tree at once. Every node starts unbound on entry.
+
+        with PageBindings():
+            annotate(document_tree)
+            ...read node.web_element...
+    """
+
+    def __init__(self):
+        self.elements: Dict[int, Any] = {}
+        self._token = None
+
+    def __enter__(self) -> 'PageBindings':
+        self._token = _ACTIVE_BINDINGS.set(self.elements)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _ACTIVE_BINDINGS.reset(self._token)
+        self._token = None
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+
 class SiblingMixin:
+    __slots__ = ()
+
     def siblings(self):
         if self.parent is None:
             raise RuntimeError("Node has no parent")
@@ -23,6 +71,13 @@ class SiblingMixin:
 
 
 class BaseDOMNode(ABC):
+    # no per-instance __dict__: trees are built for every main page and branch
+    __slots__ = (
+        "tag", "classes", "attrs", "description", "annotation", "schema_node",
+        "children", "parent", "_web_element", "_css_selector", "target_types",
+        "condition", "condition_id", "_tree_index", "__weakref__",
+    )
+
     def __init__(self,
                 schema_node: Optional[dict],
                   tag: str,
@@ -48,10 +103,12 @@ class BaseDOMNode(ABC):
         self.parent = parent or None
 
 
-        self.web_element = None
+        self._web_element = None
+        self._css_selector = None  # memoized by get_css_selector, reset by set_attr
+        self._tree_index = None  # set by build_index on every node of the indexed tree
 
         if annotation and "target_element" in annotation:
-            self.target_types = schema_node["target_types"]
+            self.target_types = intern_target_types(schema_node["target_types"])
         else:
             self.target_types = None
 
@@ -59,6 +116,22 @@ class BaseDOMNode(ABC):
         self.condition_id = condition_id or None
     
 
+    @property
+    def web_element(self):
+        """Element bound to this node; the active PageBindings' entry when there is one."""
+        bindings = _ACTIVE_BINDINGS.get()
+        if bindings is None:
+            return self._web_element
+        return bindings.get(id(self))
+
+    @web_element.setter
+    def web_element(self, element) -> None:
+        bindings = _ACTIVE_BINDINGS.get()
+        if bindings is None:
+            self._web_element = element
+        else:
+            bindings[id(self)] = element
+
     @abstractmethod
     def validate(self):
         pass
@@ -86,6 +159,38 @@ class BaseDOMNode(ABC):
     def add_child(self, child):
         """Add a child node."""
         self.children.append(child)
+        self._invalidate_index()
+
+    def clone_structure(self) -> 'BaseDOMNode':
+        """
+        Copy of this subtree without web elements. Read-only structure fields
+        (schema_node, target_types, ...) are shared with the original; the nodes,
+        their children lists, parent links and the mutable attrs / classes are new.
+        """
+        clone_root = self._shallow_clone(None)
+        stack = [(self, clone_root)]
+        while stack:
+            original, clone = stack.pop()
+            for child in original.children:
+                child_clone = child._shallow_clone(clone)
+                clone.children.append(child_clone)
+                stack.append((child, child_clone))
+        return clone_root
+
+    def _shallow_clone(self, parent: Optional['BaseDOMNode']) -> 'BaseDOMNode':
+        cls = type(self)
+        clone = cls.__new__(cls)
+        for slot in _node_slots(cls):
+            if hasattr(self, slot):
+                setattr(clone, slot, getattr(self, slot))
+        clone.children = []
+        clone.parent = parent
+        # set_attr on the clone must not change the original (or its memoised selector)
+        clone.attrs = dict(self.attrs)
+        clone.classes = list(self.classes)
+        clone._web_element = None
+        clone._tree_index = None
+        return clone
 
         
     def remove_child(self, child):
@@ -93,9 +198,45 @@ class BaseDOMNode(ABC):
         if child in self.children:
             self.children.remove(child)
             child.parent = None
+            self._invalidate_index()
+            child._drop_index()
     
     def set_attr(self, key, value):
         self.attrs[key] = value
+        self._css_selector = None
+        self._invalidate_index()
+
+    def build_index(self) -> TreeIndex:
+        """
+        Index this subtree so find_in_node answers id / class / tag / description
+        queries from dictionaries. Call once the tree is built; changes made
+        through add_child / remove_child / remove_self / set_attr mark it stale
+        and the next query rebuilds it.
+        """
+        index = TreeIndex(self)
+        for node in index.nodes:
+            node._tree_index = index
+        return index
+
+    def _invalidate_index(self) -> None:
+        if self._tree_index is not None:
+            self._tree_index.invalidate()
+
+    def _drop_index(self) -> None:
+        """Detached subtree: forget the old tree's index instead of rebuilding it on every query."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._tree_index = None
+            stack.extend(node.children)
+
+    def _usable_index(self, selector_type) -> Optional[TreeIndex]:
+        index = self._tree_index
+        if index is None:
+            return None
+        if not index.valid:
+            index = index.root.build_index()
+        return index if index.covers(self, selector_type) else None
     
     
     def get_text(self):
@@ -133,7 +274,11 @@ class BaseDOMNode(ABC):
     def get_css_selector(self):
         """
         Generates CSS selector for this node based on tag, classes, and attributes.
+        Computed once per node; change attrs through set_attr so it is rebuilt.
         """
+        if self._css_selector is not None:
+            return self._css_selector
+
         selector_parts = [self.tag] if self.tag else []
         
         # Add classes
@@ -149,7 +294,8 @@ class BaseDOMNode(ABC):
                 else:
                     selector_parts.append(f"#{self.attrs['id']}")
             
-        return ''.join(selector_parts) 
+        self._css_selector = ''.join(selector_parts)
+        return self._css_selector
 
         """
         example: 
@@ -212,39 +358,25 @@ class BaseDOMNode(ABC):
         if callable(selector_value):
             matches = selector_value
         else:
-            # Determine the matching strategy based on selector_value format
-            expanded_set = None
-            regex_pattern = None
-            exact_value = None
-            
-            # Check for regex pattern
-            if isinstance(selector_value, str) and selector_value.startswith('regex:'):
-                regex_pattern = re.compile(selector_value[6:])
-            
-            # Check for range pattern with exceptions: prefix{start-end!exc1,exc2,...}suffix
-            elif isinstance(selector_value, str):
-                match = re.match(r'^(.+)\{(\d+)-(\d+)!([0-9,]+)\}(.*)$', selector_value)
-                if match:
-                    prefix, start, end, exceptions_str, suffix = match.groups()
-                    start_num, end_num = int(start), int(end)
-                    exceptions = set(int(exc.strip()) for exc in exceptions_str.split(',') if exc.strip())
-                    expanded_set = {f"{prefix}{i}{suffix}" for i in range(start_num, end_num + 1) if i not in exceptions}
-                else:
-                    # Check for range pattern without exceptions: prefix{start-end}suffix
-                    match = re.match(r'^(.+)\{(\d+)-(\d+)\}(.*)$', selector_value)
-                    if match:
-                        prefix, start, end, suffix = match.groups()
-                        start_num, end_num = int(start), int(end)
-                        expanded_set = {f"{prefix}{i}{suffix}" for i in range(start_num, end_num + 1)}
-                    else:
-                        # It's an exact match
-                        exact_value = selector_value
+            # Determine the matching strategy based on selector_value format (parsed once per value)
+            if isinstance(selector_value, str):
+                kind, value = parse_selector_value(selector_value)
+            else:
+                kind, value = "exact", None
+
+            index = self._usable_index(selector_type)
+            if index is not None:
+                return index.find(self, selector_type, kind, value, find_all)
+
+            regex_pattern = value if kind == "regex" else None
+            expanded_set = value if kind == "set" else None
+            exact_value = value if kind == "exact" else None
             
             # Create the matcher function based on selector type and processed value
             if selector_type == "id":
                 if regex_pattern:
                     matches = lambda node: bool(regex_pattern.match(node.attrs.get("id", "")))
-                elif expanded_set:
+                elif expanded_set is not None:
                     matches = lambda node: node.attrs.get("id") in expanded_set
                 else:
                     matches = lambda node: node.attrs.get("id") == exact_value
@@ -252,7 +384,7 @@ class BaseDOMNode(ABC):
             elif selector_type == "class":
                 if regex_pattern:
                     matches = lambda node: any(regex_pattern.match(cls) for cls in node.classes)
-                elif expanded_set:
+                elif expanded_set is not None:
                     matches = lambda node: any(cls in expanded_set for cls in node.classes)
                 else:
                     matches = lambda node: exact_value in node.classes
@@ -260,7 +392,7 @@ class BaseDOMNode(ABC):
             elif selector_type == "tag":
                 if regex_pattern:
                     matches = lambda node: bool(regex_pattern.match(node.tag))
-                elif expanded_set:
+                elif expanded_set is not None:
                     matches = lambda node: node.tag in expanded_set
                 else:
                     matches = lambda node: node.tag == exact_value
@@ -268,7 +400,7 @@ class BaseDOMNode(ABC):
             elif selector_type == "description":
                 if regex_pattern:
                     matches = lambda node: bool(regex_pattern.match(node.description or ""))
-                elif expanded_set:
+                elif expanded_set is not None:
                     matches = lambda node: node.description in expanded_set
                 else:
                     matches = lambda node: node.description == exact_value
@@ -321,6 +453,7 @@ class BaseDOMNode(ABC):
         Remove this node from the DOM tree.
         If recursive=True, also detaches all descendants.
         """
+        self._invalidate_index()
         # Remove from parent's children
         if self.parent:
             try:
@@ -332,7 +465,9 @@ class BaseDOMNode(ABC):
         if recursive:
             for child in self.children:
                 child.parent = None
+                child._drop_index()
             self.children = []
+        self._drop_index()
             
     def get_dom_tree_str(self, depth=0) -> str:
         indent = "  " * depth
@@ -347,6 +482,8 @@ class BaseDOMNode(ABC):
         return s
     
 class RootNode(BaseDOMNode):
+    __slots__ = ()
+
     def __init__(self,
                  schema_node: Optional[dict],
                   tag: str,
@@ -371,6 +508,8 @@ class RootNode(BaseDOMNode):
     
 
 class TemplateNode(SiblingMixin,BaseDOMNode):
+    __slots__ = ("template_name",)
+
     def __init__(self,
                  schema_node: Optional[dict],
                   tag: str,
@@ -391,6 +530,8 @@ class TemplateNode(SiblingMixin,BaseDOMNode):
         return self.template_name is not None
 
 class RegularNode(SiblingMixin,BaseDOMNode):
+    __slots__ = ()
+
     def __init__(self,
                  schema_node: Optional[dict],
                   tag: str,
@@ -407,3 +548,20 @@ class RegularNode(SiblingMixin,BaseDOMNode):
     def validate(self):
         # Example validation: ensure tag is not empty
         return bool(self.parent)
+
+
+def _node_slots(cls) -> Tuple[str, ...]:
+    """Every data slot of a node class, base classes included (cached per class)."""
+    slots = _NODE_SLOTS.get(cls)
+    if slots is None:
+        slots = tuple(
+            slot
+            for klass in reversed(cls.__mro__)
+            for slot in getattr(klass, "__slots__", ())
+            if slot != "__weakref__"
+        )
+        _NODE_SLOTS[cls] = slots
+    return slots
+
+
+_NODE_SLOTS: Dict[type, Tuple[str, ...]] = {}
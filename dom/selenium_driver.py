@@ -1,8 +1,13 @@
+import os
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 
+from dom_processing.dom_tree_builder.caching.profiling import ProfilingWebDriver, WebDriverProfiler
+from dom_processing.instrumentation import increment, logger, span
+
 
 # --------------------------------------------------------
 # OPTIMIZED CHROME OPTIONS
@@ -60,12 +65,25 @@ def get_optimized_chrome_options(headless=False):
 # SELENIUM DRIVER CLASS
 # --------------------------------------------------------
 class SeleniumDriver:
-    def __init__(self, headless=False, timeout=5):
-        """Initialize driver with optimized options."""
+    def __init__(self, headless=False, timeout=5, profile=None):
+        """
+        Initialize driver with optimized options.
+
+        Input:
+            - profile: count and time every WebDriver round trip per call site and
+              log a report per page (default: WEBDRIVER_PROFILE env var)
+        """
         chrome_options = get_optimized_chrome_options(headless)
         service = Service()
 
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        with span("driver_startup", backend="selenium"):
+            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+
+        if profile is None:
+            profile = os.getenv("WEBDRIVER_PROFILE", "").lower() in ("1", "true", "yes")
+        self.profiler = WebDriverProfiler() if profile else None
+        if self.profiler:
+            self.driver = ProfilingWebDriver(self.driver, self.profiler)
         #self.driver = webdriver.Chrome(service=service)
         #self.driver= webdriver.Chrome()
         self.wait = WebDriverWait(self.driver, timeout)
@@ -74,8 +92,38 @@ class SeleniumDriver:
         
 
     def get(self, url):
-        self.driver.get(url)
-    
+        if self.profiler:
+            self._log_profile(self.profiler.begin_page(url))
+        increment("webdriver_lookups", call="get")
+        with span("navigation", backend="selenium"):
+            self.driver.get(url)
+
+    def reset_state(self):
+        """Drop extra windows, cookies and web storage so the next page starts clean."""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+
+        # storage is scoped to the current origin, so clear it before leaving the page
+        self.driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            self.driver.delete_all_cookies()
+
+        self.driver.get("about:blank")
+
 
     def close(self):
+        if self.profiler:
+            self._log_profile(self.profiler.end_page())
         self.driver.quit()
+
+    @staticmethod
+    def _log_profile(page_profile) -> None:
+        if page_profile is not None:
+            logger.info(page_profile.format())
@@ -0,0 +1,125 @@
+"""
+Per-tree lookup index for BaseDOMNode.find_in_node.
+
+find_in_node walks the whole subtree on every call. A TreeIndex records the tree
+once in the same depth-first (pre-)order the walk uses, plus one position list per
+id / class / tag / description value. A node's subtree is a contiguous range of
+positions, so a query on any node of the tree is a dict lookup and two bisects,
+and results come back in the order the walk would have produced.
+
+The index goes stale when the tree changes (add_child, remove_child, remove_self,
+set_attr); find_in_node then rebuilds it from its root on the next query.
+"""
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+
+_RANGE_WITH_EXCEPTIONS = re.compile(r'^(.+)\{(\d+)-(\d+)!([0-9,]+)\}(.*)$')
+_RANGE = re.compile(r'^(.+)\{(\d+)-(\d+)\}(.*)$')
+
+
+@lru_cache(maxsize=256)
+def parse_selector_value(selector_value: str) -> Tuple[str, object]:
+    """
+    Input:
+        - selector_value: find_in_node string value ('regex:...', 'st{1-33!2,4}', 'st{1-33}' or plain)
+    Output: ("regex", compiled pattern), ("set", frozenset of expanded values) or ("exact", value)
+    """
+    if selector_value.startswith('regex:'):
+        return "regex", re.compile(selector_value[6:])
+
+    match = _RANGE_WITH_EXCEPTIONS.match(selector_value)
+    if match:
+        prefix, start, end, exceptions_str, suffix = match.groups()
+        exceptions = {int(exc.strip()) for exc in exceptions_str.split(',') if exc.strip()}
+        return "set", frozenset(
+            f"{prefix}{i}{suffix}" for i in range(int(start), int(end) + 1) if i not in exceptions
+        )
+
+    match = _RANGE.match(selector_value)
+    if match:
+        prefix, start, end, suffix = match.groups()
+        return "set", frozenset(f"{prefix}{i}{suffix}" for i in range(int(start), int(end) + 1))
+
+    return "exact", selector_value
+
+
+class TreeIndex:
+    """Position lists per id / class / tag / description over one tree (see module docstring)."""
+
+    FIELDS = ("id", "class", "tag", "description")
+
+    def __init__(self, root):
+        self.root = root
+        self.valid = True
+        self.nodes: List = []  # depth-first order, same as find_in_node's walk
+        self._position: Dict[int, int] = {}  # id(node) -> position; the index keeps the nodes alive
+        self._subtree_end: List[int] = []  # one past the last position of each node's subtree
+        self._by_field: Dict[str, Dict[object, List[int]]] = {field: {} for field in self.FIELDS}
+        self._build()
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def covers(self, node, selector_type: str) -> bool:
+        return selector_type in self._by_field and id(node) in self._position
+
+    def find(self, node, selector_type: str, kind: str, value, find_all: bool):
+        """
+        Input:
+            - node: node of this tree to search under (itself included)
+            - selector_type: one of FIELDS
+            - kind, value: parse_selector_value() result
+            - find_all: list of every match, or the first match / None
+        """
+        start = self._position[id(node)]
+        end = self._subtree_end[start]
+        positions_by_key = self._by_field[selector_type]
+
+        if kind == "exact":
+            candidate_lists = [positions_by_key.get(value, ())]
+        elif kind == "set":
+            candidate_lists = [positions_by_key[key] for key in value if key in positions_by_key]
+        else:
+            candidate_lists = [
+                positions for key, positions in positions_by_key.items()
+                if value.match(key if key is not None else "")
+            ]
+
+        hits = []
+        for positions in candidate_lists:
+            hits.extend(positions[bisect_left(positions, start):bisect_left(positions, end)])
+        if len(candidate_lists) > 1:
+            hits = sorted(set(hits))
+
+        if find_all:
+            return [self.nodes[position] for position in hits]
+        return self.nodes[hits[0]] if hits else None
+
+    def _build(self) -> None:
+        by_id, by_class, by_tag, by_description = (self._by_field[field] for field in self.FIELDS)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            position = len(self.nodes)
+            self.nodes.append(node)
+            self._position[id(node)] = position
+
+            by_id.setdefault(node.attrs.get("id"), []).append(position)
+            for cls in dict.fromkeys(node.classes):
+                by_class.setdefault(cls, []).append(position)
+            by_tag.setdefault(node.tag, []).append(position)
+            by_description.setdefault(node.description, []).append(position)
+
+            stack.extend(reversed(node.children))
+
+        # a subtree ends where its last child's subtree ends
+        self._subtree_end = [0] * len(self.nodes)
+        for position in range(len(self.nodes) - 1, -1, -1):
+            children = self.nodes[position].children
+            self._subtree_end[position] = (
+                self._subtree_end[self._position[id(children[-1])]] if children else position + 1
+            )
@@ -16,6 +16,10 @@ class ScraperConfig:
     def get_schema_paths(self) -> dict:
         return self.config['schema_paths']
     
+    def get_dom_backend(self) -> str:
+        """How tree building reads the page: 'selenium' (live elements), 'snapshot' (one serialised copy) or 'html' (no browser)"""
+        return self.config.get('dom_backend', 'selenium')
+
     def get_target_config(self, target_name: str) -> dict:
         """Get configuration for a specific scraping target"""
         return self.config['targets'].get(target_name)
\ No newline at end of file
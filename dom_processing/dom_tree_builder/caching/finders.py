@@ -3,6 +3,8 @@ from selenium.webdriver.remote.webelement import WebElement
 from typing import List, Optional
 
 from dom_processing.dom_tree_builder.caching.interfaces import WebElementInterface
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement
+from dom_processing.instrumentation import increment
 
 class SeleniumElementFinder:
     """Concrete Selenium implementation - only used in production"""
@@ -27,6 +29,7 @@ class SeleniumElementFinder:
     def find_single(self, parent: WebElementInterface, by_suffix: str, selector: str) -> WebElementInterface:
         try:
             by = self._resolve_by(by_suffix)
+            self._count_lookup(parent)
             return parent.find_element(by, selector)
         except Exception:
             return None
@@ -34,6 +37,14 @@ class SeleniumElementFinder:
     def find_multiple(self, parent: WebElementInterface, by_suffix: str, selector: str) -> List[WebElementInterface]:
         try:
             by = self._resolve_by(by_suffix)
+            self._count_lookup(parent)
             return parent.find_elements(by, selector)
         except Exception:
             return []
+
+    @staticmethod
+    def _count_lookup(parent) -> None:
+        # snapshot lookups are answered in-process; element reads (.text,
+        # get_attribute) are only counted by the WEBDRIVER_PROFILE profiler
+        if not isinstance(parent, SnapshotElement):
+            increment("webdriver_lookups", call="find")
@@ -0,0 +1,224 @@
+"""
+WebDriver round-trip profiler.
+
+Every find_element / get_attribute / .text / execute_script on a live Selenium
+element is a blocking HTTP call to chromedriver. ProfilingWebDriver and
+ProfilingWebElement wrap the raw driver and the elements it returns, count and
+time each call, and attribute it to the first caller outside the plumbing
+modules (the finder, selenium itself), e.g. "annotate_tree.AnnotateTree.annotate_tree"
+or "utils.matches_css_selector".
+
+SeleniumDriver turns this on with WEBDRIVER_PROFILE=1 and logs one report per page.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+# callers inside these modules are skipped when looking for the call site
+DEFAULT_SKIP_MODULES = (
+    "dom_processing.dom_tree_builder.caching.profiling",
+    "dom_processing.dom_tree_builder.caching.finders",
+    "selenium",
+)
+
+
+@dataclass
+class CallStats:
+    """Calls of one method from one call site."""
+    call_site: str
+    method: str
+    count: int = 0
+    total_seconds: float = 0.0
+
+
+@dataclass
+class PageProfile:
+    """Round trips made while one page was loaded."""
+    url: Optional[str]
+    calls: List[CallStats] = field(default_factory=list)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(stats.count for stats in self.calls)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stats.total_seconds for stats in self.calls)
+
+    def by_call_site(self) -> Dict[str, int]:
+        """Round trips per call site, most expensive first."""
+        totals: Dict[str, int] = {}
+        for stats in self.calls:
+            totals[stats.call_site] = totals.get(stats.call_site, 0) + stats.count
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def format(self, limit: int = 20) -> str:
+        lines = [
+            f"WebDriver profile for {self.url or '<no page>'}: "
+            f"{self.total_calls} round trips, {self.total_seconds:.3f}s"
+        ]
+        for stats in self.calls[:limit]:
+            lines.append(
+                f"  {stats.count:6d}  {stats.total_seconds:8.3f}s  {stats.method:<16} {stats.call_site}"
+            )
+        if len(self.calls) > limit:
+            lines.append(f"  ... {len(self.calls) - limit} more")
+        return "\n".join(lines)
+
+
+class WebDriverProfiler:
+    """Collects round trips per (call site, method) for the page currently loaded."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        skip_modules: Tuple[str, ...] = DEFAULT_SKIP_MODULES,
+    ):
+        """
+        Input:
+            - clock: monotonic time source (injected for testing)
+            - skip_modules: module name prefixes never reported as a call site
+        """
+        self._clock = clock
+        self._skip_modules = tuple(skip_modules)
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], CallStats] = {}
+        self._url: Optional[str] = None
+
+    def time_call(self, method: str, func: Callable, *args, **kwargs):
+        call_site = self._call_site()
+        started = self._clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._record(call_site, method, self._clock() - started)
+
+    def begin_page(self, url: Optional[str]) -> Optional[PageProfile]:
+        """Close the current page (returning its profile if it made any calls) and start url."""
+        finished = self.end_page()
+        self._url = url
+        return finished
+
+    def end_page(self) -> Optional[PageProfile]:
+        with self._lock:
+            calls, self._calls = self._calls, {}
+            url = self._url
+        if not calls:
+            return None
+        return PageProfile(
+            url=url,
+            calls=sorted(calls.values(), key=lambda stats: (-stats.count, stats.call_site, stats.method)),
+        )
+
+    def _record(self, call_site: str, method: str, seconds: float) -> None:
+        key = (call_site, method)
+        with self._lock:
+            stats = self._calls.get(key)
+            if stats is None:
+                stats = self._calls[key] = CallStats(call_site, method)
+            stats.count += 1
+            stats.total_seconds += seconds
+
+    def _call_site(self) -> str:
+        frame = sys._getframe(2)
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            # comprehensions and lambdas report the function they live in
+            anonymous = frame.f_code.co_name.startswith("<") and frame.f_code.co_name != "<module>"
+            if not anonymous and not module.startswith(self._skip_modules):
+                return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_qualname}"
+            frame = frame.f_back
+        return "<unknown>"
+
+
+class _ProfilingProxy:
+    """Shared forwarding: methods are timed when called, properties when read."""
+
+    # attributes answered without talking to chromedriver
+    _local_attributes = frozenset()
+
+    def __init__(self, target, profiler: WebDriverProfiler):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_profiler", profiler)
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        if name in self._local_attributes:
+            return getattr(target, name)
+
+        profiler = object.__getattribute__(self, "_profiler")
+        if isinstance(getattr(type(target), name, None), property):
+            return _wrap(profiler.time_call(name, getattr, target, name), profiler)
+
+        value = getattr(target, name)
+        if not callable(value):
+            return value
+
+        def timed(*args, **kwargs):
+            return _wrap(profiler.time_call(name, value, *args, **kwargs), profiler)
+        return timed
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._target!r})"
+
+
+class ProfilingWebElement(_ProfilingProxy):
+    """WebElement proxy; nested elements and .parent stay profiled."""
+
+    _local_attributes = frozenset({"id", "_id"})
+
+    def find_element(self, by: str, selector: str):
+        return _wrap(self._profiler.time_call("find_element", self._target.find_element, by, selector), self._profiler)
+
+    def find_elements(self, by: str, selector: str):
+        return _wrap(self._profiler.time_call("find_elements", self._target.find_elements, by, selector), self._profiler)
+
+    @property
+    def parent(self):
+        # utils reaches the driver through element.parent for execute_script
+        return ProfilingWebDriver(self._target.parent, self._profiler)
+
+
+class ProfilingWebDriver(_ProfilingProxy):
+    """Selenium WebDriver proxy; element arguments are unwrapped before they are sent."""
+
+    def find_element(self, by: str, selector: str):
+        return _wrap(self._profiler.time_call("find_element", self._target.find_element, by, selector), self._profiler)
+
+    def find_elements(self, by: str, selector: str):
+        return _wrap(self._profiler.time_call("find_elements", self._target.find_elements, by, selector), self._profiler)
+
+    def execute_script(self, script: str, *args):
+        args = tuple(_unwrap(arg) for arg in args)
+        return _wrap(self._profiler.time_call("execute_script", self._target.execute_script, script, *args), self._profiler)
+
+
+def _wrap(value, profiler: WebDriverProfiler):
+    if isinstance(value, WebElement):
+        return ProfilingWebElement(value, profiler)
+    if isinstance(value, list) and value and isinstance(value[0], WebElement):
+        return [ProfilingWebElement(element, profiler) for element in value]
+    return value
+
+
+def _unwrap(value):
+    if isinstance(value, _ProfilingProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
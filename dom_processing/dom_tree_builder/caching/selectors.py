@@ -19,8 +19,4 @@ class SelectorBuilder:
         Input: template_name
         Output: CSS selector string
         """
-        invariant_chars = self._template_registry.get_template_invariant_characteristics(
-            template_name,
-            self._config_queries
-        )
-        return self._template_registry.form_template_selector(template_name, invariant_chars)
\ No newline at end of file
+        return self._template_registry.get_template_selector(template_name, self._config_queries)
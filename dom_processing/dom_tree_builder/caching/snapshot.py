@@ -0,0 +1,374 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from dom_processing.instrumentation import increment
+
+
+class UnsupportedSelectorError(ValueError):
+    """Raised for selectors the in-memory matcher does not implement."""
+
+
+# One execute_script call: serialise the subtree under the root selector.
+# href/src are read as properties so they come back resolved, like get_attribute does.
+SNAPSHOT_SCRIPT = """
+const root = document.querySelector(arguments[0]);
+if (!root) { return null; }
+function serialise(el) {
+    const attrs = {};
+    for (const attr of el.attributes) { attrs[attr.name] = attr.value; }
+    const node = {
+        tag: el.tagName.toLowerCase(),
+        attrs: attrs,
+        text: el.getClientRects().length ? (el.innerText || "").trim() : "",
+        properties: {},
+        children: []
+    };
+    if (typeof el.href === "string") { node.properties.href = el.href; }
+    if (typeof el.src === "string") { node.properties.src = el.src; }
+    for (const child of el.children) { node.children.push(serialise(child)); }
+    return node;
+}
+return serialise(root);
+"""
+
+
+class SnapshotElement:
+    """
+    Read-only, in-memory stand-in for a Selenium WebElement.
+
+    Supports the calls the tree builder / annotator make (find_element(s) with CSS
+    compound selectors, ./tag XPaths, .text, get_attribute, tag_name) without a
+    WebDriver round trip.
+    """
+
+    def __init__(
+        self,
+        tag: str,
+        attrs: Optional[Dict[str, str]] = None,
+        text: str = "",
+        properties: Optional[Dict[str, str]] = None,
+        parent: Optional["SnapshotElement"] = None,
+    ):
+        self.tag_name = tag.lower()
+        self.attributes: Dict[str, str] = dict(attrs or {})
+        self.text = text
+        self.properties: Dict[str, str] = dict(properties or {})
+        self.snapshot_parent = parent
+        self.children: List["SnapshotElement"] = []
+
+    @classmethod
+    def from_dict(cls, data: dict, parent: Optional["SnapshotElement"] = None) -> "SnapshotElement":
+        """Rebuild a subtree from the JSON produced by SNAPSHOT_SCRIPT."""
+        root = cls(
+            data["tag"],
+            data.get("attrs"),
+            data.get("text", ""),
+            data.get("properties"),
+            parent,
+        )
+        stack = [(root, data.get("children", []))]
+        while stack:
+            element, children = stack.pop()
+            for child_data in children:
+                child = cls(
+                    child_data["tag"],
+                    child_data.get("attrs"),
+                    child_data.get("text", ""),
+                    child_data.get("properties"),
+                    element,
+                )
+                element.children.append(child)
+                stack.append((child, child_data.get("children", [])))
+        return root
+
+    def __repr__(self) -> str:
+        return f"SnapshotElement({generate_snapshot_selector(self)!r})"
+
+    # ==================== WEBELEMENT API ====================
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attributes.get("class", "").split()
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name in self.properties:
+            return self.properties[name]
+        if name in ("innerText", "textContent"):
+            return self.text
+        return self.attributes.get(name)
+
+    def find_element(self, by: str, value: str) -> "SnapshotElement":
+        for element in self._iter_matches(by, value):
+            return element
+        raise NoSuchElementException(f"No snapshot element matches {by}={value!r}")
+
+    def find_elements(self, by: str, value: str) -> List["SnapshotElement"]:
+        return list(self._iter_matches(by, value))
+
+    def matches(self, selector: str) -> bool:
+        """Element.matches() equivalent for the supported CSS subset."""
+        return any(_matches_chain(self, chain, len(chain) - 1) for chain in _parse_selector(selector))
+
+    # ==================== TRAVERSAL ====================
+
+    def iter_descendants(self) -> Iterator["SnapshotElement"]:
+        """Descendants in document order (self excluded)."""
+        stack = list(reversed(self.children))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.children))
+
+    def _iter_matches(self, by: str, value: str) -> Iterator["SnapshotElement"]:
+        if by == By.CSS_SELECTOR:
+            chains = _parse_selector(value)
+            return (
+                element for element in self.iter_descendants()
+                if any(_matches_chain(element, chain, len(chain) - 1) for chain in chains)
+            )
+        if by == By.XPATH:
+            axis, tag = _parse_xpath(value)
+            candidates = self.children if axis == "/" else self.iter_descendants()
+            return (element for element in candidates if tag == "*" or element.tag_name == tag)
+        if by == By.TAG_NAME:
+            return (element for element in self.iter_descendants() if element.tag_name == value.lower())
+        if by == By.CLASS_NAME:
+            return (element for element in self.iter_descendants() if value in element.classes)
+        if by == By.ID:
+            return (element for element in self.iter_descendants() if element.attributes.get("id") == value)
+        if by == By.NAME:
+            return (element for element in self.iter_descendants() if element.attributes.get("name") == value)
+        raise UnsupportedSelectorError(f"Locator strategy '{by}' is not supported on snapshots")
+
+
+class DOMSnapshot:
+    """Serialised copy of one page subtree, taken with a single execute_script call."""
+
+    def __init__(self, root: SnapshotElement, root_selector: str):
+        self.root = root
+        self.root_selector = root_selector
+
+    @classmethod
+    def capture(cls, selenium_driver, root_selector: str) -> "DOMSnapshot":
+        """
+        Input:
+            - selenium_driver: SeleniumDriver (or raw WebDriver)
+            - root_selector: CSS selector of the subtree to serialise
+        """
+        if not root_selector:
+            raise ValueError("root_selector cannot be empty")
+
+        web_driver = selenium_driver.driver if hasattr(selenium_driver, "driver") else selenium_driver
+        increment("webdriver_lookups", call="snapshot")
+        try:
+            data = web_driver.execute_script(SNAPSHOT_SCRIPT, root_selector)
+        except Exception as e:
+            raise RuntimeError(f"Failed to capture DOM snapshot under '{root_selector}': {type(e).__name__}: {e}")
+
+        if data is None:
+            raise NoSuchElementException(f"Snapshot root not found: {root_selector}")
+        return cls(SnapshotElement.from_dict(data), root_selector)
+
+
+def generate_snapshot_selector(element: SnapshotElement) -> str:
+    """Same output as utils.generate_selector_from_webelement, computed locally."""
+    return format_selector(element.tag_name, element.attributes)
+
+
+def format_selector(tag: str, attributes: Dict[str, str]) -> str:
+    """tag.classes#id[attr="value"]... with the remaining attributes sorted by name."""
+    attrs = dict(attributes)
+    selector_parts = [tag.lower()]
+
+    if 'class' in attrs and attrs['class'].strip():
+        classes = attrs['class'].split()
+        selector_parts.append(''.join(f'.{cls}' for cls in classes))
+        del attrs['class']
+
+    if 'id' in attrs:
+        selector_parts.append(f"#{attrs['id']}")
+        del attrs['id']
+
+    for key, value in sorted(attrs.items()):
+        selector_parts.append(f'[{key}="{value}"]')
+
+    return ''.join(selector_parts)
+
+
+# ==================== SELECTOR PARSING ====================
+
+_XPATH_PATTERN = re.compile(r"^\.(//?)([A-Za-z][\w-]*|\*)$")
+_COMPOUND_PATTERN = re.compile(
+    r"""
+      (?P<tag>^(?:\*|[A-Za-z][\w-]*))
+    | \.(?P<cls>[\w-]+)
+    | \#(?P<id>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?
+      \]
+    """,
+    re.VERBOSE,
+)
+
+
+class _Compound:
+    __slots__ = ("tag", "ids", "classes", "attrs")
+
+    def __init__(self, tag, ids, classes, attrs):
+        self.tag = tag
+        self.ids = ids
+        self.classes = classes
+        self.attrs = attrs
+
+    def matches(self, element: SnapshotElement) -> bool:
+        if self.tag and self.tag != "*" and element.tag_name != self.tag:
+            return False
+        attributes = element.attributes
+        for element_id in self.ids:
+            if attributes.get("id") != element_id:
+                return False
+        if self.classes:
+            element_classes = element.classes
+            if any(cls not in element_classes for cls in self.classes):
+                return False
+        for name, op, expected in self.attrs:
+            actual = attributes.get(name)
+            if actual is None:
+                return False
+            if op is None:
+                continue
+            if op == "=" and actual != expected:
+                return False
+            if op == "~=" and expected not in actual.split():
+                return False
+            if op == "^=" and not (expected and actual.startswith(expected)):
+                return False
+            if op == "$=" and not (expected and actual.endswith(expected)):
+                return False
+            if op == "*=" and not (expected and expected in actual):
+                return False
+            if op == "|=" and not (actual == expected or actual.startswith(expected + "-")):
+                return False
+        return True
+
+
+def _parse_xpath(value: str) -> Tuple[str, str]:
+    match = _XPATH_PATTERN.match(value.strip())
+    if not match:
+        raise UnsupportedSelectorError(f"XPath '{value}' is not supported on snapshots (only ./tag, .//tag)")
+    return match.group(1), match.group(2).lower()
+
+
+def _parse_compound(text: str, selector: str) -> _Compound:
+    tag, ids, classes, attrs = None, [], [], []
+    position = 0
+    while position < len(text):
+        match = _COMPOUND_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise UnsupportedSelectorError(f"Unsupported CSS selector syntax in '{selector}' at '{text[position:]}'")
+        if match.group("tag") is not None:
+            tag = match.group("tag").lower()
+        elif match.group("cls") is not None:
+            classes.append(match.group("cls"))
+        elif match.group("id") is not None:
+            ids.append(match.group("id"))
+        else:
+            value = next(
+                (match.group(g) for g in ("dq", "sq", "bare") if match.group(g) is not None),
+                None,
+            )
+            attrs.append((match.group("attr").lower(), match.group("op"), value))
+        position = match.end()
+    return _Compound(tag, tuple(ids), tuple(classes), tuple(attrs))
+
+
+def _split_top_level(selector: str) -> List[List[str]]:
+    """Split into comma groups of [compound, combinator, compound, ...] tokens, respecting [...] and quotes."""
+    groups, tokens, current = [], [], []
+    quote, depth = None, 0
+
+    def flush():
+        if current:
+            tokens.append("".join(current))
+            current.clear()
+
+    for char in selector:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+            current.append(char)
+        elif char == "[":
+            depth += 1
+            current.append(char)
+        elif char == "]":
+            depth -= 1
+            current.append(char)
+        elif depth:
+            current.append(char)
+        elif char.isspace():
+            flush()
+        elif char == ">":
+            flush()
+            tokens.append(">")
+        elif char in "+~:":
+            raise UnsupportedSelectorError(f"Unsupported CSS selector syntax '{char}' in '{selector}'")
+        elif char == ",":
+            flush()
+            groups.append(tokens)
+            tokens = []
+        else:
+            current.append(char)
+
+    flush()
+    groups.append(tokens)
+    return groups
+
+
+@lru_cache(maxsize=1024)
+def _parse_selector(selector: str) -> Tuple[Tuple[Tuple[Optional[str], _Compound], ...], ...]:
+    """
+    Parse a selector list into chains of (combinator, compound); the combinator links
+    the compound to the previous one (None for the leftmost).
+    """
+    if not selector or not selector.strip():
+        raise UnsupportedSelectorError("Empty CSS selector")
+
+    chains = []
+    for tokens in _split_top_level(selector):
+        chain, combinator = [], None
+        for token in tokens:
+            if token == ">":
+                if not chain or combinator == ">":
+                    raise UnsupportedSelectorError(f"Dangling '>' in CSS selector '{selector}'")
+                combinator = ">"
+                continue
+            chain.append((combinator if chain else None, _parse_compound(token, selector)))
+            combinator = " "
+        if not chain or combinator == ">":
+            raise UnsupportedSelectorError(f"Malformed CSS selector '{selector}'")
+        chains.append(tuple(chain))
+    return tuple(chains)
+
+
+def _matches_chain(element: SnapshotElement, chain, index: int) -> bool:
+    combinator, compound = chain[index]
+    if not compound.matches(element):
+        return False
+    if index == 0:
+        return True
+
+    ancestor = element.snapshot_parent
+    if combinator == ">":
+        return ancestor is not None and _matches_chain(ancestor, chain, index - 1)
+    while ancestor is not None:
+        if _matches_chain(ancestor, chain, index - 1):
+            return True
+        ancestor = ancestor.snapshot_parent
+    return False
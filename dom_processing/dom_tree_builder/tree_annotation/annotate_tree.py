@@ -17,7 +17,8 @@ class AnnotateTree:
         caching_coordinator: CachingCoordinator, 
         schema_query: SchemaQueries,
         config_queries: ConfigQueries,
-        template_registry: TemplateRegistry
+        template_registry: TemplateRegistry,
+        root_element=None
     ) -> None:
         """
         Annotate the tree by finding web elements for target nodes.
@@ -28,8 +29,10 @@ class AnnotateTree:
             caching_coordinator: Manages landmark caching
             element_finder: Finds web elements
             schema_query: Queries schema information
+            root_element: already located (or snapshotted) root; looked up live when None
         """
-        root_element = BuildTree.get_root_web_element(driver, schema_query)
+        if root_element is None:
+            root_element = BuildTree.get_root_web_element(driver, schema_query)
         caching_coordinator.initialize_with_root(root_element)
         
         stack = [(tree_root, 'enter')]
@@ -1,7 +1,8 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Type
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Type
 
 from dom.node import BaseDOMNode, RegularNode, RootNode, TemplateNode
 from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry
@@ -14,6 +15,12 @@ _NODE_REGISTRY: Dict[str, Type[BaseDOMNode]] = {
 }
 
 
+@lru_cache(maxsize=None)
+def _accepted_params(cls: type) -> FrozenSet[str]:
+    """__init__ parameter names of a node class, read once per class."""
+    return frozenset(inspect.signature(cls.__init__).parameters) - {'self'}
+
+
 class TreeBuilderStrategy(ABC):
     
     @abstractmethod
@@ -52,13 +59,7 @@ class TreeBuilderStrategy(ABC):
         Returns:
             Filtered dictionary containing only valid parameters for the class
         """
-        # Get the __init__ signature
-        sig = inspect.signature(cls.__init__)
-        
-        # Get parameter names (excluding 'self')
-        valid_params = set(sig.parameters.keys()) - {'self'}
-        
-        # Filter kwargs to only include valid parameters
+        valid_params = _accepted_params(cls)
         return {k: v for k, v in kwargs.items() if k in valid_params}
     
     @staticmethod
@@ -83,15 +84,13 @@ class TreeBuilderStrategy(ABC):
         except KeyError:
             raise ValueError(f"Unknown node type: {node_type}")
         
-        # Combine schema_node contents with extra_kwargs
-        # But also pass schema_node itself as a parameter
-        all_kwargs = {
-            'schema_node': schema_node,  # Pass the full dict
-            **schema_node,               # Unpack for other params (tag, classes, etc.)
-            **extra_kwargs               # Runtime params (parent, etc.)
-        }
-        
-        # Filter to only valid parameters for this class
-        filtered_kwargs = TreeBuilderStrategy.filter_kwargs_for_class(cls, all_kwargs)
-       
+        # schema_node itself, then its contents (tag, classes, etc.), then runtime
+        # params (parent, etc.), keeping only what this class accepts
+        valid_params = _accepted_params(cls)
+        filtered_kwargs = {k: v for k, v in schema_node.items() if k in valid_params}
+        filtered_kwargs['schema_node'] = schema_node
+        for k, v in extra_kwargs.items():
+            if k in valid_params:
+                filtered_kwargs[k] = v
+
         return cls(**filtered_kwargs)
\ No newline at end of file
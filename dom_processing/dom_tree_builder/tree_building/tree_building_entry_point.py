@@ -5,6 +5,7 @@ from dom_processing.dom_tree_builder.caching.cache import HandleCaching
 from dom_processing.dom_tree_builder.caching.coordinators import CachingCoordinator
 from dom_processing.dom_tree_builder.caching.finders import SeleniumElementFinder
 from dom_processing.dom_tree_builder.caching.selectors import SelectorBuilder
+from dom_processing.dom_tree_builder.caching.snapshot import DOMSnapshot
 from dom_processing.dom_tree_builder.tree_building.tree_building_strategies import RepeatTreeBuilderStrategy, SimpleTreeBuilderStrategy
 from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry
 
@@ -43,12 +44,20 @@ class BuildTree:
     @staticmethod
     def get_root_web_element(
         selenium_driver: SeleniumDriver,
-        schema_queries: SchemaQueries
+        schema_queries: SchemaQueries,
+        dom_backend: str = "selenium"
     ):
-        root_selector = schema_queries.form_selector_from_schema(
-            schema_queries._schema["main_schema"],
-            schema_queries.get_invariant_characteristics(schema_queries._schema["main_schema"])
-        )
+        """
+        Root element of the schema on the live page.
+
+        With dom_backend="snapshot" the whole subtree under the root is serialised in
+        one execute_script call and the in-memory root is returned instead, so every
+        later find_element / .text / get_attribute is answered locally. An HtmlDriver
+        ("html" backend) is already in memory and goes through find_element as usual.
+        """
+        root_selector = schema_queries.get_root_selector()
+        if dom_backend == "snapshot":
+            return DOMSnapshot.capture(selenium_driver, root_selector).root
         return selenium_driver.driver.find_element(By.CSS_SELECTOR, root_selector)
 
     def build_tree(self,
@@ -74,14 +83,16 @@ class BuildTree:
 
     def build(self,driver, schema_queries,
                                 config_queries,
-                                template_registry):
+                                template_registry,
+                                root_element=None):
         caching_coordinator = self.create_caching_coordinator(
             schema_queries,
             config_queries,
             template_registry
         )
         #here we call the driver: setting up 
-        root_element = self.get_root_web_element( driver, schema_queries)
+        if root_element is None:
+            root_element = self.get_root_web_element( driver, schema_queries)
         caching_coordinator.initialize_with_root(root_element)
         strategy = self.decide_strategy(schema_queries)
 
@@ -120,12 +120,9 @@ class RepeatTreeBuilderStrategy(TreeBuilderStrategy):
         
         # Build selector - use base template without version
         # Because selector depends on template structure, not configuration
-        selector_list = template_registry.get_template_invariant_characteristics(
+        invariant_selector = template_registry.get_template_selector(
             template_name, config_queries  # No template_configuration_version_name needed for selector building
         )
-        invariant_selector = template_registry.form_template_selector(
-            template_name, selector_list
-        )
         
         count = (
             self.get_dynamic_count(caching_coordinator, invariant_selector)
@@ -282,8 +279,7 @@ class RepeatTreeBuilderStrategy(TreeBuilderStrategy):
             raise Exception("hell nah")
        
         if generate_selector_from_webelement(current_landmark) == parent_node.get_css_selector() :
-            template_invariant_characteristics=  template_registry.get_template_invariant_characteristics(template_name,config_queries)
-            template_selector = template_registry.form_template_selector(template_name,template_invariant_characteristics)
+            template_selector = template_registry.get_template_selector(template_name, config_queries)
             
             template_nodes_webelement = get_direct_children_in_range(current_landmark, range,template_selector)
             for template_node_webelement in template_nodes_webelement:
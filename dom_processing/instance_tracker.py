@@ -1,30 +1,104 @@
+import threading
 from pathlib import Path
+from typing import Iterable, Optional
 from supabase import Client
+from dom_processing.instrumentation import logger
 from dom_processing.my_scraper.models import Instance
 
 
+PRELOAD_PAGE_SIZE = 1000
+
+
 class Tracker:
     def __init__(self, supabase: Client):
         self.supabase = supabase
-        self.visited_urls = []
+        self.visited_urls = set()
+        # parallel crawl jobs share one tracker; held only around the in-memory state,
+        # never while a Supabase query runs
+        self._lock = threading.RLock()
+
+        # filled by preload(); hits are answered from memory, misses query Supabase
+        # unless the whole table was loaded
+        self.preloaded = False
+        self.preloaded_years: Optional[list[int]] = None  # None: every year
+        self.exam_ids: dict[str, int] = {}  # exam entry_page_url -> exam_id
+        self.solution_urls: set[str] = set()
+
+    def preload(self, years: Optional[Iterable[int]] = None, page_size: int = PRELOAD_PAGE_SIZE) -> None:
+        """
+        Bulk-load exam and solution entry page URLs so lookups are answered from memory.
+
+        With years, only those exams are in memory: a URL not found there is still
+        looked up in Supabase.
+
+        Input:
+            - years: only load exams of these years (None loads everything); solutions
+              are kept only when they belong to a loaded exam
+            - page_size: rows per Supabase request
+        """
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError(f"page_size must be a positive integer, got {page_size}")
+        years = sorted({int(year) for year in years}) if years else None
 
-    def check_entry_page_exists_in_exam_db(self, url: str) -> bool:
-        """Check if entry_page_url already exists in exams table."""
         try:
-            response = (
-                self.supabase
-                .table("exams")
-                .select("exam_id")
-                .eq("entry_page_url", url)
-                .limit(1)
-                .execute()
-            )
-            return bool(response.data)
+            exam_rows = self._fetch_all("exams", "exam_id, entry_page_url", "exam_id", page_size, years)
+            solution_rows = self._fetch_all("solutions", "exam_id, entry_page_url", "solution_id", page_size)
         except Exception as e:
-            raise e
+            raise RuntimeError(f"Failed to preload tracker: {type(e).__name__}: {e}")
+
+        exam_ids = {row["entry_page_url"]: row["exam_id"] for row in exam_rows if row.get("entry_page_url")}
+        loaded_exam_ids = set(exam_ids.values())
+        solution_urls = {
+            row["entry_page_url"] for row in solution_rows
+            if row.get("entry_page_url") and (years is None or row.get("exam_id") in loaded_exam_ids)
+        }
+
+        with self._lock:
+            self.exam_ids = exam_ids
+            self.solution_urls = solution_urls
+            self.preloaded_years = years
+            self.preloaded = True
+        logger.debug(f"Tracker preloaded {len(exam_ids)} exam and {len(solution_urls)} solution URLs")
+
+    def _fetch_all(
+        self, table: str, columns: str, primary_key: str, page_size: int, years: Optional[list[int]] = None
+    ) -> list[dict]:
+        """Offset paging needs a total order, so pages are sorted by the table's primary key."""
+        rows = []
+        start = 0
+        while True:
+            query = self.supabase.table(table).select(columns)
+            if years:
+                query = query.in_("year", years)
+            response = query.order(primary_key).range(start, start + page_size - 1).execute()
+            batch = response.data or []
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+            start += page_size
+
+    @property
+    def fully_preloaded(self) -> bool:
+        """Every exam and solution is in memory, so a miss means absent."""
+        return self.preloaded and self.preloaded_years is None
+
+    def check_entry_page_exists_in_exam_db(self, url: str) -> bool:
+        """Check if entry_page_url already exists in exams table."""
+        return self.get_exam_id_by_url(url) is not None
 
     def get_exam_id_by_url(self, url: str) -> int | None:
         """Fetch the exam_id for a given entry_page_url."""
+        with self._lock:
+            if self.preloaded and url in self.exam_ids:
+                return self.exam_ids[url]
+            if self.fully_preloaded:
+                return None
+        exam_id = self._query_exam_id(url)
+        if self.preloaded:
+            self.record_exam(url, exam_id)
+        return exam_id
+
+    def _query_exam_id(self, url: str) -> int | None:
         try:
             response = (
                 self.supabase
@@ -44,15 +118,26 @@ class Tracker:
         return instance.documents.exam_path.is_file()
 
     def check_solution_file_exists_local_db(self, instance: Instance) -> bool:
-        
+
         return instance.documents.solution_path.is_file()
 
     def check_entry_page_exists_in_solution_db(self, url: str) -> bool:
-        """Check if entry_page_url already exists in solution table."""
+        """Check if entry_page_url already exists in solutions table."""
+        with self._lock:
+            if self.preloaded and url in self.solution_urls:
+                return True
+            if self.fully_preloaded:
+                return False
+        exists = self._query_solution_exists(url)
+        if exists and self.preloaded:
+            self.record_solution(url)
+        return exists
+
+    def _query_solution_exists(self, url: str) -> bool:
         try:
             response = (
                 self.supabase
-                .table("solution")
+                .table("solutions")
                 .select("solution_id")
                 .eq("entry_page_url", url)
                 .limit(1)
@@ -62,12 +147,27 @@ class Tracker:
         except Exception as e:
             raise e
 
+    def record_exam(self, url: str, exam_id: int) -> None:
+        """Write-through after an exam insert, so the preloaded index stays current."""
+        if url and exam_id is not None:
+            with self._lock:
+                self.exam_ids[url] = exam_id
+
+    def record_solution(self, url: str) -> None:
+        """Write-through after a solution insert."""
+        if url:
+            with self._lock:
+                self.solution_urls.add(url)
+
     def check_entry_page_exists_in_visited_urls(self, url: str) -> bool:
-        return url in self.visited_urls
+        with self._lock:
+            return url in self.visited_urls
 
     def add_exam_entry_page_to_visited_urls(self, url: str) -> None:
         """Add newly inserted exam to cache to avoid re-scraping."""
-        self.visited_urls.append(url)
+        with self._lock:
+            self.visited_urls.add(url)
 
     def add_solution_entry_page_to_visited_urls(self, url: str) -> None:
-        self.visited_urls.append(url)
\ No newline at end of file
+        with self._lock:
+            self.visited_urls.add(url)
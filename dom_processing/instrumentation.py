@@ -0,0 +1,206 @@
+"""
+Timing spans, counters and the scraper logger.
+
+    with span("page_download", state="exam"):
+        ...
+    increment("bytes_downloaded", len(content))
+
+Spans and counters are aggregated in memory per (name, labels) and written out
+by export_metrics(): JSON lines by default, Prometheus text format when the
+path ends in .prom. LOG_LEVEL controls the logger (DEBUG shows the old debug
+output); METRICS_PATH sets where run() exports to.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+logger = logging.getLogger("cee_scraper")
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Set the scraper logger from level or LOG_LEVEL (default INFO)."""
+    level_name = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    numeric_level = logging.getLevelName(level_name)
+    if not isinstance(numeric_level, int):
+        raise ValueError(f"Unknown log level '{level_name}'")
+
+    logger.setLevel(numeric_level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+class SpanStats:
+    """Aggregate of every finished span with one name and label set."""
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float, failed: bool) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+class Metrics:
+    """Thread-safe span and counter registry."""
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        Input:
+            - clock: monotonic time source (injected for testing)
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._spans: Dict[LabelKey, SpanStats] = {}
+        self._counters: Dict[LabelKey, float] = {}
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[None]:
+        """Time the block; a raised exception is counted as an error and re-raised."""
+        started = self._clock()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = self._clock() - started
+            key = _key(name, labels)
+            with self._lock:
+                stats = self._spans.get(key)
+                if stats is None:
+                    stats = self._spans[key] = SpanStats()
+                stats.add(elapsed, failed)
+            logger.debug("span %s%s took %.3fs%s", name, _format_labels(labels), elapsed, " (failed)" if failed else "")
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def span_stats(self, name: str, **labels) -> Optional[SpanStats]:
+        with self._lock:
+            return self._spans.get(_key(name, labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    # ==================== EXPORT ====================
+
+    def to_records(self) -> list:
+        """One dict per span series / counter series."""
+        with self._lock:
+            spans = list(self._spans.items())
+            counters = list(self._counters.items())
+
+        records = []
+        for (name, labels), stats in sorted(spans):
+            records.append({
+                "type": "span", "name": name, "labels": dict(labels),
+                "count": stats.count, "errors": stats.errors,
+                "total_seconds": round(stats.total_seconds, 6), "max_seconds": round(stats.max_seconds, 6),
+            })
+        for (name, labels), value in sorted(counters):
+            records.append({"type": "counter", "name": name, "labels": dict(labels), "value": value})
+        return records
+
+    def to_json_lines(self) -> str:
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.to_records())
+
+    def to_prometheus(self, prefix: str = "cee_scraper") -> str:
+        lines = []
+        declared = set()
+        for record in self.to_records():
+            labels = record["labels"]
+            if record["type"] == "span":
+                base = f"{prefix}_{record['name']}_seconds"
+                if base not in declared:
+                    lines.append(f"# TYPE {base} summary")
+                    declared.add(base)
+                lines.append(f"{base}_count{_prometheus_labels(labels)} {record['count']}")
+                lines.append(f"{base}_sum{_prometheus_labels(labels)} {record['total_seconds']}")
+                lines.append(f"{prefix}_{record['name']}_errors_total{_prometheus_labels(labels)} {record['errors']}")
+            else:
+                base = f"{prefix}_{record['name']}_total"
+                if base not in declared:
+                    lines.append(f"# TYPE {base} counter")
+                    declared.add(base)
+                lines.append(f"{base}{_prometheus_labels(labels)} {record['value']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """Write a snapshot to path: Prometheus text for *.prom, JSON lines otherwise."""
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json_lines()
+        target = Path(path)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(target.name + ".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, target)
+        except Exception as e:
+            raise RuntimeError(f"Failed to export metrics to '{path}': {type(e).__name__}: {e}")
+
+
+def _key(name: str, labels: dict) -> LabelKey:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ", ".join(f"{key}={value}" for key, value in sorted(labels.items())) + "}"
+
+
+def _prometheus_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in sorted(labels.items())
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+# process-wide registry used by the scraper modules
+METRICS = Metrics()
+
+
+def span(name: str, **labels):
+    return METRICS.span(name, **labels)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    METRICS.increment(name, value, **labels)
+
+
+def export_metrics(path: Optional[str] = None) -> Optional[str]:
+    """Export METRICS to path or METRICS_PATH; does nothing when neither is set."""
+    path = path or os.getenv("METRICS_PATH")
+    if not path:
+        return None
+    METRICS.export(path)
+    return path
@@ -97,6 +97,8 @@ class TemplateRegistry:
         Input: templates (dict) - Template definitions
         """
         self._templates = templates
+        # template_name -> (config_queries, selector); see get_template_selector
+        self._selector_cache: Dict[str, tuple] = {}
     
     def get_template_schema(self, template_name: str) -> Dict:
         """
@@ -211,6 +213,22 @@ class TemplateRegistry:
         
         return selector
 
+    def get_template_selector(self, template_name: str, template_config) -> str:
+        """
+        Input: template_name (str), template_config (ConfigQueries)
+        Functionality: Invariant-characteristics selector of a template, built once per
+            template and configuration and then served from memory
+        Output: str - CSS selector
+        """
+        cached = self._selector_cache.get(template_name)
+        if cached is not None and cached[0] is template_config:
+            return cached[1]
+
+        invariant_chars = self.get_template_invariant_characteristics(template_name, template_config)
+        selector = self.form_template_selector(template_name, invariant_chars)
+        self._selector_cache[template_name] = (template_config, selector)
+        return selector
+
 
 
 class ConfigQueries:
@@ -367,6 +385,22 @@ class SchemaQueries:
         this takes in the entire schema, and the methods operat on schema_nodes
         """
         self._schema = schema
+        self._root_selector: Optional[str] = None
+        self.compiled = None  # CompiledSchema, see attach_compiled
+
+    def attach_compiled(self, compiled) -> None:
+        """
+        Input: compiled (CompiledSchema) - flags from schema_compiler.compile_schema for this schema
+        Functionality: Answer the per-node checks from the precomputed flags; nodes that
+            weren't compiled fall back to reading the dict
+        Output: None
+        """
+        self.compiled = compiled
+
+    def _compiled_node(self, schema_node: Dict):
+        if self.compiled is None:
+            return None
+        return self.compiled.lookup(schema_node)
     
     def get_repeat_info(self, schema_node: Dict) -> Optional[Dict]:
         """
@@ -411,6 +445,9 @@ class SchemaQueries:
         Functionality: Check if root schema or any descendant has repeat block
         Output: bool
         """
+        if self.compiled is not None:
+            return self.compiled.has_repeat
+
         current = self._schema.get("main_schema")
         stk = Stack()
         stk.push(current)
@@ -441,10 +478,15 @@ class SchemaQueries:
         Functionality: Check if this specific schema node contains repeat block
         Output: bool
         """
+        compiled = self._compiled_node(schema_node)
+        if compiled is not None:
+            return compiled.has_repeat
         return "repeat" in schema_node
     
     def has_conditional(self, schema_node: Dict) -> bool:
-
+        compiled = self._compiled_node(schema_node)
+        if compiled is not None:
+            return compiled.has_conditional
         return "conditional" in schema_node
     
 
@@ -457,6 +499,9 @@ class SchemaQueries:
         Functionality: Check if schema has children array
         Output: bool
         """
+        compiled = self._compiled_node(schema_node)
+        if compiled is not None:
+            return compiled.has_children
         children = schema_node.get("children", [])
         return isinstance(children, list) and len(children) > 0
     
@@ -474,6 +519,9 @@ class SchemaQueries:
         Functionality: Check if node is a landmark element for caching
         Output: bool
         """
+        compiled = self._compiled_node(schema_node)
+        if compiled is not None:
+            return compiled.is_landmark
         annotation = schema_node.get("annotation","")
         
         if annotation:
@@ -488,6 +536,9 @@ class SchemaQueries:
         Functionality: Check if node is a target element 
         Output: bool
         """
+        compiled = self._compiled_node(schema_node)
+        if compiled is not None:
+            return compiled.is_target
         annotation = schema_node.get("annotation","")
 
         if annotation:
@@ -580,6 +631,19 @@ class SchemaQueries:
                         selector += f"[{char}='{value}']"
 
         return selector
+
+    def get_root_selector(self) -> str:
+        """
+        Input: None
+        Functionality: Selector of the main schema root, built once
+        Output: str
+        """
+        if self._root_selector is None:
+            main_schema = self._schema["main_schema"]
+            self._root_selector = self.form_selector_from_schema(
+                main_schema, self.get_invariant_characteristics(main_schema)
+            )
+        return self._root_selector
     
 
 
@@ -0,0 +1,284 @@
+"""
+Multi-year crawl driver.
+
+gaokao_links.json maps each year to one index URL (or a list of them). Every URL
+becomes a CrawlJob whose status is kept in a local SQLite ledger, so a crashed
+backfill resumes with the jobs that were not finished instead of from scratch.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from dom_processing.instrumentation import logger
+
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+JOB_STATUSES = (PENDING, IN_PROGRESS, DONE, FAILED)
+
+
+@dataclass
+class CrawlJob:
+    """One index page of one year."""
+    job_id: str
+    year: str
+    url: str
+    status: str = PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+
+def expand_links(links: Dict[str, object]) -> List[CrawlJob]:
+    """
+    Turn {"2015": [url_a, url_b], "2014": url} into jobs, newest year first.
+
+    Years with several URLs get ids "<year>-1", "<year>-2", ... so the ledger
+    keeps them apart; ids depend only on position, so reruns map onto the same rows.
+    """
+    if not isinstance(links, dict):
+        raise ValueError(f"links must be a dict of year -> url(s), got {type(links).__name__}")
+
+    jobs = []
+    for year in sorted(links, reverse=True):
+        urls = links[year]
+        if isinstance(urls, str):
+            jobs.append(CrawlJob(job_id=str(year), year=str(year), url=urls))
+        elif isinstance(urls, list):
+            for i, url in enumerate(urls, 1):
+                jobs.append(CrawlJob(job_id=f"{year}-{i}", year=str(year), url=url))
+        else:
+            raise ValueError(f"Year {year}: expected a URL or a list of URLs, got {type(urls).__name__}")
+
+    for job in jobs:
+        if not job.url:
+            raise ValueError(f"Empty URL for crawl job {job.job_id}")
+    return jobs
+
+
+def load_links(path: str) -> List[CrawlJob]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            links = json.load(f)
+    except Exception as e:
+        raise RuntimeError(f"Failed to load crawl links from '{path}': {type(e).__name__}: {e}")
+    return expand_links(links)
+
+
+class CrawlLedger:
+    """SQLite table of crawl jobs and their status."""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        """
+        Input:
+            - path: SQLite file (":memory:" for tests)
+            - clock: time source for updated_at (injected for testing)
+        """
+        if not path:
+            raise ValueError("path cannot be empty")
+
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        try:
+            # crawl workers share one connection, serialised by self._lock
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS crawl_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    year TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_crawl_jobs_status ON crawl_jobs(status);
+                """
+            )
+            self._conn.commit()
+        except Exception as e:
+            raise RuntimeError(f"Failed to open crawl ledger at '{path}': {type(e).__name__}: {e}")
+
+    def register(self, jobs: List[CrawlJob]) -> None:
+        """Add jobs not seen before; existing rows keep their status. A changed URL resets the job."""
+        with self._lock:
+            for job in jobs:
+                row = self._conn.execute("SELECT url FROM crawl_jobs WHERE job_id = ?", (job.job_id,)).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO crawl_jobs (job_id, year, url, status, attempts, updated_at) VALUES (?, ?, ?, ?, 0, ?)",
+                        (job.job_id, job.year, job.url, PENDING, self._clock()),
+                    )
+                elif row[0] != job.url:
+                    self._conn.execute(
+                        "UPDATE crawl_jobs SET url = ?, status = ?, attempts = 0, last_error = NULL, updated_at = ? "
+                        "WHERE job_id = ?",
+                        (job.url, PENDING, self._clock(), job.job_id),
+                    )
+            self._conn.commit()
+
+    def recover(self, max_attempts: int) -> int:
+        """
+        Make jobs runnable again after a crash or an earlier failed run.
+
+        in_progress jobs (the process died mid-job) and failed jobs with attempts
+        left go back to pending.
+
+        Returns:
+            int: number of jobs requeued
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE crawl_jobs SET status = ?, updated_at = ? "
+                "WHERE status = ? OR (status = ? AND attempts < ?)",
+                (PENDING, self._clock(), IN_PROGRESS, FAILED, max_attempts),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def claim_next(self) -> Optional[CrawlJob]:
+        """Move the newest pending job to in_progress and return it, or None when none is left."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, year, url, status, attempts, last_error FROM crawl_jobs "
+                "WHERE status = ? ORDER BY year DESC, job_id ASC LIMIT 1",
+                (PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            job = CrawlJob(*row)
+            job.status = IN_PROGRESS
+            job.attempts += 1
+            self._conn.execute(
+                "UPDATE crawl_jobs SET status = ?, attempts = ?, updated_at = ? WHERE job_id = ?",
+                (IN_PROGRESS, job.attempts, self._clock(), job.job_id),
+            )
+            self._conn.commit()
+            return job
+
+    def mark_done(self, job_id: str) -> None:
+        self._set_status(job_id, DONE, None)
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._set_status(job_id, FAILED, error)
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, year, url, status, attempts, last_error FROM crawl_jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return CrawlJob(*row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status (every status present, zero if unused)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM crawl_jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _set_status(self, job_id: str, status: str, error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE crawl_jobs SET status = ?, last_error = ?, updated_at = ? WHERE job_id = ?",
+                (status, error, self._clock(), job_id),
+            )
+            self._conn.commit()
+
+
+class CrawlManager:
+    """Runs the ledger's pending jobs on a bounded number of worker threads."""
+
+    def __init__(
+        self,
+        ledger: CrawlLedger,
+        run_job: Callable[[CrawlJob], None],
+        workers: int = 1,
+        max_attempts: int = 3,
+    ):
+        """
+        Input:
+            - ledger: job state store
+            - run_job: crawls one job; raising marks the job failed
+            - workers: jobs crawled at the same time (each one runs its own browsers)
+            - max_attempts: runs per job before a failure is left alone by recover()
+        """
+        if not ledger:
+            raise ValueError("ledger cannot be None")
+        if not callable(run_job):
+            raise ValueError("run_job must be callable")
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError(f"workers must be a positive integer, got {workers}")
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError(f"max_attempts must be a positive integer, got {max_attempts}")
+
+        self.ledger = ledger
+        self.run_job = run_job
+        self.workers = workers
+        self.max_attempts = max_attempts
+
+    def run(self, jobs: List[CrawlJob]) -> Dict[str, int]:
+        """
+        Register jobs, requeue interrupted/failed ones and crawl until nothing is pending.
+
+        Returns:
+            dict: job counts per status after the run
+        """
+        self.ledger.register(jobs)
+        requeued = self.ledger.recover(self.max_attempts)
+        if requeued:
+            logger.debug(f"Requeued {requeued} unfinished crawl job(s)")
+
+        threads = [
+            threading.Thread(target=self._worker, name=f"crawl-worker-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counts = self.ledger.counts()
+        logger.debug(f"Crawl finished: {counts}")
+        return counts
+
+    def _worker(self) -> None:
+        while True:
+            try:
+                job = self.ledger.claim_next()
+            except Exception as e:
+                print(f"Error: Failed to claim crawl job: {type(e).__name__}: {e}")
+                return
+            if job is None:
+                return
+
+            logger.debug(f"Crawling {job.job_id} ({job.url}), attempt {job.attempts}/{self.max_attempts}")
+            try:
+                self.run_job(job)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"Error: Crawl job {job.job_id} failed: {error}")
+                self._record(self.ledger.mark_failed, job.job_id, error)
+                continue
+            self._record(self.ledger.mark_done, job.job_id)
+
+    @staticmethod
+    def _record(mark, *args) -> None:
+        try:
+            mark(*args)
+        except Exception as e:
+            print(f"Warning: Failed to update crawl ledger for {args[0]}: {type(e).__name__}: {e}")
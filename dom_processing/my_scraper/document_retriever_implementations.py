@@ -1,9 +1,14 @@
 
+import os
 from pathlib import Path
+from typing import Optional
+
+from dom_processing.instrumentation import logger
 from dom_processing.my_scraper.interfaces import DocumentRetriever
 from dom_processing.my_scraper.interfaces_implementations import ChineseContentTransformer, ChineseDriverOperations, ChineseImageURLPattern
-from dom_processing.my_scraper.models import Instance
+from dom_processing.my_scraper.models import DocumentPlan, Instance
 from dom_processing.my_scraper.services import MetadataProcessing, PDFConverter, PageDownloader
+from dom_processing.my_scraper.url_patterns import PagePatternEngine, UrlProber
 
 
 class ChineseDirectLinkDocumentRetriever(DocumentRetriever):
@@ -19,15 +24,15 @@ class ChineseDirectLinkDocumentRetriever(DocumentRetriever):
         except Exception as e:
             raise RuntimeError(f"Failed to initialize ChineseDirectLinkDocumentRetriever: {type(e).__name__}: {e}")
         
-    def construct_document(
+    def plan_document(
         self,
         doc_nodes,  # Can be a single node or list of nodes
         root_node,
         instance: Instance,
         state,
         driver,
-    ) -> Path:
-        """Construct document by downloading and converting to PDF.
+    ) -> DocumentPlan:
+        """Read the page image URLs and prepare the save directory.
         
         Args:
             doc_nodes: Single DOM node or list of nodes containing document links
@@ -37,7 +42,7 @@ class ChineseDirectLinkDocumentRetriever(DocumentRetriever):
             driver: Selenium driver for JavaScript execution
             
         Returns:
-            Path to saved document
+            DocumentPlan for download_document / convert_document
         """
         # Validate inputs
         if not doc_nodes:
@@ -85,19 +90,9 @@ class ChineseDirectLinkDocumentRetriever(DocumentRetriever):
         except Exception as e:
             raise RuntimeError(f"Failed to create directory '{save_path}': {e}")
         
-        # Initialize session and user agents once
-        try:
-            session = self.page_downloader._create_session_with_retry()
-        except Exception as e:
-            raise RuntimeError(f"Failed to create HTTP session: {type(e).__name__}: {e}")
-        
-        try:
-            user_agents = self.page_downloader._get_user_agent_pool()
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize user-agent pool: {type(e).__name__}: {e}")
-        
-        # Download all pages
+        # Collect page URLs; they are downloaded together in download_document
         document_urls= []
+        page_indices = []
         for i, target_node in enumerate(reversed(doc_nodes),start=1):
             # Validate node structure
             if not hasattr(target_node, 'target_types'):
@@ -120,32 +115,57 @@ class ChineseDirectLinkDocumentRetriever(DocumentRetriever):
                 try:
                     image_url = self.image_patterns.get_raw_url(target_node)
                     document_urls.append(image_url)
+                    page_indices.append(i)
                 except Exception as e:
                     raise RuntimeError(f"Failed to get raw URL from node {i}: {e}")
-                
-                # Download page
-                try: 
-                    self.page_downloader.download_single_page(
-                        index=i,
-                        url=image_url,
-                        session=session,
-                        user_agents=user_agents,
-                        save_path=save_path,
-                        metadata=processed_metadata,
-                        state=state,
-                    )
-                except Exception as e:
-                    raise RuntimeError(f"Failed to download page {i} from {image_url}: {e}")
+
+        return DocumentPlan(
+            state=state,
+            save_path=save_path,
+            metadata=processed_metadata,
+            page_urls=document_urls,
+            page_indices=page_indices,
+        )
+
+    def download_document(self, plan: DocumentPlan) -> None:
+        """Download every planned page; any page that could not be saved fails the document."""
+        try:
+            session = self.page_downloader._create_session_with_retry()
+        except Exception as e:
+            raise RuntimeError(f"Failed to create HTTP session: {type(e).__name__}: {e}")
         
-        # Convert all downloaded images to PDF
         try:
-            self.pdf_converter.convert_document_pdf(str(save_path))
+            user_agents = self.page_downloader._get_user_agent_pool()
+        except Exception as e:
+            raise RuntimeError(f"Failed to initialize user-agent pool: {type(e).__name__}: {e}")
+
+        try:
+            failures = self.page_downloader.download_indexed_pages(
+                indexed_urls=list(zip(plan.page_indices, plan.page_urls)),
+                session=session,
+                user_agents=user_agents,
+                save_path=plan.save_path,
+                metadata=plan.metadata,
+                state=plan.state,
+            )
+        finally:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"Warning: Failed to close HTTP session: {e}")
+
+        if failures:
+            i, image_url, error = failures[0]
+            raise RuntimeError(f"Failed to download page {i} from {image_url}: {error}")
+
+    def convert_document(self, plan: DocumentPlan) -> None:
+        """Convert all downloaded images to PDF."""
+        try:
+            self.pdf_converter.convert_document_pdf(str(plan.save_path))
         except Exception as e:
             raise RuntimeError(
-                f"Failed to convert images to PDF in '{save_path}' (state={state}): {e}"
+                f"Failed to convert images to PDF in '{plan.save_path}' (state={plan.state}): {e}"
             )
-        
-        return save_path, document_urls
             
 
 
@@ -162,18 +182,19 @@ class ChineseReferenceBasedDocumentRetriever(DocumentRetriever):
             self.page_downloader = PageDownloader()
             self.pdf_converter = PDFConverter()
             self.content_transformer = ChineseContentTransformer()
+            self.page_patterns = PagePatternEngine(self._create_url_prober())
         except Exception as e:
             raise RuntimeError(f"Failed to initialize ChineseReferenceBasedDocumentRetriever: {type(e).__name__}: {e}")
 
-    def construct_document(
+    def plan_document(
     self,
     download_node,
     root_node,
     instance: Instance,
     state,
     driver,
-) -> Path:
-        """Construct document by downloading and converting to PDF.
+) -> DocumentPlan:
+        """Derive every page image URL from the first one and the page count.
         
         Args:
             download_node: DOM node containing document link
@@ -183,7 +204,7 @@ class ChineseReferenceBasedDocumentRetriever(DocumentRetriever):
             driver: Selenium driver for JavaScript execution
             
         Returns:
-            Path to saved document
+            DocumentPlan for download_document / convert_document
         """
         # Validate inputs
         if not download_node:
@@ -204,8 +225,8 @@ class ChineseReferenceBasedDocumentRetriever(DocumentRetriever):
         if not download_node.target_types:
             raise ValueError("download_node.target_types is empty")
 
-        if not isinstance(download_node.target_types, list):
-            raise TypeError(f"target_types must be a list, got {type(download_node.target_types).__name__}")
+        if not isinstance(download_node.target_types, (list, tuple)):
+            raise TypeError(f"target_types must be a list or tuple, got {type(download_node.target_types).__name__}")
         
         # Check first target type ends with "_url"
         if not any(t.endswith("_url") for t in download_node.target_types):
@@ -252,69 +273,64 @@ class ChineseReferenceBasedDocumentRetriever(DocumentRetriever):
         except Exception as e:
             raise RuntimeError(f"Failed to get raw URL from download node (state={state}): {e}")
         
-        try:
-            suffix, start_index = self.image_patterns.extract_url_info(image_url_example)
-        except Exception as e:
-            raise RuntimeError(f"Failed to extract URL info from '{image_url_example}' (state={state}): {e}")
-
-        try:
-            extension = image_url_example.split('.')[-1]  # Gets "png" or "jpg"
-            print(f"DEBUG: Detected extension: {extension}")
-        except Exception as e:
-            extension = "png"  # Default fallback
-            print(f"DEBUG: Could not detect extension, using default: {extension}")
-
-        try:
-            base_url = self.image_patterns.get_url_base(image_url_example)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get base URL from '{image_url_example}' (state={state}): {e}")
-
         # Get page count from driver
         try:
             page_count = self.driver_ops.get_page_count(driver)
-            print(f"DEBUG: Retrieved page_count={page_count} for state={state}")
+            logger.debug(f"Retrieved page_count={page_count} for state={state}")
         except Exception as e:
             raise RuntimeError(f"Failed to get page count from driver (state={state}): {e}")
 
-        # Build all image URLs
+        # Infer the numbering scheme from the sample and check it against the server
         try:
-            start_index_int = int(start_index)
-            all_images_urls = self.image_patterns.build_image_urls(
-                suffix=suffix,
-                start_index=start_index_int,
-                base_url=base_url,
-                page_count=page_count,
-                extension=extension
+            pages = self.page_patterns.resolve(image_url_example, page_count)
+            all_images_urls = pages.urls
+            logger.debug(
+                f"Resolved {len(all_images_urls)} image URLs for state={state} "
+                f"({'verified' if pages.verified else 'unverified'}, page_count={page_count})"
             )
-            print(f"DEBUG: Built {len(all_images_urls)} image URLs for state={state} (pages {start_index_int} to {page_count})")
         except Exception as e:
             raise RuntimeError(
-                f"Failed to build image URLs (suffix={suffix}, start={start_index}, "
-                f"base={base_url}, count={page_count}, state={state}): {e}"
+                f"Failed to build image URLs (sample={image_url_example}, count={page_count}, state={state}): {e}"
             )
 
-        # Prepare metadata for download
+        return DocumentPlan(
+            state=state,
+            save_path=save_path,
+            metadata=processed_metadata,
+            page_urls=all_images_urls,
+            page_indices=list(range(1, len(all_images_urls) + 1)),
+        )
 
-        
-        # Download all pages
+    def _create_url_prober(self) -> Optional[UrlProber]:
+        """HEAD-probe inferred page URLs unless VERIFY_PAGE_URLS=0; shares the downloader's host rate limit."""
+        if os.getenv("VERIFY_PAGE_URLS", "1").lower() in ("0", "false", "no"):
+            return None
+        page_cache = self.page_downloader.page_cache
+        return UrlProber(
+            rate_limiter=self.page_downloader.rate_limiter,
+            max_workers=self.page_downloader.max_workers,
+            offline=page_cache is not None and page_cache.offline,
+        )
+
+    def download_document(self, plan: DocumentPlan) -> None:
+        """Download all pages; pages that fail are replaced by blank fallbacks."""
         try:
             self.page_downloader.download_document_pages(
-                save_path=save_path,
-                page_urls=all_images_urls,
-                metadata=processed_metadata,
-                state=state
+                save_path=plan.save_path,
+                page_urls=plan.page_urls,
+                metadata=plan.metadata,
+                state=plan.state
             )
         except Exception as e:
             raise RuntimeError(
-                f"Failed to download document pages to '{save_path}' (state={state}): {e}"
+                f"Failed to download document pages to '{plan.save_path}' (state={plan.state}): {e}"
             )
 
-        # Convert to PDF
+    def convert_document(self, plan: DocumentPlan) -> None:
+        """Convert all downloaded images to PDF."""
         try:
-            self.pdf_converter.convert_document_pdf(str(save_path))
+            self.pdf_converter.convert_document_pdf(str(plan.save_path))
         except Exception as e:
             raise RuntimeError(
-                f"Failed to convert images to PDF in '{save_path}' (state={state}): {e}"
+                f"Failed to convert images to PDF in '{plan.save_path}' (state={plan.state}): {e}"
             )
-        
-        return save_path, all_images_urls
\ No newline at end of file
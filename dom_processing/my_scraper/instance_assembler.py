@@ -6,7 +6,10 @@ from dom_processing.my_scraper.document_retriever_implementations import (
     ChineseDirectLinkDocumentRetriever, 
     ChineseReferenceBasedDocumentRetriever
 )
-from .models import Instance
+from typing import Optional
+
+from dom_processing.instrumentation import span
+from .models import DocumentPlan, Instance
 from .interfaces import TextParser, DocumentRetriever
 
 
@@ -137,49 +140,26 @@ class InstanceAssembler:
         if not driver:
             raise ValueError("driver cannot be None")
         
-        for i, target_node in enumerate(nodes):
+        # every metadata node of the page in one batch (one text round trip)
+        try:
+            batch = text_parser.get_metadata_values(nodes, driver)
+        except Exception as e:
+            raise RuntimeError(f"Failed to extract metadata values: {type(e).__name__}: {e}")
+
+        for target_type, messages in batch.errors.items():
+            for message in messages:
+                print(f"Warning: Failed to parse metadata for target_type '{target_type}': {message}")
+
+        for metadata_type, values in batch.columns.items():
+            if not hasattr(instance.metadata, metadata_type):
+                print(f"Warning: Instance metadata has no attribute '{metadata_type}', skipping")
+                continue
+            
             try:
-                if not hasattr(target_node, 'target_types'):
-                    print(f"Warning: Metadata node {i} missing 'target_types' attribute, skipping")
-                    continue
-                
-                if not target_node.target_types:
-                    continue
-                
-                for target_type in target_node.target_types:
-                    if not isinstance(target_type, str):
-                        print(f"Warning: target_type is not a string (got {type(target_type).__name__}), skipping")
-                        continue
-                    
-                    if target_type.endswith("_url"):
-                        continue  # Skip URL types in metadata processing
-                    
-                    try:
-                        metadata_type, metadata_val = text_parser.get_metadata_value(
-                            target_node, target_type, driver
-                        )
-                    except Exception as e:
-                        print(f"Warning: Failed to parse metadata for target_type '{target_type}' "
-                                f"from node {i}: {type(e).__name__}: {e}")
-                        continue
-                    
-                    if not metadata_type:
-                        print(f"Warning: Empty metadata_type returned for target_type '{target_type}' from node {i}")
-                        continue
-                    
-                    if not hasattr(instance.metadata, metadata_type):
-                        print(f"Warning: Instance metadata has no attribute '{metadata_type}', skipping")
-                        continue
-                    
-                    try:
-                        setattr(instance.metadata, metadata_type, metadata_val)
-                    except Exception as e:
-                        print(f"Warning: Failed to set instance.metadata.{metadata_type} = {metadata_val}: "
-                                f"{type(e).__name__}: {e}")
-                        continue
+                setattr(instance.metadata, metadata_type, values[-1])  # later nodes win, as before
             except Exception as e:
-                print(f"Warning: Error processing metadata node {i}: {type(e).__name__}: {e}")
-                continue
+                print(f"Warning: Failed to set instance.metadata.{metadata_type} = {values[-1]}: "
+                        f"{type(e).__name__}: {e}")
 
     def _get_classified_nodes(self, root_node):
         """Helper to find and classify nodes."""
@@ -215,14 +195,32 @@ class InstanceAssembler:
             return
         
         try:
-            self._set_instance_metadata_attributes(
-                instance, meta_nodes, self.text_parser, root_node, driver
-            )
+            with span("metadata_extraction"):
+                self._set_instance_metadata_attributes(
+                    instance, meta_nodes, self.text_parser, root_node, driver
+                )
         except Exception as e:
             raise RuntimeError(f"Failed to set instance metadata attributes: {e}")
 
     def set_instance_document_attributes(self, root_node, instance: Instance, state, driver):
         """Extract and set document attributes on instance using appropriate retrieval technique."""
+        plan = self.plan_instance_document(root_node, instance, state, driver)
+        if plan is None:
+            return
+
+        try:
+            document_path, document_urls = self.document_retriever.build_document(plan)
+        except Exception as e:
+            raise RuntimeError(f"Document construction failed for {state}: {e}")
+
+        self.record_document(instance, state, document_path, document_urls)
+
+    def plan_instance_document(self, root_node, instance: Instance, state, driver) -> Optional[DocumentPlan]:
+        """Read the document's page URLs from the annotated tree; nothing is downloaded yet.
+
+        Returns:
+            DocumentPlan, or None when the tree has no document nodes
+        """
         # Validate inputs
         if not root_node:
             raise ValueError("root_node cannot be None")
@@ -241,65 +239,29 @@ class InstanceAssembler:
         
         if not doc_nodes:
             print(f"Warning: No document nodes found in DOM tree (state={state})")
-            return
-        
+            return None
         
         # Use appropriate retrieval technique based on document retriever type
         if isinstance(self.document_retriever, ChineseReferenceBasedDocumentRetriever):
-            self._set_reference_based_document(doc_nodes, root_node, instance, state, driver)
+            download_node = doc_nodes[0]  # reference-based: first node only
         elif isinstance(self.document_retriever, ChineseDirectLinkDocumentRetriever):
-            self._set_direct_link_document(doc_nodes, root_node, instance, state, driver)
+            download_node = doc_nodes  # direct-link: every node
         else:
             raise TypeError(f"Unknown document retriever type: {type(self.document_retriever).__name__}")
 
-    def _set_reference_based_document(self, doc_nodes, root_node, instance, state, driver):
-        """Handle reference-based document retrieval (uses first node only)."""
-        
-        target_node = doc_nodes[0]
-
-        document_path_type = "exam_path" if state == "exam" else "solution_path"
-        document_urls_type = "exam_urls" if state == "exam" else "solution_urls"
-        document_page_count_type = "exam_page_count" if state == "exam" else "solution_page_count"
-
         try:
-            document_path, document_urls = self.document_retriever.construct_document(
-                target_node, root_node, instance, state, driver
+            return self.document_retriever.plan_document(
+                download_node, root_node, instance, state, driver
             )
         except Exception as e:
             raise RuntimeError(f"Document construction failed for {state}: {e}")
-        
-        if not document_path:
-            raise RuntimeError(f"Empty document_path returned for {state}")
-        if not document_urls:
-            raise RuntimeError(f"Empty document_urls returned for {state}")
-        
-        
-        try:
-            setattr(instance.documents, document_path_type, document_path)
-        except Exception as e:
-            raise RuntimeError(f"Failed to set instance.documents.{document_path}: {e}")
-        try:
-            setattr(instance.documents, document_urls_type, document_urls)
-        except Exception as e:
-            raise RuntimeError(f"Failed to set instance.documents.{document_urls_type}: {e}")
-        try: 
-            setattr(instance.documents, document_page_count_type, len(document_urls))
-        except Exception as e:
-            raise RuntimeError(f"Failed to set instance.documents.{document_page_count_type}: {e}")
 
-    def _set_direct_link_document(self, doc_nodes, root_node, instance, state, driver):
-        """Handle direct-link document retrieval (processes all nodes)."""
+    def record_document(self, instance: Instance, state, document_path, document_urls) -> None:
+        """Store a built document's path, page URLs and page count on the instance."""
         document_path_type = "exam_path" if state == "exam" else "solution_path"
         document_urls_type = "exam_urls" if state == "exam" else "solution_urls"
         document_page_count_type = "exam_page_count" if state == "exam" else "solution_page_count"
 
-        try:
-            document_path,document_urls = self.document_retriever.construct_document(
-                doc_nodes, root_node, instance, state, driver
-            )
-        except Exception as e:
-            raise RuntimeError(f"Document construction failed for {state}: {e}")
-        
         if not document_path:
             raise RuntimeError(f"Empty document_path returned for {state}")
         
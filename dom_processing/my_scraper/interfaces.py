@@ -7,7 +7,19 @@ from typing import Any
 from pathlib import Path
 
 from dom.node import BaseDOMNode
-from .models import Instance
+from .models import DocumentPlan, Instance, MetadataBatch
+
+
+def unique_nodes(nodes: list) -> list:
+    """Nodes in first-seen order; a node with several metadata types is listed once per type upstream."""
+    return list({id(node): node for node in nodes}.values())
+
+
+def metadata_target_types(node) -> list[str]:
+    return [
+        target_type for target_type in (node.target_types or ())
+        if isinstance(target_type, str) and not target_type.endswith("_url")
+    ]
 
 
 class TextParser(ABC):
@@ -18,6 +30,19 @@ class TextParser(ABC):
         """Extract a single metadata value from text."""
         pass
 
+    def get_metadata_values(self, target_nodes: list, driver) -> MetadataBatch:
+        """Extract every metadata value of a page's target nodes (one get_metadata_value call each unless overridden)."""
+        batch = MetadataBatch()
+        for node in unique_nodes(target_nodes):
+            for target_type in metadata_target_types(node):
+                try:
+                    metadata_type, value = self.get_metadata_value(node, target_type, driver)
+                except Exception as e:
+                    batch.add_error(target_type, f"{type(e).__name__}: {e}")
+                    continue
+                batch.add(metadata_type or target_type, value)
+        return batch
+
 
 class ContentTransformer(ABC):
     """Interface for transforming content (translation, conversion)."""
@@ -31,30 +56,65 @@ class ContentTransformer(ABC):
 
 
 class ImageURLPattern(ABC):
-    """Interface for parsing and generating image URLs."""
+    """Interface for reading the sample image URL of a document page.
+
+    Page numbering is inferred from that URL by url_patterns.PagePatternEngine.
+    """
     
     @abstractmethod
-    def extract_url_info(self, raw_url: str):
-        """Extract pattern information from URL."""
+    def get_raw_url(self, node) -> str:
+        """Extract the image URL from a DOM node."""
         pass
 
+
+class DocumentRetriever(ABC):
+    """Interface for retrieving and constructing documents.
+
+    Retrieval is split in three steps so they can run on different workers:
+    plan_document needs the live page, download_document is network bound and
+    convert_document is CPU bound.
+    """
+    
     @abstractmethod
-    def build_image_urls(
-        self, suffix: str, start_index: int, base_url: str, page_count: int
-    ) -> list[str]:
-        """Build list of image URLs from pattern info."""
+    def plan_document(
+    self,
+    download_node: BaseDOMNode | list[BaseDOMNode],
+    root_node: BaseDOMNode,
+    instance: Instance,
+    state: str,
+    driver,
+    ) -> DocumentPlan:
+        """Read the entry page and decide which page images make up the document."""
         pass
 
+    @abstractmethod
+    def download_document(self, plan: DocumentPlan) -> None:
+        """Download the planned page images into plan.save_path."""
+        pass
 
-class DocumentRetriever(ABC):
-    """Interface for retrieving and constructing documents."""
-    
     @abstractmethod
+    def convert_document(self, plan: DocumentPlan) -> None:
+        """Assemble the downloaded page images into the document file."""
+        pass
+
+    def build_document(self, plan: DocumentPlan) -> tuple[Path, list[str]]:
+        """Download and convert a planned document."""
+        self.download_document(plan)
+        self.convert_document(plan)
+        return plan.save_path, plan.page_urls
+
     def construct_document(
     self,
     download_node: BaseDOMNode | list[BaseDOMNode],
     root_node: BaseDOMNode,
     instance: Instance,
     state: str,
-    ) -> Path:
-        pass
\ No newline at end of file
+    driver,
+    ) -> tuple[Path, list[str]]:
+        """Plan, download and convert in one go.
+
+        Returns:
+            (save path, page urls)
+        """
+        plan = self.plan_document(download_node, root_node, instance, state, driver)
+        return self.build_document(plan)
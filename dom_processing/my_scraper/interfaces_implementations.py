@@ -2,12 +2,17 @@
 Chinese-specific implementations for document retrieval.
 """
 import re
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement
+from dom_processing.instrumentation import logger
 from utils import generate_selector_from_webelement
-from .interfaces import ContentTransformer, ImageURLPattern, DocumentRetriever, TextParser
+from .interfaces import ContentTransformer, ImageURLPattern, DocumentRetriever, TextParser, metadata_target_types, unique_nodes
 from .services import MetadataProcessing, PageDownloader, PDFConverter
-from .models import Instance
+from .text_matching import AliasMatcher
+from .models import Instance, MetadataBatch
 import json
 from pathlib import Path
 
@@ -161,6 +166,14 @@ class ChineseTextParser(TextParser):
     "新课标3": "全国三卷",
 }
 
+    EXAM_VARIANT_MATCHER = AliasMatcher(EXAM_VARIANT_ALIASES, isolate_single_chars=True)
+    SUBJECT_MATCHER = AliasMatcher({subject: subject for subject in VALID_SUBJECTS})
+    YEAR_PATTERN = re.compile(r'\d{4}')
+    TEXT_TYPES = ("year", "subject", "exam_variant")
+
+    # innerText, trimmed: what WebElement.text returns, for a whole list of elements at once
+    READ_TEXTS_SCRIPT = "return arguments[0].map(function (e) { return (e.innerText || '').trim(); });"
+
 
     
     def get_metadata_value(self, target_node, target_type, driver):
@@ -187,60 +200,8 @@ class ChineseTextParser(TextParser):
         
         try:
             match target_type:
-                case "year":
-                    # Extract first 4 consecutive digits from text (represents a year)
-                    year_match = re.search(r'\d{4}', text_content)
-                    if not year_match:
-                        raise ValueError(f"No 4-digit year found in text: '{text_content}'")
-                    
-                    year = year_match.group(0)
-                    return ("year", year)
-                                
-                case "subject":
-                    # Loop through valid subjects and find first match in text
-                    for subject in self.VALID_SUBJECTS:
-                        if subject in text_content:
-                            return ("subject", subject)
-                    
-                    raise ValueError(f"No valid subject found in text: '{text_content}'. Valid subjects: {self.VALID_SUBJECTS}")
-                
-                case "exam_variant":
-                    found_variants = set()
-                    
-                    # First try to find single variant from long format (e.g., "黑龙江卷")
-                    for variant in self.EXAM_VARIANT_ALIASES:
-                        if variant in text_content:
-                            found_variants.add(variant)
-                    
-                    # If we found exactly one variant, return it
-                    if len(found_variants) == 1:
-                        return ("exam_variant", list(found_variants))
-                    
-                    # If we found multiple long format variants, that's unusual but possible
-                    if len(found_variants) > 1:
-                        return ("exam_variant", list(found_variants))
-                    
-                    # No long format variants found - must check for multiple short forms
-                    # Sort aliases by length (longest first) to avoid partial matches
-                    sorted_aliases = sorted(self.EXAM_VARIANT_ALIASES.items(), 
-                                        key=lambda x: len(x[0]), reverse=True)
-                    
-                    for alias, full_variant in sorted_aliases:
-                        # Check if this alias appears as a whole word
-                        if len(alias) == 1:
-                            # For single chars, check word boundaries
-                            if re.search(rf'\b{alias}\b', text_content):
-                                found_variants.add(full_variant)
-                        else:
-                            if alias in text_content:
-                                found_variants.add(full_variant)
-                    
-                    # Return whatever we found (could be multiple variants)
-                    if found_variants:
-                        return ("exam_variant", list(found_variants))
-                    
-                    # If still nothing found, return empty list (no error)
-                    return ("exam_variant", [])
+                case "year" | "subject" | "exam_variant":
+                    return (target_type, self.parse_text(target_type, text_content))
                 
                 case "page_count":
                     # Keep original page_count logic unchanged
@@ -262,37 +223,203 @@ class ChineseTextParser(TextParser):
         except Exception as e:
             raise RuntimeError(f"Failed to extract metadata for type '{target_type}': {type(e).__name__}: {e}")
 
+    def get_metadata_values(self, target_nodes: list, driver) -> MetadataBatch:
+        """
+        Batch counterpart of get_metadata_value for the metadata nodes of one page.
+
+        Input:
+            - target_nodes: metadata target nodes (a node listed once per type is read once)
+            - driver: page driver; live node texts are read in one execute_script call
+        Output: MetadataBatch, one column per target type in node order
+        """
+        typed_nodes = [(node, metadata_target_types(node)) for node in unique_nodes(target_nodes)]
+        text_nodes = [node for node, types in typed_nodes if any(t != "page_count" for t in types)]
+        texts = dict(zip(map(id, text_nodes), self._read_texts(text_nodes, driver)))
+
+        batch = MetadataBatch()
+        texts_by_type = {}
+        for node, types in typed_nodes:
+            for target_type in types:
+                texts_by_type.setdefault(target_type, []).append(texts.get(id(node)))
+
+        for target_type, type_texts in texts_by_type.items():
+            if target_type == "page_count":
+                # one page, one count, however many nodes ask for it
+                try:
+                    page_count = ChineseDriverOperations().get_page_count(driver)
+                except Exception as e:
+                    batch.add_error(target_type, f"Failed to get page count: {e}")
+                    continue
+                for _ in type_texts:
+                    batch.add(target_type, page_count)
+                continue
+
+            values, errors = self.parse_texts(target_type, type_texts)
+            for value in values:
+                batch.add(target_type, value)
+            for error in errors:
+                batch.add_error(target_type, error)
+        return batch
+
+    def parse_texts(self, target_type: str, texts: list) -> tuple[list, list[str]]:
+        """parse_text over a column of texts (from one page or many); returns (values, error messages)."""
+        values, errors = [], []
+        for text_content in texts:
+            try:
+                values.append(self.parse_text(target_type, text_content))
+            except ValueError as e:
+                errors.append(str(e))
+        return values, errors
+
+    def parse_text(self, target_type: str, text_content: str):
+        """Year, subject or exam variants from a node's text; ValueError when the text has none."""
+        if not text_content:
+            raise ValueError(f"Empty text content for target_type '{target_type}'")
+
+        match target_type:
+            case "year":
+                # First 4 consecutive digits (represents a year)
+                year_match = self.YEAR_PATTERN.search(text_content)
+                if not year_match:
+                    raise ValueError(f"No 4-digit year found in text: '{text_content}'")
+                return year_match.group(0)
+
+            case "subject":
+                # First valid subject in the text
+                subjects = self.SUBJECT_MATCHER.find_values(text_content)
+                if not subjects:
+                    raise ValueError(f"No valid subject found in text: '{text_content}'. Valid subjects: {self.VALID_SUBJECTS}")
+                return subjects[0]
+
+            case "exam_variant":
+                # one scan for every alias; longest non-overlapping hits, as canonical variants
+                return self.EXAM_VARIANT_MATCHER.find_values(text_content)
+
+            case _:
+                raise ValueError(f"Unknown text metadata type: '{target_type}'. Valid types: {', '.join(self.TEXT_TYPES)}")
+
+    def _read_texts(self, nodes: list, driver) -> list:
+        """Text of each node's element (None when unreadable); live elements share one round trip."""
+        elements = [getattr(node, "web_element", None) for node in nodes]
+        live = [element for element in elements if element is not None and not isinstance(element, SnapshotElement)]
+
+        if len(live) > 1:
+            web_driver = driver.driver if hasattr(driver, 'driver') else driver
+            try:
+                live_texts = web_driver.execute_script(self.READ_TEXTS_SCRIPT, live)
+            except Exception as e:
+                logger.debug(f"Batch text read failed, reading elements one by one: {type(e).__name__}: {e}")
+                live_texts = None
+            if isinstance(live_texts, list) and len(live_texts) == len(live):
+                by_element = dict(zip(map(id, live), live_texts))
+                return [by_element.get(id(element)) if element is not None else None for element in elements]
+
+        texts = []
+        for element in elements:
+            try:
+                texts.append(element.text if element is not None else None)
+            except Exception as e:
+                print(f"Warning: Failed to get text from web_element: {type(e).__name__}: {e}")
+                texts.append(None)
+        return texts
+
+TRANSLATION_DICTIONARY_PATH = "dom_processing/dictionnaries/chinese_to_english_dictionnary.json"
+
+
+class TranslationTable:
+    """
+    Read-only Chinese -> English table shared by every transformer in the process.
+
+    Input:
+        - translations: key -> English text; copied and frozen
+    """
+
+    def __init__(self, translations: dict):
+        self.translations = MappingProxyType(dict(translations))
+        self._key_order = {key: position for position, key in enumerate(self.translations)}
+        self._keys_containing = None  # substring -> keys containing it, built on the first miss
+        self._max_key_length = max(map(len, self.translations), default=0)
+
+    def get(self, text: str, default=None):
+        return self.translations.get(text, default)
+
+    @lru_cache(maxsize=1024)
+    def similar_keys(self, text: str) -> tuple:
+        """Keys that contain text or are contained in it, in dictionary order."""
+        if self._keys_containing is None:
+            self._keys_containing = self._index_substrings()
+
+        similar = set(self._keys_containing.get(text, ()))
+        for start in range(len(text)):
+            for end in range(start + 1, min(len(text), start + self._max_key_length) + 1):
+                if text[start:end] in self.translations:
+                    similar.add(text[start:end])
+        return tuple(sorted(similar, key=self._key_order.__getitem__))
+
+    def _index_substrings(self) -> dict:
+        index = {}
+        for key in self.translations:
+            for start in range(len(key)):
+                for end in range(start + 1, len(key) + 1):
+                    index.setdefault(key[start:end], set()).add(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.translations)
+
+
+@lru_cache(maxsize=None)
+def load_translation_table(dict_path: str = TRANSLATION_DICTIONARY_PATH) -> TranslationTable:
+    """Read and parse the dictionary file once per process (per path)."""
+    try:
+        with open(dict_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Translation dictionary not found at: {dict_path}")
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Invalid JSON in translation dictionary at {dict_path}: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to load translation dictionary from {dict_path}: {type(e).__name__}: {e}")
+    
+    # FIXED: Extract the nested dictionary
+    if isinstance(data, dict) and "chinese_to_english" in data:
+        translation_dict = data["chinese_to_english"]
+    elif isinstance(data, dict):
+        translation_dict = data  # Fallback if already flat
+    else:
+        raise TypeError(f"Translation dictionary must be a dict, got {type(data).__name__}")
+    
+    if not isinstance(translation_dict, dict):
+        raise TypeError(f"Translation dictionary must be a dict, got {type(translation_dict).__name__}")
+    
+    # Debug: Print loaded dictionary
+    logger.debug(f"Loaded translation dictionary with {len(translation_dict)} entries")
+    for key, value in list(translation_dict.items())[:5]:  # Print first 5
+        logger.debug(f"  '{key}' -> '{value}'")
+    
+    return TranslationTable(translation_dict)
+
+
 class ChineseContentTransformer(ContentTransformer):
-    def __init__(self):
-        dict_path = "dom_processing/dictionnaries/chinese_to_english_dictionnary.json"
-        
-        try:
-            with open(dict_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Translation dictionary not found at: {dict_path}")
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Invalid JSON in translation dictionary at {dict_path}: {e}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to load translation dictionary from {dict_path}: {type(e).__name__}: {e}")
-        
-        # FIXED: Extract the nested dictionary
-        if isinstance(data, dict) and "chinese_to_english" in data:
-            translation_dict = data["chinese_to_english"]
-        elif isinstance(data, dict):
-            translation_dict = data  # Fallback if already flat
-        else:
-            raise TypeError(f"Translation dictionary must be a dict, got {type(data).__name__}")
-        
-        if not isinstance(translation_dict, dict):
-            raise TypeError(f"Translation dictionary must be a dict, got {type(translation_dict).__name__}")
-        
-        # Debug: Print loaded dictionary
-        print(f"DEBUG: Loaded translation dictionary with {len(translation_dict)} entries")
-        for key, value in list(translation_dict.items())[:5]:  # Print first 5
-            print(f"  '{key}' -> '{value}'")
-        
-        self.dictionary = translation_dict
+    """
+    Input:
+        - table: translation table to use; the shared process-wide table by default
+        - dict_path: dictionary file of the shared table (read on first use)
+    """
+
+    def __init__(self, table: TranslationTable = None, dict_path: str = TRANSLATION_DICTIONARY_PATH):
+        self._table = table
+        self._dict_path = dict_path
+
+    @property
+    def table(self) -> TranslationTable:
+        if self._table is None:
+            self._table = load_translation_table(self._dict_path)
+        return self._table
+
+    @property
+    def dictionary(self):
+        return self.table.translations
 
     def translate_to_english(self, text):
         if not isinstance(text, str):
@@ -300,15 +427,15 @@ class ChineseContentTransformer(ContentTransformer):
             return text
         
         # Get translation
-        translated = self.dictionary.get(text, text)
+        translated = self.table.get(text, text)
         
         # Warn if no translation found for Chinese text
         if translated == text and any(ord(c) > 127 for c in text):
             print(f"Warning: No translation found for Chinese text: '{text}'")
             # Check available keys that might be similar
-            similar = [k for k in self.dictionary.keys() if text in k or k in text]
+            similar = self.table.similar_keys(text)
             if similar:
-                print(f"  Similar keys found: {similar[:3]}")
+                print(f"  Similar keys found: {list(similar[:3])}")
         
         return translated
     
@@ -330,17 +457,17 @@ class ChineseImageURLPattern(ImageURLPattern):
             raise ValueError(f"node.web_element is None - element not found on page")
 
         # DEBUG: Print the node info
-        print(f"DEBUG: get_raw_url called for node.tag={node.tag}")
-        print(f"DEBUG: web_element type: {type(node.web_element)}")
+        logger.debug(f"get_raw_url called for node.tag={node.tag}")
+        logger.debug(f"web_element type: {type(node.web_element)}")
         
         try:
             if node.tag == "img":
                 # DEBUG: Try to get the element's session
                 try:
                     session_id = node.web_element._parent.session_id
-                    print(f"DEBUG: web_element session ID: {session_id}")
+                    logger.debug(f"web_element session ID: {session_id}")
                 except:
-                    print(f"DEBUG: Could not get session ID")
+                    logger.debug(f"Could not get session ID")
                 
                 url = node.web_element.get_attribute("src")
             elif node.tag == "a":
@@ -356,155 +483,5 @@ class ChineseImageURLPattern(ImageURLPattern):
         if url.startswith("data:"):
             raise ValueError("data URLs are not supported")
         
-        print(f"DEBUG: Extracted URL: {url}")
+        logger.debug(f"Extracted URL: {url}")
         return url
-
-    def get_url_base(self, raw_url: str) -> str:
-        """Extract base URL from full URL.
-        raw_url = "https://img.eol.cn/e_images/gk/2025/st/qg1/yy01.png"
-
-        # Step by step:
-        # 1. raw_url.rsplit("/", 1)
-        #    → ["https://img.eol.cn/e_images/gk/2025/st/qg1", "yy01.png"]
-
-        # 2. [0] takes first element
-        #    → "https://img.eol.cn/e_images/gk/2025/st/qg1"
-
-        # 3. + "/"
-        #    → "https://img.eol.cn/e_images/gk/2025/st/qg1/"
-
-        # Output:
-        "https://img.eol.cn/e_images/gk/2025/st/qg1/"
-        
-        """
-        if not raw_url:
-            raise ValueError("raw_url cannot be empty")
-        
-        if not isinstance(raw_url, str):
-            raise TypeError(f"raw_url must be a string, got {type(raw_url).__name__}")
-        
-        if "/" not in raw_url:
-            raise ValueError(f"Invalid URL format (no slashes found): {raw_url}")
-        
-        try:
-            return raw_url.rsplit("/", 1)[0] + "/"
-        except Exception as e:
-            raise RuntimeError(f"Failed to extract base URL from '{raw_url}': {type(e).__name__}: {e}")
-
-    def extract_url_info(self, raw_url: str) -> tuple[str, str]:
-        r"""Extract suffix and starting index from URL.
-        
-        Example URL: https://img.eol.cn/e_images/gk/2025/st/qg1/yy01.png
-
-        Step by step:
-        1. image_name = raw_url.split("/")[-1]
-        → "yy01.png"
-
-        2. stem = image_name.split(".")[0]
-        → "yy01"
-
-        3. match = re.match(r"([a-zA-Z]+)(\d+)", stem)
-        → group(1) = "yy"
-        → group(2) = "01"
-
-        Returns:
-            ("yy", "01") - suffix and start index
-        
-        Example: image_abc01.png → ("abc", "01")
-        """
-        if not raw_url:
-            raise ValueError("raw_url cannot be empty")
-        
-        if not isinstance(raw_url, str):
-            raise TypeError(f"raw_url must be a string, got {type(raw_url).__name__}")
-        
-        if "/" not in raw_url:
-            raise ValueError(f"Invalid URL format (no slashes found): {raw_url}")
-        
-        try:
-            image_name = raw_url.split("/")[-1]
-        except Exception as e:
-            raise RuntimeError(f"Failed to extract image name from URL '{raw_url}': {type(e).__name__}: {e}")
-        
-        if not image_name:
-            raise ValueError(f"Empty image name extracted from URL: {raw_url}")
-        
-        if "." not in image_name:
-            raise ValueError(f"Image name has no extension: {image_name} (from URL: {raw_url})")
-        
-        try:
-            stem = image_name.split(".")[0]
-        except Exception as e:
-            raise RuntimeError(f"Failed to extract stem from image name '{image_name}': {type(e).__name__}: {e}")
-        
-        if not stem:
-            raise ValueError(f"Empty stem extracted from image name: {image_name}")
-        
-        try:
-            match = re.match(r"([a-zA-Z]+)(\d+)", stem)
-        except Exception as e:
-            raise RuntimeError(f"Regex matching failed for stem '{stem}': {type(e).__name__}: {e}")
-        
-        if not match:
-            raise ValueError(
-                f"Image name stem '{stem}' does not match expected pattern (letters followed by digits). "
-                f"URL: {raw_url}"
-            )
-        
-        try:
-            suffix = match.group(1)
-            start_index = match.group(2)
-            if start_index not in ("01", "1", "00", "0"):
-                start_index = "00"
-
-        except Exception as e:
-            raise RuntimeError(f"Failed to extract groups from regex match: {type(e).__name__}: {e}")
-        
-        if not suffix:
-            raise ValueError(f"Empty suffix extracted from stem '{stem}'")
-        if not start_index:
-            raise ValueError(f"Empty start_index extracted from stem '{stem}'")
-        
-        return suffix, start_index
-
-    def build_image_urls(
-    self, suffix: str, start_index: int, base_url: str, page_count: int, extension: str = "png"
-) -> list[str]:
-        """Build list of image URLs from pattern."""
-        if not suffix:
-            raise ValueError("suffix cannot be empty")
-        if not isinstance(suffix, str):
-            raise TypeError(f"suffix must be a string, got {type(suffix).__name__}")
-        
-        if not isinstance(start_index, int):
-            raise TypeError(f"start_index must be an int, got {type(start_index).__name__}")
-        if start_index < 0:
-            raise ValueError(f"start_index must be >= 0, got {start_index}")
-        
-        if not base_url:
-            raise ValueError("base_url cannot be empty")
-        if not isinstance(base_url, str):
-            raise TypeError(f"base_url must be a string, got {type(base_url).__name__}")
-        
-        if not isinstance(page_count, int):
-            raise TypeError(f"page_count must be an int, got {type(page_count).__name__}")
-        if page_count < 1:
-            raise ValueError(f"page_count must be >= 1, got {page_count}")
-        
-        try:
-            urls = []
-            if start_index == 0:
-                for i in range(0, page_count):
-                    suffix_num = f"{i:02d}"
-                    urls.append(f"{base_url}{suffix}{suffix_num}.{extension}")
-            else:
-                for i in range(start_index, page_count + 1):
-                    suffix_num = f"{i:02d}"
-                    urls.append(f"{base_url}{suffix}{suffix_num}.{extension}")
-            return urls
-        except Exception as e:
-            raise RuntimeError(
-                f"Failed to build image URLs (suffix={suffix}, start={start_index}, "
-                f"base_url={base_url}, page_count={page_count}): {type(e).__name__}: {e}"
-            )
-
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 
@@ -24,6 +24,27 @@ class InstanceDocuments(BaseModel):
     solution_page_count: Optional[int] = None
 
 
+class DocumentPlan(BaseModel):
+    """Everything needed to fetch one document once its entry page has been read."""
+    state: str
+    save_path: Path
+    metadata: Dict[str, Any]  # processed metadata, used for page file names
+    page_urls: List[str]
+    page_indices: List[int]  # file index of each page url
+
+
+class MetadataBatch(BaseModel):
+    """Metadata read from one page's target nodes: a column of values per target type, in node order."""
+    columns: Dict[str, List[Any]] = Field(default_factory=dict)
+    errors: Dict[str, List[str]] = Field(default_factory=dict)  # one message per node that failed
+
+    def add(self, target_type: str, value: Any) -> None:
+        self.columns.setdefault(target_type, []).append(value)
+
+    def add_error(self, target_type: str, message: str) -> None:
+        self.errors.setdefault(target_type, []).append(message)
+
+
 class Instance(BaseModel):
     metadata: InstanceMetadata = Field(default_factory=InstanceMetadata)
     documents: InstanceDocuments = Field(default_factory=InstanceDocuments)
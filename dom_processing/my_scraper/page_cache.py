@@ -0,0 +1,243 @@
+"""
+On-disk HTTP cache for downloaded page images.
+
+Bodies are stored content-addressed under objects/<sha[:2]>/<sha256>, so identical
+pages served from several URLs are kept once. A SQLite index maps each URL to its
+digest together with the ETag / Last-Modified validators used for conditional
+re-requests, and the last access time used for LRU eviction.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class PageCacheMiss(LookupError):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """Index row for one cached URL."""
+    url: str
+    digest: str
+    size: int
+    content_type: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class PageCache:
+    """Content-addressed page store with a SQLite URL index and LRU size cap."""
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        offline: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Input:
+            - root: cache directory (index.sqlite + objects/)
+            - max_bytes: total size of stored bodies before LRU eviction kicks in
+            - offline: serve only from the cache, never touch the network
+            - clock: time source for access stamps (injected for testing)
+        """
+        if not root:
+            raise ValueError("root cannot be empty")
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}")
+
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        try:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            # download threads share one connection, serialised by self._lock
+            self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_type TEXT NOT NULL DEFAULT '',
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access);
+                CREATE INDEX IF NOT EXISTS idx_pages_digest ON pages(digest);
+                """
+            )
+            self._conn.commit()
+        except Exception as e:
+            raise RuntimeError(f"Failed to open page cache at '{root}': {type(e).__name__}: {e}")
+
+    @classmethod
+    def from_env(cls) -> Optional["PageCache"]:
+        """
+        Build the cache from PAGE_CACHE_DIR / PAGE_CACHE_MAX_BYTES / PAGE_CACHE_OFFLINE.
+
+        Returns None when PAGE_CACHE_DIR is unset (caching disabled).
+        """
+        root = os.getenv("PAGE_CACHE_DIR")
+        if not root:
+            return None
+        return cls(
+            root=root,
+            max_bytes=int(os.getenv("PAGE_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+            offline=os.getenv("PAGE_CACHE_OFFLINE", "").lower() in ("1", "true", "yes"),
+        )
+
+    # ==================== PUBLIC API ====================
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """Index entry for url, or None if absent or its body has gone missing."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, digest, size, content_type, etag, last_modified FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            entry = CachedPage(*row)
+            if not self._object_path(entry.digest).exists():
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.commit()
+                return None
+            return entry
+
+    def read(self, entry: CachedPage) -> bytes:
+        """Body bytes of entry; also marks it as recently used."""
+        with open(self._object_path(entry.digest), "rb") as f:
+            content = f.read()
+        self.touch(entry.url)
+        return content
+
+    def touch(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (self._clock(), url))
+            self._conn.commit()
+
+    def conditional_headers(self, entry: Optional[CachedPage]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating entry."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(
+        self,
+        url: str,
+        content: bytes,
+        content_type: str = "",
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedPage:
+        """Save a response body for url, then evict least recently used bodies over max_bytes."""
+        if not url:
+            raise ValueError("url cannot be empty")
+
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self._write_atomic(object_path, content)
+
+        entry = CachedPage(url, digest, len(content), content_type or "", etag, last_modified)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, digest, size, content_type, etag, last_modified, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, entry.size, entry.content_type, etag, last_modified, self._clock()),
+            )
+            self._conn.commit()
+            self._evict_locked(keep_url=url)
+        return entry
+
+    def total_bytes(self) -> int:
+        """Size of all distinct stored bodies."""
+        with self._lock:
+            return self._total_bytes_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ==================== INTERNALS ====================
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _write_atomic(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _total_bytes_locked(self) -> int:
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM pages GROUP BY digest)"
+        ).fetchone()
+        return row[0]
+
+    def _evict_locked(self, keep_url: str) -> None:
+        total = self._total_bytes_locked()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT url, digest, size FROM pages WHERE url != ? ORDER BY last_access ASC",
+            (keep_url,),
+        ).fetchall()
+
+        for url, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            still_referenced = self._conn.execute(
+                "SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if still_referenced:
+                continue
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Warning: Failed to evict cached page body {digest}: {type(e).__name__}: {e}")
+            total -= size
+
+        self._conn.commit()
@@ -0,0 +1,171 @@
+"""
+Streaming PDF writer for page images.
+
+Pages are appended one at a time straight to disk, so memory use is bounded by
+a single page regardless of document length. Baseline RGB/grayscale JPEGs are
+embedded verbatim as DCT streams; anything else is decoded, converted to RGB
+and re-encoded as JPEG before being written.
+"""
+
+import io
+import os
+from typing import BinaryIO, List, Optional
+
+from PIL import Image
+
+
+_PASSTHROUGH_COLORSPACES = {"RGB": "/DeviceRGB", "L": "/DeviceGray"}
+_REENCODE_QUALITY = 95
+
+
+class StreamingPDFWriter:
+    """Appends image pages to a PDF file without holding previous pages in memory."""
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, path: str, resolution: float = 72.0):
+        """
+        Input:
+            - path: destination PDF file (created / truncated)
+            - resolution: image dpi used to size pages (72 = one point per pixel)
+        """
+        if not path:
+            raise ValueError("path cannot be empty")
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive, got {resolution}")
+
+        self.path = path
+        self.resolution = resolution
+
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._offsets = {}
+        self._page_ids: List[int] = []
+        self._next_id = self.PAGES_ID + 1
+
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self) -> "StreamingPDFWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    # ==================== PUBLIC API ====================
+
+    def add_image_file(self, image_path: str) -> None:
+        """Append one page holding the image at image_path."""
+        if self._file is None:
+            raise RuntimeError("StreamingPDFWriter is already closed")
+
+        data, width, height, colorspace = self._encode_page(image_path)
+
+        image_id = self._allocate_id()
+        content_id = self._allocate_id()
+        page_id = self._allocate_id()
+
+        self._write_stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode",
+            data,
+        )
+        del data
+
+        page_width = width * 72.0 / self.resolution
+        page_height = height * 72.0 / self.resolution
+        content = f"q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_stream(content_id, "", content)
+
+        self._write_object(
+            page_id,
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+            f"/MediaBox [0 0 {page_width:.4f} {page_height:.4f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>",
+        )
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        """Write the page tree, catalog, xref table and trailer."""
+        if self._file is None:
+            return
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            self.PAGES_ID,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>",
+        )
+        self._write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>")
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, size):
+            lines.append(f"{self._offsets[object_id]:010d} 00000 n \n")
+        lines.append(
+            f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        )
+        self._file.write("".join(lines).encode("ascii"))
+
+        self._file.close()
+        self._file = None
+
+    def abort(self) -> None:
+        """Close and delete the partially written file."""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        finally:
+            self._file = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    # ==================== INTERNALS ====================
+
+    def _encode_page(self, image_path: str):
+        """Return (jpeg_bytes, width, height, colorspace) for one image file."""
+        with Image.open(image_path) as img:
+            width, height = img.size
+            colorspace = _PASSTHROUGH_COLORSPACES.get(img.mode)
+
+            if img.format == "JPEG" and colorspace is not None:
+                # Image.open only parsed the header; copy the original bitstream
+                with open(image_path, "rb") as f:
+                    return f.read(), width, height, colorspace
+
+            rgb = img.convert("RGB")
+
+        try:
+            buffer = io.BytesIO()
+            rgb.save(buffer, "JPEG", quality=_REENCODE_QUALITY)
+        finally:
+            rgb.close()
+        return buffer.getvalue(), width, height, "/DeviceRGB"
+
+    def _allocate_id(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def _write_object(self, object_id: int, body: str) -> None:
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n{body}\nendobj\n".encode("ascii"))
+
+    def _write_stream(self, object_id: int, dictionary: str, data: bytes) -> None:
+        self._offsets[object_id] = self._file.tell()
+        entries = f"{dictionary} /Length {len(data)}".strip()
+        self._file.write(f"{object_id} 0 obj\n<< {entries} >>\nstream\n".encode("ascii"))
+        self._file.write(data)
+        self._file.write(b"\nendstream\nendobj\n")
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+_STOP = object()  # end-of-stream marker, one per downstream worker
+
+
+@dataclass
+class PipelineStage:
+    """
+    One step of the pipeline.
+
+    func runs on the stage's own thread pool (the scraping code is blocking);
+    its return value is handed to the next stage, None drops the item.
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    """Per-stage counters, returned by AsyncPipeline.run."""
+    name: str
+    processed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    busy_seconds: float = 0.0
+    max_in_flight: int = 0
+
+
+class AsyncPipeline:
+    """
+    Runs items through stages connected by bounded asyncio queues.
+
+    Each stage has `workers` consumers, so a slow stage only holds up the
+    others once its input queue is full (backpressure) instead of serialising
+    the whole run.
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        queue_size: int = 8,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None,
+    ):
+        """
+        Input:
+            - stages: stages in processing order
+            - queue_size: capacity of each inter-stage queue
+            - on_error: called with (stage name, item, exception) when func raises;
+              the item is dropped afterwards
+        """
+        if not stages:
+            raise ValueError("stages cannot be empty")
+        if not isinstance(queue_size, int) or queue_size < 1:
+            raise ValueError(f"queue_size must be a positive integer, got {queue_size}")
+        for stage in stages:
+            if not isinstance(stage.workers, int) or stage.workers < 1:
+                raise ValueError(f"Stage '{stage.name}' workers must be a positive integer, got {stage.workers}")
+
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error or self._print_error
+
+    def run(self, source: Iterable) -> Dict[str, StageStats]:
+        """Feed every item of source through the stages; blocks until all are done."""
+        return asyncio.run(self._run(source))
+
+    # ==================== INTERNALS ====================
+
+    async def _run(self, source: Iterable) -> Dict[str, StageStats]:
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        stats = {stage.name: StageStats(stage.name) for stage in self.stages}
+        executors = [
+            ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"pipeline-{stage.name}")
+            for stage in self.stages
+        ]
+        # the source may block (e.g. it drives a browser), so it is pulled on its own thread
+        source_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-source")
+
+        try:
+            await asyncio.gather(
+                self._feed(source, queues[0], self.stages[0].workers, source_executor),
+                *[
+                    self._run_stage(index, queues, executors[index], stats[stage.name])
+                    for index, stage in enumerate(self.stages)
+                ],
+            )
+        finally:
+            source_executor.shutdown(wait=True)
+            for executor in executors:
+                executor.shutdown(wait=True)
+        return stats
+
+    async def _feed(self, source: Iterable, first_queue: asyncio.Queue, consumers: int, executor) -> None:
+        loop = asyncio.get_running_loop()
+        iterator = iter(source)
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, next, iterator, _STOP)
+                if item is _STOP:
+                    break
+                await first_queue.put(item)
+        except Exception as e:
+            self._report("source", None, e)
+        finally:
+            for _ in range(consumers):
+                await first_queue.put(_STOP)
+
+    async def _run_stage(self, index: int, queues: List[asyncio.Queue], executor, stats: StageStats) -> None:
+        stage = self.stages[index]
+        next_queue = queues[index + 1] if index + 1 < len(queues) else None
+        in_flight = [0]
+
+        async def worker():
+            loop = asyncio.get_running_loop()
+            while True:
+                item = await queues[index].get()
+                if item is _STOP:
+                    return
+
+                in_flight[0] += 1
+                stats.max_in_flight = max(stats.max_in_flight, in_flight[0])
+                started = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(executor, stage.func, item)
+                except Exception as e:
+                    stats.failed += 1
+                    self._report(stage.name, item, e)
+                    continue
+                finally:
+                    in_flight[0] -= 1
+                    stats.busy_seconds += time.perf_counter() - started
+
+                stats.processed += 1
+                if result is None:
+                    stats.dropped += 1
+                elif next_queue is not None:
+                    await next_queue.put(result)
+
+        try:
+            await asyncio.gather(*[worker() for _ in range(stage.workers)])
+        finally:
+            if next_queue is not None:
+                for _ in range(self.stages[index + 1].workers):
+                    await next_queue.put(_STOP)
+
+    def _report(self, stage_name: str, item, error: Exception) -> None:
+        try:
+            self.on_error(stage_name, item, error)
+        except Exception as e:
+            print(f"Warning: Pipeline error handler failed: {type(e).__name__}: {e}")
+
+    @staticmethod
+    def _print_error(stage_name: str, item, error: Exception) -> None:
+        print(f"Error: Pipeline stage '{stage_name}' failed: {type(error).__name__}: {error}")
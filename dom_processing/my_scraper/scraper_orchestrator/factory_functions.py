@@ -1,5 +1,7 @@
 
 from typing import Tuple
+from dom.driver_pool import DriverPool
+from dom.html_driver import HtmlDriver
 from dom.selenium_driver import SeleniumDriver
 from dom_processing.dom_tree_builder.caching.cache import HandleCaching
 from dom_processing.dom_tree_builder.caching.coordinators import CachingCoordinator
@@ -14,11 +16,20 @@ from dom_processing.my_scraper.interfaces_implementations import ChineseTextPars
 
 class FactoryFunctions:
     @staticmethod
-    def create_driver(url: str, headless: bool = True) -> SeleniumDriver:
-        """Create and initialize a Selenium driver."""
+    def create_driver(url: str, headless: bool = True, backend: str = "selenium") -> SeleniumDriver:
+        """Create and initialize a driver; backend "html" fetches the page without a browser."""
         if not url:
             raise ValueError("URL cannot be empty")
         
+        if backend == "html":
+            driver = HtmlDriver()
+            try:
+                driver.get(url)
+                return driver
+            except Exception as e:
+                driver.close()
+                raise RuntimeError(f"Failed to navigate to URL '{url}': {type(e).__name__}: {e}")
+
         try:
             driver = SeleniumDriver(headless=headless)
         except Exception as e:
@@ -34,6 +45,14 @@ class FactoryFunctions:
                 pass
             raise RuntimeError(f"Failed to navigate to URL '{url}': {type(e).__name__}: {e}")
 
+    @staticmethod
+    def create_driver_pool(max_size: int = 1, max_uses: int = 25, headless: bool = True) -> DriverPool:
+        """Create a pool of reusable Selenium drivers for document pages."""
+        try:
+            return DriverPool(max_size=max_size, max_uses=max_uses, headless=headless)
+        except Exception as e:
+            raise RuntimeError(f"Failed to create driver pool (max_size={max_size}, max_uses={max_uses}): {type(e).__name__}: {e}")
+
     @staticmethod
     def create_tree_annotator(
         template_registry: TemplateRegistry,
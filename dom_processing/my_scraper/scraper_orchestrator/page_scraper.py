@@ -1,8 +1,13 @@
+from typing import Optional
+
+from dom.driver_pool import DriverPool
+from dom.node import PageBindings
 from dom.selenium_driver import SeleniumDriver
 from dom_processing.dom_tree_builder.tree_building.tree_building_entry_point import BuildTree
+from dom_processing.instrumentation import logger, span
 from dom_processing.my_scraper.document_retriever_implementations import ChineseDirectLinkDocumentRetriever, ChineseReferenceBasedDocumentRetriever
 from dom_processing.my_scraper.interfaces import DocumentRetriever
-from dom_processing.my_scraper.models import Instance
+from dom_processing.my_scraper.models import DocumentPlan, Instance
 from dom_processing.my_scraper.scraper_orchestrator.factory_functions import FactoryFunctions
 from dom_processing.my_scraper.scraper_orchestrator.query_services import QueryServices
 from dom_processing.my_scraper.scraper_orchestrator.tree_utils import clone_tree_structure
@@ -12,11 +17,12 @@ from dom_processing.my_scraper.scraper_orchestrator.tree_utils import clone_tree
 
 class PageScraper:
     
-    def __init__(self, document_query_services: QueryServices,document_retriever:DocumentRetriever): # here we specify the technique
+    def __init__(self, document_query_services: QueryServices,document_retriever:DocumentRetriever, driver_pool: DriverPool = None): # here we specify the technique
         if not document_query_services:
             raise ValueError("document_query_services cannot be None")
         
         self.document_query_services = document_query_services
+        self.driver_pool = driver_pool  # None -> one fresh browser per page
         self.factory_functions = FactoryFunctions()
         try:
             self.instance_assembler = self.factory_functions.create_instance_assembler(
@@ -27,54 +33,109 @@ class PageScraper:
  
     
     def scrape_page(self, url: str, document_tree, state, instance: Instance) -> Instance:
-        if not url:
-            raise ValueError("URL cannot be empty")
-        if not document_tree:
-            raise ValueError("document_tree cannot be None")
-        if state not in ["exam", "solution"]:
-            raise ValueError(f"Invalid state '{state}': must be 'exam' or 'solution'")
-        if not instance:
-            raise ValueError("instance cannot be None")
+        self._validate_page_args(url, document_tree, state, instance)
         
         document_page_driver = None
+        use_pool = self._uses_pool()
         try:
-            document_page_driver = self.factory_functions.create_driver(url)
-            
-            # Annotate tree with current page
-            try:
-                self._annotate_tree(document_page_driver, document_tree)
-            except Exception as e:
-                raise RuntimeError(f"Failed to annotate tree: {e}")
-            
-            instance_document_url_name = state + "_entry_page_url"
-            setattr(instance.documents, instance_document_url_name, url)
-            
-            if state == "exam":
+            # the tree is shared between pages: its web elements live in this page's bindings
+            with PageBindings():
+                document_page_driver = self._acquire_driver(url, use_pool)
+                self._read_page(document_page_driver, url, document_tree, state, instance)
+                
                 try:
-                    self.instance_assembler.set_instance_metadata_attributes(
-                        document_tree, instance, document_page_driver
+                    self.instance_assembler.set_instance_document_attributes(
+                        document_tree, instance, state, document_page_driver
                     )
                 except Exception as e:
-                    raise RuntimeError(f"Failed to assemble metadata attributes for {url}: {e}")
-            
-            try:
-                self.instance_assembler.set_instance_document_attributes(
-                    document_tree, instance, state, document_page_driver
-                )
-            except Exception as e:
-                raise RuntimeError(f"Failed to assemble document attributes for {url} (state={state}): {e}")
+                    raise RuntimeError(f"Failed to assemble document attributes for {url} (state={state}): {e}")
             
             # Success - return instance
             return instance
         
         finally:
-            # CRITICAL: Always close driver (success or failure)
-            if document_page_driver:
+            # CRITICAL: Always close (or hand back) driver (success or failure)
+            self._release_driver(document_page_driver, use_pool)
+
+    def plan_page(self, url: str, document_tree, state, instance: Instance) -> Optional[DocumentPlan]:
+        """
+        Same as scrape_page up to the page URLs: the driver is handed back before
+        any page image is downloaded, so downloading and PDF conversion can run
+        in later pipeline stages.
+
+        Returns:
+            DocumentPlan, or None when the page has no document nodes
+        """
+        self._validate_page_args(url, document_tree, state, instance)
+        
+        document_page_driver = None
+        use_pool = self._uses_pool()
+        try:
+            # the plan only keeps URLs, so the bindings can go once it is built
+            with PageBindings():
+                document_page_driver = self._acquire_driver(url, use_pool)
+                self._read_page(document_page_driver, url, document_tree, state, instance)
+                
                 try:
-                    document_page_driver.close()
-                except:
-                    pass  # Silent close
+                    return self.instance_assembler.plan_instance_document(
+                        document_tree, instance, state, document_page_driver
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Failed to assemble document attributes for {url} (state={state}): {e}")
+        
+        finally:
+            self._release_driver(document_page_driver, use_pool)
 
+    @staticmethod
+    def _validate_page_args(url: str, document_tree, state, instance: Instance) -> None:
+        if not url:
+            raise ValueError("URL cannot be empty")
+        if not document_tree:
+            raise ValueError("document_tree cannot be None")
+        if state not in ["exam", "solution"]:
+            raise ValueError(f"Invalid state '{state}': must be 'exam' or 'solution'")
+        if not instance:
+            raise ValueError("instance cannot be None")
+
+    def _uses_pool(self) -> bool:
+        # plain HTTP pages never need a browser from the pool
+        return self.driver_pool is not None and self.document_query_services.dom_backend != "html"
+
+    def _acquire_driver(self, url: str, use_pool: bool):
+        if use_pool:
+            return self.driver_pool.acquire(url)
+        return self.factory_functions.create_driver(
+            url, backend=self.document_query_services.dom_backend
+        )
+
+    def _release_driver(self, driver, use_pool: bool) -> None:
+        if not driver:
+            return
+        if use_pool:
+            self.driver_pool.release(driver)
+        else:
+            try:
+                driver.close()
+            except:
+                pass  # Silent close
+
+    def _read_page(self, driver, url: str, document_tree, state, instance: Instance) -> None:
+        """Annotate the tree against the loaded page and fill in the entry URL (+ metadata for exams)."""
+        try:
+            self._annotate_tree(driver, document_tree)
+        except Exception as e:
+            raise RuntimeError(f"Failed to annotate tree: {e}")
+        
+        instance_document_url_name = state + "_entry_page_url"
+        setattr(instance.documents, instance_document_url_name, url)
+        
+        if state == "exam":
+            try:
+                self.instance_assembler.set_instance_metadata_attributes(
+                    document_tree, instance, driver
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to assemble metadata attributes for {url}: {e}")
 
     def _annotate_tree(self, driver: SeleniumDriver, tree):
         """Annotate DOM tree with current driver."""
@@ -83,7 +144,7 @@ class PageScraper:
         if not tree:
             raise ValueError("tree cannot be None")
         
-        print(f"DEBUG: Annotating tree with driver session (checking driver object)")
+        logger.debug(f"Annotating tree with driver session (checking driver object)")
         
         try:
             annotator, coordinator = self.factory_functions.create_tree_annotator(
@@ -95,15 +156,22 @@ class PageScraper:
             raise RuntimeError(f"Failed to create tree annotator: {e}")
         
         try:
-            annotator.annotate_tree(
+            root_element = BuildTree.get_root_web_element(
                 driver,
-                tree,
-                coordinator,
                 self.document_query_services.schema_queries,
-                self.document_query_services.config_queries,
-                self.document_query_services.template_registry
+                self.document_query_services.dom_backend
             )
-            print(f"DEBUG: Tree annotation completed")
+            with span("annotation", scope="document"):
+                annotator.annotate_tree(
+                    driver,
+                    tree,
+                    coordinator,
+                    self.document_query_services.schema_queries,
+                    self.document_query_services.config_queries,
+                    self.document_query_services.template_registry,
+                    root_element
+                )
+            logger.debug(f"Tree annotation completed")
         except Exception as e:
             raise RuntimeError(f"Failed to annotate tree: {type(e).__name__}: {e}")
 
@@ -1,7 +1,8 @@
 from pathlib import Path
 
 from dom_processing.config.scraper_config import ScraperConfig
-from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry
+from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry, ValidationError
+from dom_processing.schema_compiler import compile_schema
 from utils import load_json_from_project
 
 
@@ -9,10 +10,12 @@ class QueryServices:
     """Loads and manages scraper configuration and schemas."""
     
     PROJECT_ROOT = Path("C:/Users/user/Desktop/CEE/SeleniumBot/json_schemas")
+    DOM_BACKENDS = ("selenium", "snapshot", "html")
     
     def __init__(self, config_path: str):
         self.config_path = config_path
         self.page_url = None
+        self.dom_backend = "selenium"
         self.schema_queries = None
         self.config_queries = None
         self.template_registry = None
@@ -27,6 +30,13 @@ class QueryServices:
             if not self.page_url:
                 raise ValueError(f"Page URL not found in config file: {self.config_path}")
             
+            self.dom_backend = scraper_config.get_dom_backend()
+            if self.dom_backend not in self.DOM_BACKENDS:
+                raise ValueError(
+                    f"Unknown dom_backend '{self.dom_backend}' in config file: {self.config_path} "
+                    f"(expected one of {self.DOM_BACKENDS})"
+                )
+            
             schema_paths = scraper_config.get_schema_paths()
             if not schema_paths:
                 raise ValueError(f"Schema paths not found in config file: {self.config_path}")
@@ -82,6 +92,12 @@ class QueryServices:
                     )
                 except Exception as e:
                     raise RuntimeError(f"Failed to load templates from {schema_paths['templates']}: {e}")
+
+            # per-node flags of schema + templates; also validates them before any tree is built
+            try:
+                self.schema_queries.attach_compiled(compile_schema(self.schema_queries, self.template_registry))
+            except ValidationError as e:
+                raise ValueError(f"Invalid schema for {self.config_path}: {e.message}")
                 
             return self
         except (FileNotFoundError, ValueError, KeyError, RuntimeError):
@@ -1,16 +1,34 @@
+import os
+import threading
 from datetime import datetime
+from db.batching_repo import BatchingRepository
 from db.database_repo import DatabaseRepository
 from db.mappers import InstanceToRecordMapper
+from dom.driver_pool import DriverPool
+from dom.my_queue import BlockingQueue
 from dom.selenium_driver import SeleniumDriver
 from dom_processing.dom_tree_builder.tree_building.tree_building_entry_point import BuildTree
 from dom_processing.instance_tracker import Tracker
+from dom_processing.instrumentation import export_metrics, increment, logger, span
 from dom_processing.my_scraper.document_retriever_implementations import ChineseDirectLinkDocumentRetriever, ChineseReferenceBasedDocumentRetriever
-from dom_processing.my_scraper.models import Instance
+from dom_processing.my_scraper.scraper_orchestrator.async_pipeline import AsyncPipeline, PipelineStage
 from dom_processing.my_scraper.scraper_orchestrator.factory_functions import FactoryFunctions
 from dom_processing.my_scraper.scraper_orchestrator.page_scraper import  PageScraper
 from dom_processing.my_scraper.scraper_orchestrator.query_services import QueryServices
+from dom_processing.my_scraper.scraper_orchestrator.subject_jobs import RunSummary, SubjectJob, SubjectResult, SubjectWork
 from dom_processing.my_scraper.scraper_orchestrator.subject_navigator import SubjectNavigator
-from dom_processing.my_scraper.scraper_orchestrator.tree_utils import clone_tree_structure
+
+
+# RuntimeError messages that mean "try the fallback layout"
+RETRYABLE_ERRORS = (
+    "failed to annotate tree",
+    "failed to assemble document attributes",
+    "failed to assemble metadata attributes",
+    "web element didn't get assigned",
+    "element not found on page",
+    "web_element is none",
+)
+MAX_DOCUMENT_ATTEMPTS = 2
 
 
 class ScraperOrchestrator:
@@ -22,18 +40,33 @@ class ScraperOrchestrator:
         document_scraper_config_path: str,
         fallback_document_scraper_config_path:str,
         database_repository: DatabaseRepository, # Add this parameter
-        instance_tracker: Tracker
+        instance_tracker: Tracker,
+        driver_pool_size: int = 1,
+        driver_max_uses: int = 25,
+        workers: int = 1,
+        main_page_url: str = None,
+        driver_pool: DriverPool = None,
 
     ):
+        """
+        Input:
+            - driver_pool: pool shared with other orchestrators (parallel crawl jobs),
+              closed by the caller; by default the orchestrator creates and closes its own
+        """
         if not main_scraper_config_path:
             raise ValueError("main_scraper_config_path cannot be empty")
         if not document_scraper_config_path:
             raise ValueError("document_scraper_config_path cannot be empty")
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError(f"workers must be a positive integer, got {workers}")
         
         try:
             self.main_query_services = QueryServices(main_scraper_config_path).initialize_query_services()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize main query services from '{main_scraper_config_path}': {e}")
+        if main_page_url:
+            # crawl another year's index page with the same schemas
+            self.main_query_services.page_url = main_page_url
         
         try:
             self.document_query_services = QueryServices(document_scraper_config_path).initialize_query_services()
@@ -50,7 +83,19 @@ class ScraperOrchestrator:
         self.tree_builder = BuildTree()
         self.mapper = InstanceToRecordMapper()  # Initialize mapper
         self.database_repository = database_repository  # ← this line is absent
+        self.batching = isinstance(database_repository, BatchingRepository)
         self.instance_tracker = instance_tracker
+        self.workers = workers  # subject workers; each one leases its own driver
+        # exam URL a planned job will store -> results whose solution waits for that exam
+        self._exams_in_flight: dict[str, list[SubjectResult]] = {}
+        self._exams_in_flight_lock = threading.Lock()
+
+        # warm browsers shared by every exam/solution page instead of one Chrome per page
+        self._owns_driver_pool = driver_pool is None
+        self.driver_pool = driver_pool or self.factory_functions.create_driver_pool(
+            max_size=max(driver_pool_size, workers),
+            max_uses=driver_max_uses
+        )
 
 
     def _build_page_tree(self, query_services, description="page"):
@@ -62,90 +107,156 @@ class ScraperOrchestrator:
             description: Human-readable description for error messages
             
         Returns:
-            tree: The built page tree (driver is automatically closed)
+            tree: The built page tree
+            driver: The driver still on the page (caller closes it)
+            root_element: Root element the tree was built against, reusable for
+                annotation (an in-memory snapshot when dom_backend is "snapshot")
             
         Raises:
             RuntimeError: If driver creation or page processing fails
         """
         try:
-            driver = self.factory_functions.create_driver(query_services.page_url)
+            driver = self.factory_functions.create_driver(
+                query_services.page_url,
+                backend=query_services.dom_backend
+            )
         except Exception as e:
             raise RuntimeError(f"Failed to create driver for {description} URL '{query_services.page_url}': {e}")
         
         try:
-            tree = self.build_process(driver,query_services)
-            return tree,driver
+            root_element = self.tree_builder.get_root_web_element(
+                driver,
+                query_services.schema_queries,
+                query_services.dom_backend
+            )
+            tree = self.build_process(driver,query_services,root_element)
+            return tree,driver,root_element
         except Exception as e:
             raise RuntimeError(f"Failed to process {description} tree: {e}")
         
-    def build_process(self, driver: SeleniumDriver,query_services:QueryServices):
+    def build_process(self, driver: SeleniumDriver,query_services:QueryServices, root_element=None):
         """Build and return annotated DOM tree."""
         if not driver:
             raise ValueError("driver cannot be None")
         
         try:
-            return self.tree_builder.build(
-                driver,
-                query_services.schema_queries,
-                query_services.config_queries,
-                query_services.template_registry
-            )
+            with span("tree_build"):
+                return self.tree_builder.build(
+                    driver,
+                    query_services.schema_queries,
+                    query_services.config_queries,
+                    query_services.template_registry,
+                    root_element
+                )
         except Exception as e:
             raise RuntimeError(f"Failed to build DOM tree: {type(e).__name__}: {e}")
         
-    def run(self):
-        """Execute the complete scraping workflow."""
+    def _build_trees(self):
+        """
+        Build the main page tree (driver kept open) and the two document tree templates.
 
-        
+        Returns:
+            (main_tree, main_driver, main_root_element, document_tree, fallback_document_tree)
+        """
+        main_tree,main_driver,main_root_element = self._build_page_tree(
+            self.main_query_services, 
+            "main page"
+        )
         try:
-            # Build main page tree
-            main_tree,main_driver = self._build_page_tree(
-                self.main_query_services, 
-                "main page"
-            )
             main_tree.print_dom_tree()
+            # branch and subject lookups run against this tree once per branch / subject
+            main_tree.build_index()
 
             # Build document page tree template
-            document_tree,document_driver = self._build_page_tree(
+            document_tree,document_driver,_ = self._build_page_tree(
                 self.document_query_services,
                 "document page"
             )
             document_driver.close()
 
             # Build fallback document page tree
-            fallback_document_tree,fallback_document_driver = self._build_page_tree(
+            fallback_document_tree,fallback_document_driver,_ = self._build_page_tree(
                 self.fallback_document_query_services,
                 "fallback document page"
             )
             fallback_document_driver.close()
-            
-            # Process each subject type branch
+        except Exception:
+            try:
+                main_driver.close()
+            except Exception as e:
+                print(f"Warning: Failed to close main driver: {e}")
+            raise
+
+        return main_tree, main_driver, main_root_element, document_tree, fallback_document_tree
+
+    def _find_subject_type_branches(self, main_tree) -> list:
+        try:
+            subject_type_branches = main_tree.find_in_node("id", "st{1-33!2,4}", True)
+        except Exception as e:
+            raise RuntimeError(f"Failed to find subject type branches in main tree: {e}")
+        
+        if not subject_type_branches:
+            print("Warning: No subject type branches found matching pattern 'st{1-33!2,4}'")
+        return subject_type_branches
+
+    def _close_run_resources(self, main_driver) -> None:
+        """Flush buffered records and close the run's browsers; a failed flush is raised once the rest is closed."""
+        flush_error = None
+        try:
+            # exams whose subject never reached persistence: their waiting solutions can't be linked
+            for exam_url in list(self._exams_in_flight):
+                self._release_waiting_solutions(exam_url)
+            self._flush_database()
+        except Exception as e:
+            flush_error = e
+        if main_driver:
             try:
-                subject_type_branches = main_tree.find_in_node("id", "st{1-33!2,4}", True)
+                main_driver.close()
             except Exception as e:
-                raise RuntimeError(f"Failed to find subject type branches in main tree: {e}")
+                print(f"Warning: Failed to close main driver: {e}")
+        try:
+            if self._owns_driver_pool:
+                self.driver_pool.close()
+        except Exception as e:
+            print(f"Warning: Failed to close driver pool: {e}")
+        try:
+            export_metrics()
+        except Exception as e:
+            print(f"Warning: Failed to export metrics: {e}")
+        if flush_error is not None:
+            # the URLs are already visited: the run must fail so the page is crawled again
+            raise flush_error
+
+    def run(self) -> RunSummary:
+        """
+        Execute the complete scraping workflow.
+
+        Raises RuntimeError when no branch or subject was found, every one failed, or
+        the buffered records could not be written, so a crawl ledger does not record
+        the page as done.
+        """
+
+        main_driver = None
+        summary = RunSummary()
+        try:
+            main_tree, main_driver, main_root_element, document_tree, fallback_document_tree = self._build_trees()
             
-            if not subject_type_branches:
-                print("Warning: No subject type branches found matching pattern 'st{1-33!2,4}'")
-                return
+            # Process each subject type branch
+            subject_type_branches = self._find_subject_type_branches(main_tree)
+            summary.branches = len(subject_type_branches)
             
             for i, branch in enumerate(subject_type_branches, 1):
                 try:
-                    self._process_branch(branch, main_driver,main_tree, document_tree,fallback_document_tree)
+                    self._process_branch(branch, main_driver,main_tree, document_tree,fallback_document_tree, main_root_element, summary)
                 except Exception as e:
+                    summary.failed_branches += 1
                     print(f"Error processing branch {i}/{len(subject_type_branches)}: {type(e).__name__}: {e}")
                     continue
         finally:
-            if main_driver:
-                try:
-                    main_driver.close()
-                except Exception as e:
-                    print(f"Warning: Failed to close main driver: {e}")
-            if document_driver:
-                try:
-                    document_driver.close()
-                except Exception as e:
-                    print(f"Warning: Failed to close document driver: {e}")
+            self._close_run_resources(main_driver)
+
+        summary.raise_if_nothing_done(self.main_query_services.page_url)
+        return summary
 
     def scrape_document_with_retry(self, document_type, url, document_tree, fallback_document_tree, instance, subject_index, total_subjects):
         """
@@ -163,43 +274,21 @@ class ScraperOrchestrator:
         Returns:
             bool: True if successful, False otherwise
         """
-        max_retries = 2
+        max_retries = MAX_DOCUMENT_ATTEMPTS
         
         for attempt in range(max_retries):
             try:
-                if attempt == 0:
-                    # First attempt: Use primary scraper and tree
-                    print(f"DEBUG: {document_type.capitalize()} attempt {attempt + 1}/{max_retries} with primary tree")
-                    document_retriever_strategy = ChineseReferenceBasedDocumentRetriever()
-                    document_page_scraper = PageScraper(self.document_query_services, document_retriever_strategy)
-                    tree_copy = clone_tree_structure(document_tree)
-                else:
-                    # Second attempt: Use fallback scraper and tree
-                    print(f"DEBUG: {document_type.capitalize()} attempt {attempt + 1}/{max_retries} with fallback tree")
-                    document_retriever_strategy = ChineseDirectLinkDocumentRetriever()
-                    document_page_scraper = PageScraper(self.fallback_document_query_services, document_retriever_strategy)
-                    tree_copy = clone_tree_structure(fallback_document_tree)
+                logger.debug(f"{document_type.capitalize()} attempt {attempt + 1}/{max_retries} with {'primary' if attempt == 0 else 'fallback'} tree")
+                document_page_scraper, page_tree = self._document_scraper(attempt, document_tree, fallback_document_tree)
                 
-                document_page_scraper.scrape_page(url, tree_copy, document_type, instance)
-                print(f"DEBUG: {document_type.capitalize()} scraped successfully for subject {subject_index}/{total_subjects}")
+                document_page_scraper.scrape_page(url, page_tree, document_type, instance)
+                logger.debug(f"{document_type.capitalize()} scraped successfully for subject {subject_index}/{total_subjects}")
                 return True  # Success
                 
             except RuntimeError as e:
-                error_msg = str(e).lower()
-                
-                retryable_errors = [
-                    "failed to annotate tree",
-                    "failed to assemble document attributes",
-                    "failed to assemble metadata attributes",
-                    "web element didn't get assigned",
-                    "element not found on page",
-                    "web_element is none"
-                ]
-                
-                is_retryable = any(err in error_msg for err in retryable_errors)
-                
-                if is_retryable:
+                if self._is_retryable(e):
                     if attempt < max_retries - 1:
+                        increment("document_retries", state=document_type)
                         print(f"Warning: {document_type.capitalize()} scraping failed on attempt {attempt + 1}, retrying with fallback")
                         print(f"  Error: {e}")
                         continue  # Try again with fallback
@@ -220,6 +309,28 @@ class ScraperOrchestrator:
                 raise
         
         return False  # All retries exhausted
+
+    def _document_scraper(self, attempt: int, document_tree, fallback_document_tree):
+        """
+        Scraper and tree for a document attempt.
+
+        Attempt 0 uses the primary (reference-based) setup, later attempts the
+        fallback (direct-link) one. The tree is not copied: every page and worker
+        shares it, and PageScraper keeps the page's web elements in PageBindings.
+        """
+        if attempt == 0:
+            document_retriever_strategy = ChineseReferenceBasedDocumentRetriever()
+            document_page_scraper = PageScraper(self.document_query_services, document_retriever_strategy, self.driver_pool)
+            return document_page_scraper, document_tree
+        document_retriever_strategy = ChineseDirectLinkDocumentRetriever()
+        document_page_scraper = PageScraper(self.fallback_document_query_services, document_retriever_strategy, self.driver_pool)
+        return document_page_scraper, fallback_document_tree
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether a RuntimeError means the page layout didn't fit and the fallback may work."""
+        error_msg = str(error).lower()
+        return any(err in error_msg for err in RETRYABLE_ERRORS)
     
     def _determine_scraping_status(self, has_exam, has_solution, exam_success, solution_success):
         """
@@ -245,7 +356,7 @@ class ScraperOrchestrator:
         else:
             return "failed", "No exam or solution URLs found"
         
-    def _process_branch(self, branch_node, main_driver, main_tree, document_tree, fallback_document_tree):
+    def _process_branch(self, branch_node, main_driver, main_tree, document_tree, fallback_document_tree, root_element=None, summary: RunSummary = None):
         """Process a single subject type branch."""
         if not branch_node:
             raise ValueError("branch_node cannot be None")
@@ -254,6 +365,25 @@ class ScraperOrchestrator:
         if not main_tree:
             raise ValueError("main_tree cannot be None")
 
+        jobs = self._plan_branch_jobs(branch_node, main_driver, root_element)
+        if not jobs:
+            return
+        if summary is not None:
+            summary.subjects += len(jobs)
+        for job in jobs:
+            self._track_exam_owner(job)
+
+        for result in self._run_subject_jobs(jobs, document_tree, fallback_document_tree):
+            try:
+                self._persist_subject_result(result)
+            except Exception as e:
+                print(f"Error persisting subject {result.job.subject_index}/{result.job.total_subjects}: {type(e).__name__}: {e}")
+                continue
+            if summary is not None and not result.failed:
+                summary.succeeded_subjects += 1
+
+    def _plan_branch_jobs(self, branch_node, main_driver, root_element=None) -> list[SubjectJob]:
+        """Annotate a subject type branch on the main page and plan a job per subject."""
         # Annotate branch
         try:
             annotator, coordinator = self.factory_functions.create_tree_annotator(
@@ -265,12 +395,14 @@ class ScraperOrchestrator:
             raise RuntimeError(f"Failed to create tree annotator for branch: {e}")
 
         try:
-            annotator.annotate_tree(
-                main_driver, branch_node, coordinator,
-                self.main_query_services.schema_queries,
-                self.main_query_services.config_queries,
-                self.main_query_services.template_registry
-            )
+            with span("annotation", scope="branch"):
+                annotator.annotate_tree(
+                    main_driver, branch_node, coordinator,
+                    self.main_query_services.schema_queries,
+                    self.main_query_services.config_queries,
+                    self.main_query_services.template_registry,
+                    root_element
+                )
         except Exception as e:
             raise RuntimeError(f"Failed to annotate branch tree: {type(e).__name__}: {e}")
 
@@ -282,7 +414,21 @@ class ScraperOrchestrator:
 
         if not subject_nodes:
             print("Warning: No subject nodes (<li> tags) found in branch")
-            return
+            return []
+
+        try:
+            return self._plan_subject_jobs(subject_nodes)
+        except Exception as e:
+            raise RuntimeError(f"Failed to plan subject jobs for branch: {e}")
+
+    def _plan_subject_jobs(self, subject_nodes) -> list[SubjectJob]:
+        """Resolve URLs and tracker state for every subject on the coordinator.
+
+        Only the pages that still need scraping are flagged; already-visited or
+        already-stored documents are left for _persist_subject_result to resolve.
+        """
+        jobs = []
+        planned_urls = set()
 
         for i, subject_node in enumerate(subject_nodes, 1):
             try:
@@ -295,137 +441,495 @@ class ScraperOrchestrator:
                 print(f"Info: No URLs found for subject node {i}/{len(subject_nodes)}")
                 continue
 
-            has_exam = "exam_page_url" in documents_url_dict
-            has_solution = "solution_page_url" in documents_url_dict
+            job = SubjectJob(
+                subject_index=i,
+                total_subjects=len(subject_nodes),
+                exam_url=documents_url_dict.get("exam_page_url"),
+                solution_url=documents_url_dict.get("solution_page_url"),
+            )
 
-            # Initialise defaults so they're always defined
-            instance = Instance()
-            exam_id = None
-            exam_success = False
-            solution_success = False
+            if job.has_exam and job.exam_url not in planned_urls:
+                job.scrape_exam = self._needs_scraping(job.exam_url, "exam")
+            if job.has_solution and job.solution_url not in planned_urls:
+                job.scrape_solution = self._needs_scraping(job.solution_url, "solution")
 
-            if has_exam:
-                exam_url = documents_url_dict["exam_page_url"]
+            planned_urls.update(url for url in (job.exam_url, job.solution_url) if url)
+            jobs.append(job)
 
-                try:
-                    already_visited = self.instance_tracker.check_entry_page_exists_in_visited_urls(exam_url)
-                except Exception as e:
-                    print(f"Error checking visited URLs for exam '{exam_url}': {e}")
-                    pass
+        return jobs
 
-                if already_visited:
-                    try:
-                        exam_id = self.instance_tracker.get_exam_id_by_url(exam_url)
-                    except Exception as e:
-                        print(f"Error retrieving exam_id from tracker for '{exam_url}': {e}")
-                        pass
-                else:
-                    try:
-                        exists_in_db = self.instance_tracker.check_entry_page_exists_in_exam_db(exam_url)
-                    except Exception as e:
-                        print(f"Error checking exam DB for '{exam_url}': {e}")
-                        pass
+    def _needs_scraping(self, url: str, document_type: str) -> bool:
+        """Check the tracker (visited list, then DB) for a document entry page."""
+        try:
+            if self.instance_tracker.check_entry_page_exists_in_visited_urls(url):
+                return False
+        except Exception as e:
+            print(f"Error checking visited URLs for {document_type} '{url}': {e}")
 
-                    if exists_in_db:
-                        try:
-                            exam_id = self.instance_tracker.get_exam_id_by_url(exam_url)
-                        except Exception as e:
-                            print(f"Error retrieving exam_id from DB for '{exam_url}': {e}")
-                            pass
+        try:
+            if document_type == "exam":
+                exists_in_db = self.instance_tracker.check_entry_page_exists_in_exam_db(url)
+            else:
+                exists_in_db = self.instance_tracker.check_entry_page_exists_in_solution_db(url)
+        except Exception as e:
+            print(f"Error checking {document_type} DB for '{url}': {e}")
+            exists_in_db = False
 
-                        try:
-                            self.instance_tracker.add_exam_entry_page_to_visited_urls(exam_url)
-                        except Exception as e:
-                            print(f"Warning: Failed to cache exam URL '{exam_url}' in visited list: {e}")
+        if not exists_in_db:
+            return True
 
-                    else:
-                        exam_success = self.scrape_document_with_retry(
-                            document_type="exam",
-                            url=exam_url,
-                            document_tree=document_tree,
-                            fallback_document_tree=fallback_document_tree,
-                            instance=instance,
-                            subject_index=i,
-                            total_subjects=len(subject_nodes)
-                        )
-
-                        if exam_success:
-                            print("\n✓ SUCCESS: Exam scraped successfully")
-                            print(f"Instance: {instance}")
-                            if len(instance.exam_variant) == 1:
-                                exam_record = self.mapper.map_to_single_exam_record(instance)
-                                exam_id = self.database_repository.insert_exam_record(exam_record)
-                            else:
-                                exam_records = self.mapper.map_to_multiple_exam_records(instance)
-                                for exam_record in exam_records:
-                                    exam_id = self.database_repository.insert_exam_record(exam_record)
-
-                            try:
-                                self.instance_tracker.add_exam_entry_page_to_visited_urls(exam_url)
-                            except Exception as e:
-                                print(f"Warning: Failed to cache exam URL '{exam_url}' in visited list: {e}")
-                        else:
-                            print("\n✗ FAILURE: Could not scrape exam after all attempts")
-
-            if has_solution:
-                solution_url = documents_url_dict["solution_page_url"]
+        try:
+            if document_type == "exam":
+                self.instance_tracker.add_exam_entry_page_to_visited_urls(url)
+            else:
+                self.instance_tracker.add_solution_entry_page_to_visited_urls(url)
+        except Exception as e:
+            print(f"Warning: Failed to cache {document_type} URL '{url}' in visited list: {e}")
+        return False
+
+    def _run_subject_jobs(self, jobs, document_tree, fallback_document_tree):
+        """Scrape jobs serially, or on self.workers threads; yields results as they finish."""
+        if self.workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield self._scrape_subject_job(job, document_tree, fallback_document_tree)
+            return
+
+        job_queue = BlockingQueue()
+        result_queue = BlockingQueue()
+        worker_count = min(self.workers, len(jobs))
+
+        for job in jobs:
+            job_queue.put(job)
+        job_queue.close()  # workers stop once every job is taken
+
+        def worker():
+            for job in job_queue:
+                result_queue.put(self._scrape_subject_job(job, document_tree, fallback_document_tree))
+            result_queue.put(None)  # this worker is done
+
+        threads = [
+            threading.Thread(target=worker, name=f"subject-worker-{n}", daemon=True)
+            for n in range(worker_count)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        while finished < worker_count:
+            result = result_queue.get()
+            if result is None:
+                finished += 1
+                continue
+            yield result
+
+        for thread in threads:
+            thread.join()
+
+    def _scrape_subject_job(self, job: SubjectJob, document_tree, fallback_document_tree) -> SubjectResult:
+        """Worker side: scrape the exam/solution pages of one subject. No DB or tracker access."""
+        result = SubjectResult(job=job)
 
+        try:
+            if job.scrape_exam:
+                result.exam_success = self.scrape_document_with_retry(
+                    document_type="exam",
+                    url=job.exam_url,
+                    document_tree=document_tree,
+                    fallback_document_tree=fallback_document_tree,
+                    instance=result.instance,
+                    subject_index=job.subject_index,
+                    total_subjects=job.total_subjects
+                )
+
+            if job.scrape_solution:
+                setattr(result.instance.documents, "solution_exists", True)
+                result.solution_success = self.scrape_document_with_retry(
+                    document_type="solution",
+                    url=job.solution_url,
+                    document_tree=document_tree,
+                    fallback_document_tree=fallback_document_tree,
+                    instance=result.instance,
+                    subject_index=job.subject_index,
+                    total_subjects=job.total_subjects
+                )
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            print(f"Error scraping subject {job.subject_index}/{job.total_subjects}: {result.error}")
+
+        return result
+
+    def _track_exam_owner(self, job: SubjectJob) -> None:
+        """Called once a job's scrape flags are final: other subjects sharing its exam wait for it."""
+        if job.scrape_exam:
+            with self._exams_in_flight_lock:
+                self._exams_in_flight.setdefault(job.exam_url, [])
+
+    def _persist_subject_result(self, result: SubjectResult) -> None:
+        """
+        Coordinator side: DB inserts and visited-URL updates for one subject.
+
+        A subject whose exam page is scraped by another, not yet persisted, subject is
+        held back until that exam is stored, so its solution can be linked to it.
+        """
+        job = result.job
+        if self._wait_for_exam(result):
+            return
+        try:
+            self._store_subject_result(result)
+        finally:
+            if job.scrape_exam:
+                self._release_waiting_solutions(job.exam_url)
+
+    def _wait_for_exam(self, result: SubjectResult) -> bool:
+        job = result.job
+        if job.scrape_exam or not job.has_exam or not (job.scrape_solution and result.solution_success):
+            return False
+        with self._exams_in_flight_lock:
+            waiting = self._exams_in_flight.get(job.exam_url)
+            if waiting is None:
+                return False
+            waiting.append(result)
+        logger.debug(f"Subject {job.subject_index}/{job.total_subjects} waits for exam '{job.exam_url}' to be stored")
+        return True
+
+    def _release_waiting_solutions(self, exam_url: str) -> None:
+        """The exam of exam_url was stored (or failed): persist the subjects waiting for it."""
+        with self._exams_in_flight_lock:
+            waiting = self._exams_in_flight.pop(exam_url, [])
+        for result in waiting:
+            try:
+                self._store_subject_result(result)
+            except Exception as e:
+                print(f"Error persisting subject {result.job.subject_index}/{result.job.total_subjects}: {type(e).__name__}: {e}")
+
+    def _store_subject_result(self, result: SubjectResult) -> None:
+        job = result.job
+        instance = result.instance
+        exam_id = None
+        pending_exam_url = None  # exam still buffered by the batching repository
+        # batching repository: records are handed over together at the end
+        new_exam_records = []
+        new_solution_record = None
+
+        if job.has_exam:
+            exam_url = job.exam_url
+
+            if not job.scrape_exam:
                 try:
-                    already_visited = self.instance_tracker.check_entry_page_exists_in_visited_urls(solution_url)
+                    exam_id = self.instance_tracker.get_exam_id_by_url(exam_url)
                 except Exception as e:
-                    print(f"Error checking visited URLs for solution '{solution_url}': {e}")
-                    already_visited = False
+                    print(f"Error retrieving exam_id from tracker for '{exam_url}': {e}")
+                if exam_id is None and self.batching and self.database_repository.has_exam(exam_url):
+                    pending_exam_url = exam_url
+
+            elif result.exam_success:
+                print("\n✓ SUCCESS: Exam scraped successfully")
+                print(f"Instance: {instance}")
+                if len(instance.exam_variant) == 1:
+                    exam_records = [self.mapper.map_to_single_exam_record(instance)]
+                else:
+                    exam_records = self.mapper.map_to_multiple_exam_records(instance)
 
-                if already_visited:
-                    pass
+                if self.batching:
+                    new_exam_records = exam_records
                 else:
-                    try:
-                        exists_in_db = self.instance_tracker.check_entry_page_exists_in_solution_db(solution_url)
-                    except Exception as e:
-                        print(f"Error checking solution DB for '{solution_url}': {e}")
-                        exists_in_db = False
+                    for exam_record in exam_records:
+                        exam_id = self.database_repository.insert_exam_record(exam_record)
+
+                try:
+                    if not self.batching:
+                        self.instance_tracker.record_exam(exam_url, exam_id)
+                    self.instance_tracker.add_exam_entry_page_to_visited_urls(exam_url)
+                except Exception as e:
+                    print(f"Warning: Failed to cache exam URL '{exam_url}' in visited list: {e}")
+            else:
+                print("\n✗ FAILURE: Could not scrape exam after all attempts")
+
+        if job.has_solution and job.scrape_solution:
+            solution_url = job.solution_url
 
-                    if exists_in_db:
+            if result.solution_success:
+                print("\n✓ SUCCESS: Solution scraped successfully")
+                print(f"Instance: {instance}")
+                if exam_id is None and not new_exam_records and pending_exam_url is None:
+                    # not marked visited: a later run scrapes it again once the exam is stored
+                    print("Warning: solution scraped but no exam_id available — skipping DB insert")
+                else:
+                    solution_record = self.mapper.map_to_solution_record(instance)
+                    if self.batching:
+                        new_solution_record = solution_record
+                    else:
+                        self.database_repository.insert_solution_record(solution_record, exam_id)
                         try:
-                            self.instance_tracker.add_solution_entry_page_to_visited_urls(solution_url)
+                            self.instance_tracker.record_solution(solution_url)
                         except Exception as e:
-                            print(f"Warning: Failed to cache solution URL '{solution_url}' in visited list: {e}")
-                    else:
-                        setattr(instance.documents, "solution_exists", True)
-                        solution_success = self.scrape_document_with_retry(
-                            document_type="solution",
-                            url=solution_url,
-                            document_tree=document_tree,
-                            fallback_document_tree=fallback_document_tree,
-                            instance=instance,
-                            subject_index=i,
-                            total_subjects=len(subject_nodes)
-                        )
-
-                        if solution_success:
-                            print("\n✓ SUCCESS: Solution scraped successfully")
-                            print(f"Instance: {instance}")
-                            if exam_id is None:
-                                print("Warning: solution scraped but no exam_id available — skipping DB insert")
-                            else:
-                                solution_record = self.mapper.map_to_solution_record(instance)
-                                self.database_repository.insert_solution_record(solution_record, exam_id)
-
-                            try:
-                                self.instance_tracker.add_solution_entry_page_to_visited_urls(solution_url)
-                            except Exception as e:
-                                print(f"Warning: Failed to cache solution URL '{solution_url}' in visited list: {e}")
-                        else:
-                            print("\n✗ FAILURE: Could not scrape solution after all attempts")
-            
-            
-            instance.scraping_status, instance.error_message = self._determine_scraping_status(
-                has_exam, has_solution, exam_success, solution_success
+                            print(f"Warning: Failed to record solution URL '{solution_url}' in tracker: {e}")
+
+                    try:
+                        self.instance_tracker.add_solution_entry_page_to_visited_urls(solution_url)
+                    except Exception as e:
+                        print(f"Warning: Failed to cache solution URL '{solution_url}' in visited list: {e}")
+            else:
+                print("\n✗ FAILURE: Could not scrape solution after all attempts")
+
+        if new_exam_records or new_solution_record is not None:
+            self.database_repository.add_subject(
+                new_exam_records,
+                new_solution_record,
+                exam_id=exam_id,
+                on_flushed=self._tracker_write_through(job),
+                exam_url=pending_exam_url
+            )
+
+        instance.scraping_status, instance.error_message = self._determine_scraping_status(
+            job.has_exam, job.has_solution, result.exam_success, result.solution_success
+        )
+        if result.error and not instance.error_message:
+            instance.error_message = result.error
+        instance.scraped_at = datetime.now()
+
+        print(f"\n{'='*50}")
+        print(f"Final Status: {instance.scraping_status.upper()}")
+        if instance.error_message:
+            print(f"Error: {instance.error_message}")
+        print(f"{'='*50}\n")
+
+    def _tracker_write_through(self, job: SubjectJob):
+        """Flush callback of the batching repository: record the stored ids in the tracker."""
+        def on_flushed(exam_ids, solution_id):
+            if exam_ids:
+                self.instance_tracker.record_exam(job.exam_url, exam_ids[-1])
+            if solution_id is not None:
+                self.instance_tracker.record_solution(job.solution_url)
+        return on_flushed
+
+    def _flush_database(self) -> None:
+        """Write out records still buffered by a batching repository."""
+        if not self.batching:
+            return
+        try:
+            self.database_repository.flush()
+        except Exception as e:
+            print(f"Error: Failed to flush buffered records: {type(e).__name__}: {e}")
+            raise
+
+    # ==================== ASYNC PIPELINE ====================
+
+    def run_pipeline(
+        self,
+        fetch_workers: int = None,
+        download_workers: int = None,
+        pdf_workers: int = None,
+        queue_size: int = None,
+    ):
+        """
+        Same workflow as run(), as a staged pipeline:
+        discover -> fetch (entry pages) -> download (page images) -> pdf -> persist.
+
+        Subjects overlap across stages, so one subject's PDF is assembled while the
+        next one's images download and a third entry page loads. Unset sizes come
+        from PIPELINE_FETCH_WORKERS / PIPELINE_DOWNLOAD_WORKERS / PIPELINE_PDF_WORKERS /
+        PIPELINE_QUEUE_SIZE. Persistence stays on a single worker.
+
+        Returns:
+            dict: stage name -> StageStats
+
+        Raises RuntimeError when nothing was scraped, as run() does.
+        """
+        fetch_workers = fetch_workers or int(os.getenv("PIPELINE_FETCH_WORKERS", str(self.workers)))
+        download_workers = download_workers or int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", "4"))
+        pdf_workers = pdf_workers or int(os.getenv("PIPELINE_PDF_WORKERS", "2"))
+        queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+        main_driver = None
+        summary = RunSummary()
+        try:
+            main_tree, main_driver, main_root_element, document_tree, fallback_document_tree = self._build_trees()
+
+            subject_type_branches = self._find_subject_type_branches(main_tree)
+            summary.branches = len(subject_type_branches)
+            if not subject_type_branches:
+                summary.raise_if_nothing_done(self.main_query_services.page_url)
+
+            trees = (document_tree, fallback_document_tree)
+            pipeline = AsyncPipeline(
+                [
+                    PipelineStage("fetch", lambda work: self._pipeline_fetch(work, *trees), fetch_workers),
+                    PipelineStage("download", lambda work: self._pipeline_download(work, *trees), download_workers),
+                    PipelineStage("pdf", lambda work: self._pipeline_convert(work, *trees), pdf_workers),
+                    PipelineStage("persist", lambda work: self._pipeline_persist(work, summary), 1),
+                ],
+                queue_size=queue_size,
+                on_error=self._report_pipeline_error,
+            )
+            stats = pipeline.run(
+                self._discover_subject_work(subject_type_branches, main_driver, main_root_element, summary)
+            )
+
+            for stage_stats in stats.values():
+                logger.info(
+                    f"Stage {stage_stats.name}: {stage_stats.processed} done, {stage_stats.failed} failed, "
+                    f"{stage_stats.busy_seconds:.1f}s busy, max {stage_stats.max_in_flight} in flight"
+                )
+        finally:
+            self._close_run_resources(main_driver)
+
+        summary.raise_if_nothing_done(self.main_query_services.page_url)
+        return stats
+
+    def _discover_subject_work(self, subject_type_branches, main_driver, root_element=None, summary: RunSummary = None):
+        """Pipeline source. Runs on one thread, so the main driver is never shared."""
+        planned_urls = set()  # across branches: earlier subjects may not be persisted yet
+
+        for i, branch in enumerate(subject_type_branches, 1):
+            try:
+                jobs = self._plan_branch_jobs(branch, main_driver, root_element)
+            except Exception as e:
+                if summary is not None:
+                    summary.failed_branches += 1
+                print(f"Error processing branch {i}/{len(subject_type_branches)}: {type(e).__name__}: {e}")
+                continue
+            if summary is not None:
+                summary.subjects += len(jobs)
+
+            for job in jobs:
+                if job.exam_url in planned_urls:
+                    job.scrape_exam = False
+                if job.solution_url in planned_urls:
+                    job.scrape_solution = False
+                planned_urls.update(url for url in (job.exam_url, job.solution_url) if url)
+                self._track_exam_owner(job)
+                yield SubjectWork(result=SubjectResult(job=job))
+
+    def _pipeline_fetch(self, work: SubjectWork, document_tree, fallback_document_tree) -> SubjectWork:
+        """Fetch stage: read the entry pages, exam first (the solution reuses its metadata)."""
+        job = work.job
+        try:
+            if job.scrape_exam:
+                self._plan_document_with_retry(work, "exam", 0, document_tree, fallback_document_tree)
+            if job.scrape_solution:
+                setattr(work.result.instance.documents, "solution_exists", True)
+                self._plan_document_with_retry(work, "solution", 0, document_tree, fallback_document_tree)
+        except Exception as e:
+            work.result.error = f"{type(e).__name__}: {e}"
+            print(f"Error scraping subject {job.subject_index}/{job.total_subjects}: {work.result.error}")
+        return work
+
+    def _pipeline_download(self, work: SubjectWork, document_tree, fallback_document_tree) -> SubjectWork:
+        """Download stage: fetch the planned page images."""
+        for state, plan in list(work.plans.items()):
+            if plan is None:
+                continue
+            try:
+                work.scrapers[state].instance_assembler.document_retriever.download_document(plan)
+            except Exception as e:
+                self._retry_document_with_fallback(
+                    work, state, e, document_tree, fallback_document_tree, convert=False
+                )
+        return work
+
+    def _pipeline_convert(self, work: SubjectWork, document_tree, fallback_document_tree) -> SubjectWork:
+        """PDF stage: assemble the downloaded pages and record the document on the instance."""
+        for state, plan in list(work.plans.items()):
+            if plan is None:
+                continue
+            try:
+                work.scrapers[state].instance_assembler.document_retriever.convert_document(plan)
+            except Exception as e:
+                plan = self._retry_document_with_fallback(
+                    work, state, e, document_tree, fallback_document_tree, convert=True
+                )
+                if plan is None:
+                    continue
+            self._record_planned_document(work, state, plan)
+        return work
+
+    def _pipeline_persist(self, work: SubjectWork, summary: RunSummary = None) -> None:
+        self._persist_subject_result(work.result)
+        if summary is not None and not work.result.failed:
+            summary.succeeded_subjects += 1  # single persist worker: no lock needed
+        return None
+
+    def _plan_document_with_retry(self, work: SubjectWork, state, first_attempt, document_tree, fallback_document_tree) -> None:
+        """
+        Pipeline counterpart of scrape_document_with_retry that stops once the page URLs are known.
+
+        Stores the plan and its scraper on work; leaves no plan when every attempt failed.
+        """
+        job = work.job
+        url = job.exam_url if state == "exam" else job.solution_url
+
+        for attempt in range(first_attempt, MAX_DOCUMENT_ATTEMPTS):
+            document_page_scraper, page_tree = self._document_scraper(attempt, document_tree, fallback_document_tree)
+            try:
+                plan = document_page_scraper.plan_page(url, page_tree, state, work.result.instance)
+            except RuntimeError as e:
+                if not self._is_retryable(e):
+                    print(f"Error: Non-retryable RuntimeError occurred: {e}")
+                    raise
+                if attempt < MAX_DOCUMENT_ATTEMPTS - 1:
+                    increment("document_retries", state=state)
+                    print(f"Warning: {state.capitalize()} scraping failed on attempt {attempt + 1}, retrying with fallback")
+                    print(f"  Error: {e}")
+                    continue
+                print(f"Error: {state.capitalize()} scraping failed after {MAX_DOCUMENT_ATTEMPTS} attempts")
+                print(f"  URL: {url}")
+                print(f"  Error: {e}")
+                return
+
+            work.plans[state] = plan
+            work.scrapers[state] = document_page_scraper
+            work.attempts[state] = attempt
+            if plan is None:
+                # no document nodes on the page: nothing to download, as in scrape_page
+                setattr(work.result, f"{state}_success", True)
+            return
+
+    def _retry_document_with_fallback(self, work: SubjectWork, state, error, document_tree, fallback_document_tree, convert: bool):
+        """
+        A primary-layout document failed after planning: re-plan it with the fallback
+        layout and catch up on the steps already done (download, and convert if asked).
+
+        Returns:
+            The fallback DocumentPlan, or None when there is nothing left to process
+        """
+        work.plans.pop(state, None)
+        if work.attempts.get(state, 0) >= MAX_DOCUMENT_ATTEMPTS - 1:
+            print(f"Error: {state.capitalize()} scraping failed after {MAX_DOCUMENT_ATTEMPTS} attempts")
+            print(f"  Error: {type(error).__name__}: {error}")
+            return None
+
+        increment("document_retries", state=state)
+        print(f"Warning: {state.capitalize()} document failed on attempt 1, retrying with fallback")
+        print(f"  Error: {type(error).__name__}: {error}")
+        try:
+            self._plan_document_with_retry(work, state, 1, document_tree, fallback_document_tree)
+            plan = work.plans.get(state)
+            if plan is None:
+                return None
+
+            document_retriever = work.scrapers[state].instance_assembler.document_retriever
+            document_retriever.download_document(plan)
+            if convert:
+                document_retriever.convert_document(plan)
+            return plan
+        except Exception as e:
+            work.plans.pop(state, None)
+            print(f"Error: {state.capitalize()} fallback failed: {type(e).__name__}: {e}")
+            return None
+
+    def _record_planned_document(self, work: SubjectWork, state, plan) -> None:
+        try:
+            work.scrapers[state].instance_assembler.record_document(
+                work.result.instance, state, plan.save_path, plan.page_urls
             )
-            instance.scraped_at = datetime.now()
+        except Exception as e:
+            print(f"Error: Failed to record {state} document: {type(e).__name__}: {e}")
+            return
+        setattr(work.result, f"{state}_success", True)
+        logger.debug(f"{state.capitalize()} scraped successfully for subject {work.job.subject_index}/{work.job.total_subjects}")
 
-            print(f"\n{'='*50}")
-            print(f"Final Status: {instance.scraping_status.upper()}")
-            if instance.error_message:
-                print(f"Error: {instance.error_message}")
-            print(f"{'='*50}\n")
\ No newline at end of file
+    @staticmethod
+    def _report_pipeline_error(stage_name, work, error) -> None:
+        subject = f" subject {work.job.subject_index}/{work.job.total_subjects}" if isinstance(work, SubjectWork) else ""
+        print(f"Error in pipeline stage '{stage_name}'{subject}: {type(error).__name__}: {error}")
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from dom_processing.my_scraper.models import DocumentPlan, Instance
+
+
+@dataclass
+class SubjectJob:
+    """One <li> subject: which document pages a worker still has to scrape."""
+    subject_index: int
+    total_subjects: int
+    exam_url: Optional[str] = None
+    solution_url: Optional[str] = None
+    scrape_exam: bool = False
+    scrape_solution: bool = False
+
+    @property
+    def has_exam(self) -> bool:
+        return self.exam_url is not None
+
+    @property
+    def has_solution(self) -> bool:
+        return self.solution_url is not None
+
+
+@dataclass
+class SubjectResult:
+    """What a worker hands back to the coordinator for persistence."""
+    job: SubjectJob
+    instance: Instance = field(default_factory=Instance)
+    exam_success: bool = False
+    solution_success: bool = False
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        """A document the job asked for was not scraped."""
+        return (
+            self.error is not None
+            or (self.job.scrape_exam and not self.exam_success)
+            or (self.job.scrape_solution and not self.solution_success)
+        )
+
+
+@dataclass
+class RunSummary:
+    """What one run() / run_pipeline() got through; a run that did nothing raises so callers can retry it."""
+    branches: int = 0
+    failed_branches: int = 0
+    subjects: int = 0
+    succeeded_subjects: int = 0
+
+    def raise_if_nothing_done(self, page_url: str) -> None:
+        if not self.branches:
+            raise RuntimeError(f"No subject type branches found on '{page_url}'")
+        if self.failed_branches == self.branches:
+            raise RuntimeError(f"All {self.branches} subject type branch(es) failed on '{page_url}'")
+        if not self.subjects:
+            raise RuntimeError(f"No subjects found in {self.branches} branch(es) on '{page_url}'")
+        if not self.succeeded_subjects:
+            raise RuntimeError(f"All {self.subjects} subject(s) failed on '{page_url}'")
+
+
+@dataclass
+class SubjectWork:
+    """A subject travelling through the async pipeline: its result plus per-document progress."""
+    result: SubjectResult
+    plans: Dict[str, Optional[DocumentPlan]] = field(default_factory=dict)  # state -> plan
+    scrapers: Dict[str, Any] = field(default_factory=dict)  # state -> PageScraper that made the plan
+    attempts: Dict[str, int] = field(default_factory=dict)  # state -> 0 primary, 1 fallback
+
+    @property
+    def job(self) -> SubjectJob:
+        return self.result.job
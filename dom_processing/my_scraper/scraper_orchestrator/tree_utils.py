@@ -2,7 +2,10 @@ import copy
 
 
 def clone_tree_structure(node):
-    """Recursively clone tree structure without web elements."""
+    """Clone tree structure without web elements; clones link to their cloned parents."""
+    if hasattr(node, 'clone_structure'):
+        return node.clone_structure()
+
     new_node = copy.copy(node)
     
     if hasattr(new_node, 'web_element'):
@@ -10,5 +13,8 @@ def clone_tree_structure(node):
     
     if hasattr(node, 'children') and node.children:
         new_node.children = [clone_tree_structure(child) for child in node.children]
+        for child in new_node.children:
+            if hasattr(child, 'parent'):
+                child.parent = new_node
     
     return new_node
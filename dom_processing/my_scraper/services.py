@@ -4,15 +4,22 @@ Service classes for path management, downloading, and PDF conversion.
 
 import os
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from PIL import Image
+from dom_processing.instrumentation import increment, logger, span
 from .models import InstanceMetadata, Instance
 from .interfaces import ContentTransformer
+from .page_cache import PageCache, PageCacheMiss
+from .pdf_writer import StreamingPDFWriter
 import os
 from pathlib import Path
 
@@ -235,10 +242,171 @@ class MetadataProcessing:
         return processed_metadata
 
 
-import time
+class HostRateLimiter:
+    """Token bucket per host: at most `rate` requests per second, bursts up to `burst`."""
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be >= 1, got {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to url's host is allowed. Returns the time waited."""
+        host = urlparse(url).netloc.lower()
+
+        with self._lock:
+            now = self._clock()
+            tokens, last = self._buckets.get(host, [float(self.burst), now])
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            # reserve the token now so concurrent callers queue up behind us
+            tokens -= 1.0
+            self._buckets[host] = [tokens, now]
+            wait = -tokens / self.rate if tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+# shared so every downloader (one per retriever / worker) is polite to the same host together;
+# built on first use, so DOWNLOAD_HOST_* set by load_dotenv() in the entry points apply
+_HOST_RATE_LIMITER: Optional[HostRateLimiter] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_host_rate_limiter() -> HostRateLimiter:
+    """Process-wide limiter from DOWNLOAD_HOST_RATE / DOWNLOAD_HOST_BURST."""
+    global _HOST_RATE_LIMITER
+    with _SHARED_LOCK:
+        if _HOST_RATE_LIMITER is None:
+            _HOST_RATE_LIMITER = HostRateLimiter(
+                rate=float(os.getenv("DOWNLOAD_HOST_RATE", "5")),
+                burst=int(os.getenv("DOWNLOAD_HOST_BURST", "5")),
+            )
+        return _HOST_RATE_LIMITER
+
+
+# None unless PAGE_CACHE_DIR is set; opened on first use, after load_dotenv(), not at import
+_PAGE_CACHE: Optional[PageCache] = None
+_PAGE_CACHE_LOADED = False
+
+
+def shared_page_cache() -> Optional[PageCache]:
+    """Process-wide page cache from PAGE_CACHE_DIR (see PageCache.from_env)."""
+    global _PAGE_CACHE, _PAGE_CACHE_LOADED
+    with _SHARED_LOCK:
+        if not _PAGE_CACHE_LOADED:
+            _PAGE_CACHE = PageCache.from_env()
+            _PAGE_CACHE_LOADED = True
+        return _PAGE_CACHE
+
+
+DEFAULT_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/15.1 Safari/605.1.15",
+    "Mozilla/5.0 (Linux; Android 10) AppleWebKit/537.36 Chrome/119.0.0.0 Mobile Safari/537.36",
+]
+
+
+def user_agent_pool() -> List[str]:
+    """User-Agent strings for every HTTP fetch: DOWNLOAD_USER_AGENTS ("|"-separated) or the defaults."""
+    configured = [agent.strip() for agent in os.getenv("DOWNLOAD_USER_AGENTS", "").split("|") if agent.strip()]
+    return configured or list(DEFAULT_USER_AGENTS)
+
+
+def fetch_through_cache(
+    session: requests.Session,
+    url: str,
+    headers: Dict[str, str],
+    cache: Optional[PageCache],
+    timeout: float = 10,
+    **labels,
+) -> Tuple[bytes, str]:
+    """
+    GET url through the page cache (if any).
+
+    Cached entries are revalidated with If-None-Match / If-Modified-Since and a
+    304 is served from disk. Offline mode never touches the network.
+
+    Input:
+        - labels: extra labels for the bytes_downloaded counter
+    Returns:
+        (body bytes, Content-Type)
+    """
+    entry = cache.lookup(url) if cache is not None else None
+
+    if cache is not None and cache.offline:
+        if entry is None:
+            raise PageCacheMiss(f"Page not cached and offline mode is on: {url}")
+        increment("page_cache_hits")
+        return cache.read(entry), entry.content_type
+
+    if entry is not None and entry.has_validators:
+        headers = {**headers, **cache.conditional_headers(entry)}
+
+    response = session.get(
+        url,
+        headers=headers,
+        timeout=timeout,
+    )
+
+    if entry is not None and response.status_code == 304:
+        increment("page_cache_hits")
+        return cache.read(entry), entry.content_type
+
+    response.raise_for_status()
+    increment("bytes_downloaded", len(response.content), **labels)
+    content_type = response.headers.get("Content-Type", "")
+
+    if cache is not None:
+        try:
+            cache.store(
+                url,
+                response.content,
+                content_type=content_type,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        except Exception as e:
+            print(f"Warning: Failed to cache page {url}: {type(e).__name__}: {e}")
+
+    return response.content, content_type
+
 
 class PageDownloader:
     """Service for downloading document pages from URLs."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        page_cache: Optional[PageCache] = None,
+    ):
+        """
+        Input:
+            - max_workers: concurrent page downloads per document (DOWNLOAD_WORKERS, default 4)
+            - rate_limiter: per-host token bucket (process-wide one by default)
+            - page_cache: on-disk response cache (process-wide one from PAGE_CACHE_DIR by default)
+        """
+        self.max_workers = max_workers or int(os.getenv("DOWNLOAD_WORKERS", "4"))
+        if self.max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {self.max_workers}")
+        self.rate_limiter = rate_limiter or shared_host_rate_limiter()
+        self.page_cache = page_cache or shared_page_cache()
     
     def download_document_pages(
     self,
@@ -247,7 +415,7 @@ class PageDownloader:
     metadata: Dict[str, str],
     state: str,
 ) -> None:
-        """Download all document pages with retry and polite delays."""
+        """Download all document pages concurrently, rate limited per host."""
         if not save_path:
             raise ValueError("save_path cannot be None")
         if not isinstance(page_urls, list):
@@ -259,9 +427,9 @@ class PageDownloader:
         if state not in ["exam", "solution"]:
             raise ValueError(f"Invalid state '{state}': must be 'exam' or 'solution'")
         
-        print(f"DEBUG: Starting download for state={state}, {len(page_urls)} pages")
-        print(f"DEBUG: Save path: {save_path}")
-        print(f"DEBUG: First URL: {page_urls[0] if page_urls else 'None'}")
+        logger.debug(f"Starting download for state={state}, {len(page_urls)} pages")
+        logger.debug(f"Save path: {save_path}")
+        logger.debug(f"First URL: {page_urls[0] if page_urls else 'None'}")
         
         try:
             os.makedirs(save_path, exist_ok=True)
@@ -280,6 +448,7 @@ class PageDownloader:
         except Exception as e:
             raise RuntimeError(f"Failed to initialize user-agent pool: {type(e).__name__}: {e}")
 
+        indexed_urls = []
         for index, url in enumerate(page_urls, start=1):
             if not url:
                 print(f"Warning: Empty URL at index {index}, skipping")
@@ -288,9 +457,57 @@ class PageDownloader:
             if not isinstance(url, str):
                 print(f"Warning: URL at index {index} is not a string (got {type(url).__name__}), skipping")
                 continue
-            
+
+            indexed_urls.append((index, url))
+
+        try:
+            failures = self.download_indexed_pages(
+                indexed_urls=indexed_urls,
+                session=session,
+                user_agents=user_agents,
+                save_path=save_path,
+                metadata=metadata,
+                state=state,
+            )
+        finally:
             try:
-                print(f"DEBUG: Downloading page {index}/{len(page_urls)} from {url}")
+                session.close()
+            except Exception as e:
+                print(f"Warning: Failed to close HTTP session: {e}")
+
+        for index, url, error in failures:
+            print(f"Warning: Failed to download page {index}/{len(page_urls)} from {url}: {type(error).__name__}: {error}")
+        
+        logger.debug(f"Finished downloading {len(page_urls)} pages for state={state}")
+
+    def download_indexed_pages(
+        self,
+        *,
+        indexed_urls: List[Tuple[int, str]],
+        session: requests.Session,
+        user_agents: List[str],
+        save_path: Path,
+        metadata: Dict[str, str],
+        state: str,
+    ) -> List[Tuple[int, str, Exception]]:
+        """
+        Download (index, url) pages on a thread pool. File naming and the blank-A4
+        fallback are those of download_single_page.
+
+        Returns:
+            List of (index, url, exception) for pages that could not be saved at all
+        """
+        if not indexed_urls:
+            return []
+
+        offline = self.page_cache is not None and self.page_cache.offline
+
+        def download(index: int, url: str) -> None:
+            if not offline:
+                with span("rate_limit_wait"):
+                    self.rate_limiter.acquire(url)
+            logger.debug(f"Downloading page {index} from {url}")
+            with span("page_download", state=state):
                 self.download_single_page(
                     index=index,
                     url=url,
@@ -300,22 +517,21 @@ class PageDownloader:
                     metadata=metadata,
                     state=state,
                 )
-                print(f"DEBUG: Successfully downloaded page {index}/{len(page_urls)}")
-                
-                # Add polite delay between requests (except after last page)
-                if index < len(page_urls):
-                    time.sleep(0.1)
-                    
-            except Exception as e:
-                print(f"Warning: Failed to download page {index}/{len(page_urls)} from {url}: {type(e).__name__}: {e}")
-                continue
 
-        try:
-            session.close()
-        except Exception as e:
-            print(f"Warning: Failed to close HTTP session: {e}")
-        
-        print(f"DEBUG: Finished downloading {len(page_urls)} pages for state={state}")
+        workers = min(self.max_workers, len(indexed_urls))
+        failures = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-download") as executor:
+            futures = [
+                (index, url, executor.submit(download, index, url))
+                for index, url in indexed_urls
+            ]
+            for index, url, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append((index, url, e))
+
+        return failures
 
     def _create_session_with_retry(self) -> requests.Session:
         """Create HTTP session with retry strategy."""
@@ -330,7 +546,12 @@ class PageDownloader:
                 raise_on_status=False,
             )
 
-            adapter = HTTPAdapter(max_retries=retry_strategy)
+            # one keep-alive connection per concurrent download
+            adapter = HTTPAdapter(
+                max_retries=retry_strategy,
+                pool_connections=self.max_workers,
+                pool_maxsize=self.max_workers,
+            )
             session.mount("http://", adapter)
             session.mount("https://", adapter)
 
@@ -340,11 +561,7 @@ class PageDownloader:
 
     def _get_user_agent_pool(self) -> List[str]:
         """Get list of user agent strings."""
-        return [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/15.1 Safari/605.1.15",
-            "Mozilla/5.0 (Linux; Android 10) AppleWebKit/537.36 Chrome/119.0.0.0 Mobile Safari/537.36",
-        ]
+        return user_agent_pool()
 
     def download_single_page(
         self,
@@ -377,14 +594,8 @@ class PageDownloader:
                 "Connection": "keep-alive",
             }
 
-            response = session.get(
-                url,
-                headers=headers,
-                timeout=10,
-            )
-            response.raise_for_status()
-
-            content_type = response.headers.get("Content-Type", "").lower()
+            content, content_type = self._fetch_page_content(session, url, headers)
+            content_type = content_type.lower()
 
             if "pdf" in content_type or url.lower().endswith(".pdf"):
                 ext = "pdf"
@@ -395,9 +606,13 @@ class PageDownloader:
             file_save_path = os.path.join(save_path, filename)
 
             with open(file_save_path, "wb") as f:
-                f.write(response.content)
+                f.write(content)
 
+        except PageCacheMiss:
+            # offline: a blank page would silently stand in for a real one
+            raise
         except requests.exceptions.Timeout:
+            increment("blank_pages", reason="timeout")
             print(f"Warning: Timeout downloading page {index} from {url}, saving blank page")
             filename = self._get_page_filename(index, metadata, state, "jpg")
             file_save_path = os.path.join(save_path, filename)
@@ -407,6 +622,7 @@ class PageDownloader:
                 print(f"Error: Failed to save blank page for index {index}: {blank_error}")
                 raise
         except requests.exceptions.RequestException as e:
+            increment("blank_pages", reason="request_error")
             print(f"Warning: Request failed for page {index} from {url}: {type(e).__name__}: {e}, saving blank page")
             filename = self._get_page_filename(index, metadata, state, "jpg")
             file_save_path = os.path.join(save_path, filename)
@@ -416,6 +632,7 @@ class PageDownloader:
                 print(f"Error: Failed to save blank page for index {index}: {blank_error}")
                 raise
         except Exception as e:
+            increment("blank_pages", reason="unexpected_error")
             print(f"Warning: Unexpected error downloading page {index} from {url}: {type(e).__name__}: {e}, saving blank page")
             filename = self._get_page_filename(index, metadata, state, "jpg")
             file_save_path = os.path.join(save_path, filename)
@@ -425,6 +642,15 @@ class PageDownloader:
                 print(f"Error: Failed to save blank page for index {index}: {blank_error}")
                 raise
 
+    def _fetch_page_content(
+        self,
+        session: requests.Session,
+        url: str,
+        headers: Dict[str, str],
+    ) -> Tuple[bytes, str]:
+        """GET url through the page cache (if any); see fetch_through_cache."""
+        return fetch_through_cache(session, url, headers, self.page_cache)
+
     def _get_page_filename(
         self,
         index: int,
@@ -495,14 +721,6 @@ class PDFConverter:
             print(f"Warning: No image files found in '{save_path}', skipping PDF conversion")
             return
         
-        try:
-            images = self._load_images(save_path, image_files)
-        except Exception as e:
-            raise RuntimeError(f"Failed to load images from '{save_path}': {e}")
-        
-        if not images:
-            raise ValueError(f"No images loaded from '{save_path}'")
-        
         try:
             stem = image_files[0].rsplit("_", 1)[0]
         except Exception as e:
@@ -512,7 +730,10 @@ class PDFConverter:
             raise ValueError(f"Empty stem extracted from filename '{image_files[0]}'")
         
         try:
-            self._save_as_pdf(save_path, images, stem)
+            with span("pdf_build"):
+                self._save_as_pdf(save_path, image_files, stem)
+        except (FileNotFoundError, ValueError):
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to save PDF to '{save_path}': {e}")
         
@@ -551,83 +772,64 @@ class PDFConverter:
         
         return image_files
 
-    def _load_images(
+    def _save_as_pdf(
         self,
         save_path: str,
-        image_files: List[str]
-    ) -> List[Image.Image]:
-        """Load and convert images to RGB."""
+        image_files: List[str],
+        stem: str
+    ) -> str:
+        """
+        Stream image files into a single PDF, one page in memory at a time.
+
+        Pages that cannot be decoded are skipped with a warning.
+        """
         if not save_path:
             raise ValueError("save_path cannot be empty")
         if not isinstance(image_files, list):
             raise TypeError(f"image_files must be a list, got {type(image_files).__name__}")
+        if not image_files:
+            raise ValueError("image_files list cannot be empty")
+        if not stem:
+            raise ValueError("stem cannot be empty")
         
-        images = []
-        for i, file in enumerate(image_files):
-            img_path = os.path.join(save_path, file)
-            
-            try:
-                img = Image.open(img_path)
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Image file not found: {img_path}")
-            except Exception as e:
-                raise RuntimeError(f"Failed to open image '{img_path}': {type(e).__name__}: {e}")
-            
-            try:
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
-            except Exception as e:
-                print(f"Warning: Failed to convert image {i+1}/{len(image_files)} '{file}' to RGB: {e}")
-                try:
-                    img.close()
-                except:
-                    pass
-                continue
-            
-            images.append(img)
+        pdf_filename = f"{stem}.pdf"
+        pdf_path = os.path.join(save_path, pdf_filename)
         
-        return images
-
-    def _save_as_pdf(
-            self,
-            save_path: str,
-            images: List[Image.Image],
-            stem: str
-        ) -> str:
-            """Save images as single PDF."""
-            if not save_path:
-                raise ValueError("save_path cannot be empty")
-            if not isinstance(images, list):
-                raise TypeError(f"images must be a list, got {type(images).__name__}")
-            if not images:
-                raise ValueError("images list cannot be empty")
-            if not stem:
-                raise ValueError("stem cannot be empty")
-            
-            try:
-                pdf_filename = f"{stem}.pdf"
+        # Handle duplicate filenames
+        if os.path.exists(pdf_path):
+            index = 1
+            while True:
+                pdf_filename = f"{stem}_{index}.pdf"
                 pdf_path = os.path.join(save_path, pdf_filename)
+                if not os.path.exists(pdf_path):
+                    break
+                index += 1
+        
+        try:
+            with StreamingPDFWriter(pdf_path) as writer:
+                for i, file in enumerate(image_files):
+                    img_path = os.path.join(save_path, file)
+                    if not os.path.exists(img_path):
+                        raise FileNotFoundError(f"Image file not found: {img_path}")
+                    
+                    try:
+                        writer.add_image_file(img_path)
+                    except Exception as e:
+                        print(f"Warning: Failed to add image {i+1}/{len(image_files)} '{file}' to PDF: {e}")
                 
-                # Handle duplicate filenames
-                if os.path.exists(pdf_path):
-                    index = 1
-                    while True:
-                        pdf_filename = f"{stem}_{index}.pdf"
-                        pdf_path = os.path.join(save_path, pdf_filename)
-                        if not os.path.exists(pdf_path):
-                            break
-                        index += 1
-                
-                images[0].save(pdf_path, save_all=True, append_images=images[1:])
-                
-                return pdf_path
-            except PermissionError:
-                raise PermissionError(f"Permission denied when saving PDF to: {save_path}")
-            except Exception as e:
-                raise RuntimeError(
-                    f"Failed to save PDF '{pdf_filename}' to '{save_path}': "
-                    f"{type(e).__name__}: {e}"
-                )
+                if writer.page_count == 0:
+                    raise ValueError(f"No images loaded from '{save_path}'")
+        except (FileNotFoundError, ValueError):
+            raise
+        except PermissionError:
+            raise PermissionError(f"Permission denied when saving PDF to: {save_path}")
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to save PDF '{pdf_filename}' to '{save_path}': "
+                f"{type(e).__name__}: {e}"
+            )
+        
+        return pdf_path
 
     def _delete_images(
         self,
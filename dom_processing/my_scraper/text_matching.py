@@ -0,0 +1,95 @@
+"""
+Multi-pattern alias matching (Aho-Corasick).
+
+AliasMatcher compiles an alias -> value table into one automaton, so a text is
+scanned once whatever the number of aliases, and picks the leftmost-longest,
+non-overlapping hits ("黑龙江" wins over "黑", "全国卷1" over "全国").
+With isolate_single_chars, a one-character alias only counts when it stands
+alone, as the old \\b rule required: "京" matches in "北京卷 京 语文" but not
+in "南京", and "新" not in "新课标Ⅰ卷".
+"""
+
+from typing import Dict, List, Mapping, Tuple
+
+
+class AliasMatcher:
+    """
+    Input:
+        - aliases: alias -> value; built once, then read-only
+        - isolate_single_chars: reject a one-character hit next to a word character (CJK included)
+    """
+
+    def __init__(self, aliases: Mapping[str, str], isolate_single_chars: bool = False):
+        if not aliases:
+            raise ValueError("aliases cannot be empty")
+        self._values = dict(aliases)
+        self.isolate_single_chars = isolate_single_chars
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[str, ...]] = [()]  # aliases ending at each state, longest first
+        for alias in self._values:
+            if not alias:
+                raise ValueError("aliases cannot contain an empty string")
+            self._add(alias)
+        self._link()
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """(start, alias) of every leftmost-longest non-overlapping hit, in text order."""
+        hits = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for alias in self._outputs[state]:
+                start = end - len(alias) + 1
+                if len(alias) == 1 and self.isolate_single_chars and not self._stands_alone(text, start):
+                    continue
+                hits.append((start, alias))
+
+        hits.sort(key=lambda hit: (hit[0], -len(hit[1])))
+        selected = []
+        covered_until = 0
+        for start, alias in hits:
+            if start >= covered_until:
+                selected.append((start, alias))
+                covered_until = start + len(alias)
+        return selected
+
+    def find_values(self, text: str) -> List[str]:
+        """Values of the hits, first occurrence order, without duplicates."""
+        return list(dict.fromkeys(self._values[alias] for _, alias in self.find(text)))
+
+    @staticmethod
+    def _stands_alone(text: str, position: int) -> bool:
+        """No word character (\\w: letters, digits, CJK, underscore) on either side of text[position]."""
+        neighbours = text[position - 1:position] + text[position + 1:position + 2]
+        return not any(char.isalnum() or char == "_" for char in neighbours)
+
+    def _add(self, alias: str) -> None:
+        state = 0
+        for char in alias:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._outputs[state] = (alias,)
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also reports the aliases of its failure chain."""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
@@ -0,0 +1,219 @@
+"""
+Page image URL inference for reference-based documents.
+
+A document page shows one sample image (e.g. .../qg1/yy01.png) and the page count
+(_PAGE_COUNT). PagePatternEngine learns the numbering scheme from the sample
+(prefix, zero padding, start index, extension) and checks it against the server
+with concurrent HEAD requests before any page is downloaded: the first page, the
+last page and the one after it (the other start index is probed only when
+they do not all check out). When the server has fewer pages than the count
+says, the last existing page is found by binary search, so no URL is emitted for
+a page that does not exist.
+
+When the server cannot tell (HEAD refused, network errors, offline page cache),
+the inferred list is returned unverified, as before.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from dom_processing.instrumentation import increment, logger, span
+
+
+_NUMBERED_NAME = re.compile(r"^(?P<prefix>.*?)(?P<digits>\d+)\.(?P<extension>[A-Za-z0-9]+)$")
+
+
+@dataclass(frozen=True)
+class NumberingScheme:
+    """base_url + prefix + zero-padded page number + extension."""
+    base_url: str
+    prefix: str
+    sample_number: int
+    width: int  # 1 when the sample is not zero-padded
+    extension: str
+
+    def url(self, page_number: int) -> str:
+        return f"{self.base_url}{self.prefix}{page_number:0{self.width}d}.{self.extension}"
+
+
+@dataclass(frozen=True)
+class ResolvedPages:
+    urls: List[str]
+    verified: bool  # every URL was confirmed by the server
+
+
+def infer_numbering(sample_url: str) -> NumberingScheme:
+    """
+    Input:
+        - sample_url: one page image URL, e.g. https://img.eol.cn/e_images/gk/2025/st/qg1/yy01.png
+    Output: NumberingScheme(base_url=".../qg1/", prefix="yy", sample_number=1, width=2, extension="png")
+    Raises: ValueError when the file name does not end in a number
+    """
+    if not sample_url or not isinstance(sample_url, str):
+        raise ValueError(f"sample_url must be a non-empty string, got {sample_url!r}")
+    if "/" not in sample_url:
+        raise ValueError(f"Invalid URL format (no slashes found): {sample_url}")
+
+    base_url, name = sample_url.split("?", 1)[0].rsplit("/", 1)
+    match = _NUMBERED_NAME.match(name)
+    if not match:
+        raise ValueError(f"Image name '{name}' has no page number before its extension (URL: {sample_url})")
+
+    digits = match.group("digits")
+    # a leading zero fixes the width; without one, numbers are written as they are
+    width = len(digits) if digits.startswith("0") and len(digits) > 1 else 1
+    return NumberingScheme(
+        base_url=base_url + "/",
+        prefix=match.group("prefix"),
+        sample_number=int(digits),
+        width=width,
+        extension=match.group("extension"),
+    )
+
+
+class UrlProber:
+    """
+    Concurrent HEAD requests: True when a URL exists, False when the server says
+    it does not (404 / 410), None when it cannot tell.
+
+    Input:
+        - session_factory: creates the HTTP session for one probe batch (for testability)
+        - rate_limiter: per-host limiter shared with the page downloads (none by default)
+        - max_workers: concurrent HEAD requests
+        - offline: never touch the network; every answer is None
+    """
+
+    MISSING_STATUSES = (404, 410)
+
+    def __init__(
+        self,
+        session_factory: Callable[[], requests.Session] = requests.Session,
+        rate_limiter=None,
+        max_workers: int = 4,
+        timeout: float = 10,
+        offline: bool = False,
+    ):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+        self.session_factory = session_factory
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.offline = offline
+
+    def probe(self, urls: List[str]) -> Dict[str, Optional[bool]]:
+        urls = list(dict.fromkeys(urls))
+        if self.offline or not urls:
+            return {url: None for url in urls}
+
+        session = self.session_factory()
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)), thread_name_prefix="url-probe") as executor:
+                return dict(zip(urls, executor.map(lambda url: self._head(session, url), urls)))
+        finally:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"Warning: Failed to close HTTP session: {e}")
+
+    def _head(self, session, url: str) -> Optional[bool]:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        increment("url_probes")
+        try:
+            response = session.head(url, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"HEAD {url} failed: {type(e).__name__}: {e}")
+            return None
+        if response.status_code in self.MISSING_STATUSES:
+            return False
+        if 200 <= response.status_code < 400:
+            return True
+        return None  # e.g. 403 / 405 for HEAD, 5xx
+
+
+class PagePatternEngine:
+    """
+    Input:
+        - prober: UrlProber used to verify inferred URLs; None skips verification
+    """
+
+    def __init__(self, prober: Optional[UrlProber] = None):
+        self.prober = prober
+
+    def resolve(self, sample_url: str, page_count: int) -> ResolvedPages:
+        """
+        Input:
+            - sample_url: one page image URL from the document page
+            - page_count: page count announced by the page (_PAGE_COUNT)
+        Output: ResolvedPages; verified=False when the server could not confirm the scheme
+        Raises: ValueError when the sample has no page number or the server has none of the pages
+        """
+        if not isinstance(page_count, int) or page_count < 1:
+            raise ValueError(f"page_count must be a positive integer, got {page_count!r}")
+
+        scheme = infer_numbering(sample_url)
+        starts = self._start_candidates(scheme)
+
+        if self.prober is None:
+            return self._unverified(scheme, starts[0], page_count)
+
+        short_start = None  # first page found but not the last: maybe the other start holds them all
+        for start in starts:
+            # one concurrent batch: first, last and one-past-last page
+            first, last, after_last = (scheme.url(start + offset) for offset in (0, page_count - 1, page_count))
+            with span("url_probe"):
+                found = self.prober.probe([first, last, after_last])
+
+            if found[first] is None or (found[first] and found[last] is None):
+                if short_start is not None:
+                    break  # the earlier start is confirmed; it beats an unverified guess
+                return self._unverified(scheme, start, page_count)
+            if not found[first]:
+                continue
+            if found[last]:
+                if found[after_last]:
+                    logger.debug(f"More pages than _PAGE_COUNT={page_count} exist after {last}; keeping the announced count")
+                return ResolvedPages([scheme.url(n) for n in range(start, start + page_count)], verified=True)
+            if short_start is None:
+                short_start = start
+
+        if short_start is None:
+            raise ValueError(f"No first page found on the server for {sample_url} (tried {[scheme.url(start) for start in starts]})")
+
+        last_number = self._last_existing(scheme, short_start, short_start + page_count - 1)
+        if last_number is None:
+            return self._unverified(scheme, short_start, page_count)
+        found_count = last_number - short_start + 1
+        increment("pages_not_on_server", page_count - found_count)
+        print(f"Warning: Only {found_count} of {page_count} pages exist for {sample_url}; skipping the missing ones")
+        return ResolvedPages([scheme.url(n) for n in range(short_start, last_number + 1)], verified=True)
+
+    @staticmethod
+    def _start_candidates(scheme: NumberingScheme) -> List[int]:
+        """Documents are numbered from 0 or 1; the sample is usually the first page."""
+        if scheme.sample_number <= 1:
+            return [scheme.sample_number, 1 - scheme.sample_number]
+        return [0, 1]
+
+    def _last_existing(self, scheme: NumberingScheme, first: int, missing: int) -> Optional[int]:
+        """Binary search between an existing page and a missing one; None when a probe is inconclusive."""
+        low, high = first, missing
+        while high - low > 1:
+            middle = (low + high) // 2
+            exists = self.prober.probe([scheme.url(middle)])[scheme.url(middle)]
+            if exists is None:
+                return None
+            if exists:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _unverified(scheme: NumberingScheme, start: int, page_count: int) -> ResolvedPages:
+        return ResolvedPages([scheme.url(n) for n in range(start, start + page_count)], verified=False)
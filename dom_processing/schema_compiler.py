@@ -0,0 +1,167 @@
+"""
+Schema compilation - per-node flags of a page schema and its templates.
+
+SchemaQueries answers its per-node checks (is_landmark, is_target, has_repeat,
+has_conditional, has_children) by reading the raw dicts on every call.
+compile_schema() walks every schema section (main_schema / exam_schema /
+solution_schema, ...) and every template once and records those flags per node,
+so the checks made by RepeatTreeBuilderStrategy, AnnotateTree and the caching
+coordinator become a dict lookup once the result is attached.
+
+The same pass validates the schema statically, so a broken schema fails when the
+query services load instead of halfway through a tree build.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+from types import MappingProxyType
+
+from dom_processing.json_parser import (
+    HtmlValidator,
+    SchemaQueries,
+    TemplateRegistry,
+    ValidationError,
+)
+
+
+TEMPLATE_SECTION_PREFIX = "template:"
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledNode:
+    """Precomputed SchemaQueries flags of one schema node."""
+    schema_node: dict
+    is_landmark: bool
+    is_target: bool
+    has_repeat: bool
+    has_conditional: bool
+    has_children: bool
+
+
+class CompiledSchema:
+    """Compiled nodes indexed by their raw dict, answering SchemaQueries in O(1)."""
+
+    def __init__(self, nodes: Iterable[CompiledNode], sections: Dict[str, CompiledNode], has_repeat: bool):
+        # raw dicts are kept alive by the nodes, so their ids stay unique
+        self._by_id: Dict[int, CompiledNode] = {id(node.schema_node): node for node in nodes}
+        self.sections: Mapping[str, CompiledNode] = MappingProxyType(dict(sections))
+        self.has_repeat = has_repeat  # anywhere under main_schema
+
+    def lookup(self, schema_node: dict) -> Optional[CompiledNode]:
+        """Compiled node for a raw schema dict, or None when it was not compiled."""
+        return self._by_id.get(id(schema_node))
+
+    def section_root(self, section: str) -> Optional[CompiledNode]:
+        return self.sections.get(section)
+
+
+def compile_schema(
+    schema_queries: SchemaQueries,
+    template_registry: Optional[TemplateRegistry] = None,
+) -> CompiledSchema:
+    """
+    Input:
+        - schema_queries: page schema; every top-level section is compiled
+        - template_registry: templates to compile and check repeat references against
+    Output: CompiledSchema
+    Raises: ValidationError on the first invalid node
+    """
+    schema = schema_queries._schema
+    if not isinstance(schema, dict) or "main_schema" not in schema:
+        raise ValidationError("Schema must be a dictionary with a 'main_schema' section")
+
+    roots = [(section, node) for section, node in schema.items() if isinstance(node, dict)]
+    if template_registry is not None:
+        roots.extend(
+            (TEMPLATE_SECTION_PREFIX + name, template_registry.get_template_schema(name))
+            for name in template_registry.get_all_template_names()
+        )
+
+    compiler = _Compiler(schema_queries, template_registry)
+    sections = {section: compiler.compile_section(section, root) for section, root in roots}
+    has_repeat = compiler.section_has_repeat["main_schema"]
+    return CompiledSchema(compiler.nodes, sections, has_repeat)
+
+
+class _Compiler:
+
+    def __init__(self, schema_queries, template_registry):
+        self._schema_queries = schema_queries
+        self._template_registry = template_registry
+        self.nodes: list[CompiledNode] = []
+        self.section_has_repeat: Dict[str, bool] = {}
+
+    def compile_section(self, section: str, root: dict) -> CompiledNode:
+        """Depth-first; each node is checked against its parent (None for the section root)."""
+        root_node = None
+        has_repeat = False
+        stack: list[Tuple[dict, Optional[CompiledNode], bool]] = [(root, None, False)]
+        while stack:
+            schema_node, parent, parent_is_root = stack.pop()
+            node = self._compile_node(section, schema_node, parent, parent_is_root)
+            self.nodes.append(node)
+            has_repeat = has_repeat or node.has_repeat
+            if parent is None:
+                root_node = node
+            stack.extend((child, node, parent is None) for child in schema_node.get("children") or [])
+        self.section_has_repeat[section] = has_repeat
+        return root_node
+
+    def _compile_node(self, section, schema_node, parent, parent_is_root) -> CompiledNode:
+        queries = self._schema_queries
+        if not isinstance(schema_node, dict):
+            raise ValidationError(f"{section}: schema nodes must be dictionaries, got {type(schema_node).__name__}")
+
+        children = schema_node.get("children") or []
+        if not isinstance(children, list):
+            raise ValidationError(f"{self._where(section, schema_node)}: 'children' must be a list")
+
+        has_repeat = queries.has_repeat(schema_node)
+        has_conditional = queries.has_conditional(schema_node)
+        is_target = queries.is_target(schema_node)
+
+        if has_repeat:
+            self._check_repeat(section, parent, parent_is_root, schema_node)
+
+        if has_conditional and schema_node["conditional"].get("condition_id") is None:
+            raise ValidationError(f"{self._where(section, schema_node)}: conditional block needs a 'condition_id'")
+
+        if not has_repeat and not has_conditional:
+            tag = schema_node.get("tag", "")
+            if not HtmlValidator.is_valid_html_tag(tag):
+                raise ValidationError(f"{self._where(section, schema_node)}: invalid or missing tag '{tag}'")
+
+        # BaseDOMNode reads target_types for every target element
+        if is_target and not isinstance(schema_node.get("target_types"), list):
+            raise ValidationError(f"{self._where(section, schema_node)}: target element needs a 'target_types' list")
+
+        return CompiledNode(
+            schema_node=schema_node,
+            is_landmark=queries.is_landmark(schema_node),
+            is_target=is_target,
+            has_repeat=has_repeat,
+            has_conditional=has_conditional,
+            has_children=len(children) > 0,
+        )
+
+    def _check_repeat(self, section, parent, parent_is_root, schema_node) -> None:
+        repeat = schema_node["repeat"]
+        where = self._where(section, schema_node)
+        if "template" not in repeat or "count" not in repeat:
+            raise ValidationError(f"{where}: repeat block needs 'template' and 'count'")
+        count = repeat["count"]
+        if count != "auto" and (not isinstance(count, int) or count <= 0):
+            raise ValidationError(f"{where}: repeat count must be a positive integer or 'auto'")
+
+        # repeat children are counted and cached under their parent landmark (the root is cached up front)
+        if parent is not None and not parent_is_root and not parent.is_landmark:
+            raise ValidationError(f"{where}: parent of a repeat block must be a landmark element")
+
+        template_name = repeat["template"]
+        if self._template_registry is not None and not self._template_registry.template_exists(template_name):
+            raise ValidationError(f"{where}: template '{template_name}' does not exist")
+
+    @staticmethod
+    def _where(section: str, schema_node) -> str:
+        description = schema_node.get("description") if isinstance(schema_node, dict) else None
+        return f"{section} node '{description}'" if description else f"{section} node"
@@ -1,35 +1,35 @@
 import os
 
 from dotenv import load_dotenv
+from dom_processing.instrumentation import configure_logging
 from dom_processing.instance_tracker import Tracker
 from dom_processing.my_scraper.scraper_orchestrator.scraper_orchestrator import ScraperOrchestrator
-from db.database_repo import DatabaseRepository
-from supabase import create_client
+from db.backend import create_database_client, create_database_repository
 
 
 def main():
     load_dotenv()
+    configure_logging()
 
-    # Get Supabase credentials from environment
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-    # Validate credentials exist
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
-
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    db_repository = DatabaseRepository(supabase)
+    supabase = create_database_client()
+    db_repository = create_database_repository(supabase)
     instance_tracker = Tracker(supabase)
+    if os.getenv("TRACKER_PRELOAD", "").lower() in ("1", "true", "yes"):
+        preload_years = [int(year) for year in os.getenv("TRACKER_PRELOAD_YEARS", "").split(",") if year.strip()]
+        instance_tracker.preload(preload_years or None)
     try:
         orchestrator = ScraperOrchestrator(
             main_scraper_config_path="dom_processing/config/main_scraper_config.json",
             document_scraper_config_path="dom_processing/config/document_scraper_config.json",
             fallback_document_scraper_config_path="dom_processing/config/fallback_document_scraper_config.json",  # <-- ADD COMMA HERE
             database_repository=db_repository,
-            instance_tracker = instance_tracker
+            instance_tracker = instance_tracker,
+            workers=int(os.getenv("SCRAPER_WORKERS", "1"))
         )
-        orchestrator.run()
+        if os.getenv("SCRAPER_PIPELINE", "").lower() == "async":
+            orchestrator.run_pipeline()
+        else:
+            orchestrator.run()
     except Exception as e:
         print(f"Fatal error in main: {type(e).__name__}: {e}")
         raise
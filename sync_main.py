@@ -0,0 +1,32 @@
+import os
+
+from dotenv import load_dotenv
+from dom_processing.instrumentation import configure_logging
+from db.backend import create_local_client, create_remote_client, upsert_enabled
+
+
+def main():
+    """Push rows spooled by a DB_BACKEND=local run to Supabase."""
+    load_dotenv()
+    configure_logging()
+
+    remote_client = create_remote_client()
+    local_client = create_local_client()
+    try:
+        pending = local_client.pending_sync()
+        pushed = local_client.sync_to(
+            remote_client,
+            batch_size=int(os.getenv("SYNC_BATCH_SIZE", "500")),
+            # replays after a crash then update instead of duplicating
+            upsert=upsert_enabled()
+        )
+        print(f"Synced {pushed}/{pending} spooled writes")
+    except Exception as e:
+        print(f"Fatal error in sync: {type(e).__name__}: {e}")
+        raise
+    finally:
+        local_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import pytest
+
+from db.backend import create_database_client, create_database_repository
+from db.batching_repo import BatchingRepository
+from db.database_repo import DatabaseRepository
+from db.local_client import LocalSupabaseClient
+
+
+class TestBackendFromEnv:
+
+    def test_local_backend(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("DB_BACKEND", "local")
+        monkeypatch.setenv("LOCAL_DB_PATH", str(tmp_path / "local.sqlite"))
+
+        client = create_database_client()
+
+        assert isinstance(client, LocalSupabaseClient)
+        client.close()
+
+    def test_remote_backend_needs_credentials(self, monkeypatch):
+        monkeypatch.delenv("DB_BACKEND", raising=False)
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+
+        with pytest.raises(ValueError):
+            create_database_client()
+
+    def test_repository_follows_batch_size(self, monkeypatch):
+        client = LocalSupabaseClient(":memory:")
+        monkeypatch.setenv("DB_BATCH_SIZE", "0")
+        assert isinstance(create_database_repository(client), DatabaseRepository)
+
+        monkeypatch.setenv("DB_BATCH_SIZE", "20")
+        monkeypatch.setenv("DB_UPSERT", "yes")
+        repository = create_database_repository(client)
+        assert isinstance(repository, BatchingRepository)
+        assert (repository.max_batch, repository.upsert) == (20, True)
+        client.close()
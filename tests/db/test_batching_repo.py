@@ -0,0 +1,228 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from db.batching_repo import BatchingRepository
+from db.database_models import ExamRecord, SolutionRecord
+
+
+class FakeTable:
+    def __init__(self, name, supabase):
+        self.name = name
+        self.supabase = supabase
+        self.call = None
+
+    def insert(self, rows):
+        self.call = ("insert", rows, None)
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.call = ("upsert", rows, on_conflict)
+        return self
+
+    def update(self, values):
+        self.call = ("update", values, None)
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        if self.name in self.supabase.fail_tables:
+            self.supabase.fail_tables.remove(self.name)
+            raise ConnectionError("down")
+        method, rows, _ = self.call
+        self.supabase.requests.append((self.name, *self.call))
+        if method == "update":
+            return Mock(data=[])
+        id_column = "exam_id" if self.name == "exams" else "solution_id"
+        data = []
+        for row in rows:
+            stored = dict(row)
+            if id_column not in stored:
+                self.supabase.next_id += 1
+                stored[id_column] = self.supabase.next_id
+            data.append(stored)
+        return Mock(data=data)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.requests = []
+        self.next_id = 100
+        self.fail_tables = []  # each entry fails the next request to that table once
+
+    def table(self, name):
+        return FakeTable(name, self)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def exam(url, variant="A"):
+    return ExamRecord(entry_page_url=url, exam_variant=variant, subject="math", year=2025)
+
+
+def solution(url):
+    return SolutionRecord(entry_page_url=url, page_count=3)
+
+
+class TestBatchingRepository:
+
+    def test_flush_writes_batch_in_three_requests(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, max_batch=100)
+        flushed = []
+
+        repo.add_subject([exam("e1", "A"), exam("e1", "B")], solution("s1"),
+                         on_flushed=lambda ids, sid: flushed.append((ids, sid)))
+        repo.add_subject([exam("e2")], None, on_flushed=lambda ids, sid: flushed.append((ids, sid)))
+        assert supabase.requests == []
+
+        assert repo.flush() == 2
+
+        assert [(table, method) for table, method, *_ in supabase.requests] == [
+            ("exams", "insert"), ("solutions", "insert"), ("exams", "upsert"),
+        ]
+        assert flushed == [([101, 102], 104), ([103], None)]
+        solution_row = supabase.requests[1][2][0]
+        assert solution_row["exam_id"] == 102
+        link_rows = supabase.requests[2][2]
+        assert [(row["exam_id"], row["solution_id"], row["subject"]) for row in link_rows] == [
+            (101, 104, "math"), (102, 104, "math"),
+        ]
+
+    def test_flushes_when_batch_is_full(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, max_batch=3)
+
+        repo.add_subject([exam("e1")], solution("s1"))
+        assert supabase.requests == []
+        repo.add_subject([exam("e2")])
+
+        assert repo.pending_records() == 0
+        assert supabase.requests[0][2][1]["entry_page_url"] == "e2"
+
+    def test_flushes_when_batch_is_old(self):
+        supabase, clock = FakeSupabase(), Clock()
+        repo = BatchingRepository(supabase, max_batch=100, max_age=5, clock=clock)
+
+        repo.add_subject([exam("e1")])
+        clock.now = 6
+        repo.add_subject([exam("e2")])
+
+        assert repo.pending_records() == 0
+
+    def test_timer_flushes_old_batch_without_new_subjects(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, max_batch=100, max_age=0.05)
+
+        repo.add_subject([exam("e1")])
+        deadline = time.monotonic() + 2
+        while repo.pending_records() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert repo.pending_records() == 0
+        repo.close()
+
+    def test_upsert_mode_uses_conflict_columns(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, upsert=True)
+
+        repo.add_subject([exam("e1")], solution("s1"))
+        repo.flush()
+
+        assert supabase.requests[0][1:2] + supabase.requests[0][3:] == ("upsert", "entry_page_url,exam_variant")
+        assert supabase.requests[1][3] == "entry_page_url"
+
+    def test_solution_for_existing_exam_is_linked_by_update(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase)
+
+        repo.add_subject([], solution("s1"), exam_id=7)
+        repo.flush()
+
+        assert supabase.requests[0][2][0]["exam_id"] == 7
+        assert supabase.requests[1][:3] == ("exams", "update", {"solution_id": 101, "solution_exists": True})
+
+    def test_solution_links_to_buffered_exam_by_url(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase)
+        repo.add_subject([exam("e1")], solution("s1"))
+        assert repo.has_exam("e1")
+
+        repo.add_subject([], solution("s2"), exam_url="e1")
+        repo.flush()
+        repo.add_subject([], solution("s3"), exam_url="e1")  # exam stored by the earlier flush
+        repo.flush()
+
+        solution_rows = [rows for table, method, rows, _ in supabase.requests if table == "solutions"]
+        assert [row["exam_id"] for rows in solution_rows for row in rows] == [101, 101, 101]
+
+    def test_unknown_exam_url_is_rejected(self):
+        with pytest.raises(ValueError):
+            BatchingRepository(FakeSupabase()).add_subject([], solution("s1"), exam_url="e1")
+
+    def test_failed_upsert_flush_keeps_buffer_until_max_attempts(self):
+        supabase = Mock()
+        supabase.table.return_value.upsert.return_value.execute.side_effect = ConnectionError("down")
+        repo = BatchingRepository(supabase, upsert=True, max_attempts=2)
+        repo.add_subject([exam("e1")])
+
+        with pytest.raises(RuntimeError):
+            repo.flush()
+        assert repo.pending_records() == 1
+        with pytest.raises(RuntimeError):
+            repo.flush()
+        assert repo.pending_records() == 0
+        assert len(repo.dead_letters) == 1
+
+    def test_failed_insert_flush_is_dead_lettered_with_stored_ids_reported(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase)
+        flushed = []
+        repo.add_subject([exam("e1")], solution("s1"), on_flushed=lambda ids, sid: flushed.append((ids, sid)))
+
+        supabase.fail_tables.append("solutions")
+        with pytest.raises(RuntimeError, match="1 dead-lettered"):
+            repo.flush()
+
+        assert repo.pending_records() == 0
+        assert repo.flush() == 0
+        assert flushed == [([101], None)]  # the exam went through: the tracker must know it
+
+    def test_add_subject_does_not_raise_batch_failure(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, max_batch=2, upsert=True)
+        repo.add_subject([exam("e1")])
+
+        supabase.fail_tables.append("exams")
+        repo.add_subject([exam("e2")])
+
+        assert repo.pending_records() == 2
+
+    def test_retried_flush_does_not_rewrite_stored_exams(self):
+        supabase = FakeSupabase()
+        repo = BatchingRepository(supabase, upsert=True)
+        flushed = []
+        repo.add_subject([exam("e1")], solution("s1"), on_flushed=lambda ids, sid: flushed.append((ids, sid)))
+
+        supabase.fail_tables.append("solutions")
+        with pytest.raises(RuntimeError):
+            repo.flush()
+        assert repo.flush() == 1
+
+        assert [(table, method) for table, method, *_ in supabase.requests] == [
+            ("exams", "upsert"), ("solutions", "upsert"), ("exams", "upsert"),
+        ]
+        assert flushed == [([101], 102)]
+
+    def test_solution_without_exam_is_rejected(self):
+        with pytest.raises(ValueError):
+            BatchingRepository(FakeSupabase()).add_subject([], solution("s1"))
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+
+from db.batching_repo import BatchingRepository
+from db.database_models import ExamRecord, SolutionRecord
+from db.database_repo import DatabaseRepository
+from db.local_client import LocalSupabaseClient
+from dom_processing.instance_tracker import Tracker
+
+
+def exam(url, variant="A", year=2025):
+    return ExamRecord(
+        entry_page_url=url, exam_variant=variant, year=year, subject="math",
+        exam_urls=["https://h/1.jpg"], scraped_at=datetime(2025, 6, 7),
+    )
+
+
+def exam_row(url, variant="A", year=2025):
+    return BatchingRepository._exam_row(exam(url, variant, year))
+
+
+@pytest.fixture
+def client():
+    client = LocalSupabaseClient(":memory:")
+    yield client
+    client.close()
+
+
+class TestLocalSupabaseClient:
+
+    def test_repository_and_tracker_run_against_local_backend(self, client):
+        repo = DatabaseRepository(client)
+        exam_id = repo.insert_exam_record(exam("https://h/e1"))
+        solution_id = repo.insert_solution_record(SolutionRecord(entry_page_url="https://h/s1"), exam_id)
+
+        tracker = Tracker(client)
+        assert tracker.get_exam_id_by_url("https://h/e1") == exam_id
+        assert tracker.check_entry_page_exists_in_solution_db("https://h/s1")
+        stored = client.table("exams").select("*").eq("exam_id", exam_id).execute().data[0]
+        assert stored["solution_id"] == solution_id and stored["solution_exists"] is True
+        assert stored["exam_urls"] == ["https://h/1.jpg"]
+
+    def test_select_filters_order_and_range(self, client):
+        client.table("exams").insert([exam_row(f"https://h/e{i}", year=2020 + i) for i in range(5)]).execute()
+
+        rows = (
+            client.table("exams").select("exam_id, year").in_("year", [2021, 2022, 2023])
+            .order("year", desc=True).range(1, 2).execute().data
+        )
+
+        assert [row["year"] for row in rows] == [2022, 2021]
+        assert client.table("exams").select("exam_id").eq("year", 1999).limit(1).execute().data == []
+
+    def test_upsert_updates_on_conflict(self, client):
+        first = client.table("exams").upsert([exam_row("https://h/e1")], on_conflict="entry_page_url,exam_variant").execute()
+        again = client.table("exams").upsert(
+            [{"entry_page_url": "https://h/e1", "exam_variant": "A", "page_count": 4}],
+            on_conflict="entry_page_url,exam_variant",
+        ).execute()
+
+        assert again.data[0]["exam_id"] == first.data[0]["exam_id"]
+        assert again.data[0]["page_count"] == 4
+        assert len(client.table("exams").select("exam_id").execute().data) == 1
+
+    def test_unknown_table_or_column(self, client):
+        with pytest.raises(RuntimeError):
+            client.table("users")
+        with pytest.raises(RuntimeError):
+            client.table("exams").select("nope").execute()
+
+
+class TestSpoolSync:
+
+    def test_sync_replays_writes_with_remote_ids(self, client):
+        remote = LocalSupabaseClient(":memory:")
+        remote.table("exams").insert([exam_row("https://h/already-there")]).execute()  # shifts remote ids
+
+        repo = BatchingRepository(client)
+        repo.add_subject([exam("https://h/e1", "A"), exam("https://h/e1", "B")], SolutionRecord(entry_page_url="https://h/s1"))
+        repo.add_subject([exam("https://h/e2")])
+        repo.flush()
+        DatabaseRepository(client).insert_exam_record(exam("https://h/e3"))
+
+        pending = client.pending_sync()
+        assert client.sync_to(remote, batch_size=2) == pending
+        assert client.pending_sync() == 0
+        assert client.sync_to(remote) == 0
+
+        remote_exams = remote.table("exams").select("*").order("exam_id").execute().data
+        assert [row["entry_page_url"] for row in remote_exams] == [
+            "https://h/already-there", "https://h/e1", "https://h/e1", "https://h/e2", "https://h/e3",
+        ]
+        remote_solution = remote.table("solutions").select("*").execute().data[0]
+        assert remote_solution["exam_id"] == remote_exams[2]["exam_id"]
+        assert [row["solution_id"] for row in remote_exams[1:3]] == [remote_solution["solution_id"]] * 2
+        remote.close()
+
+    def test_upsert_sync_replayed_after_crash_does_not_duplicate(self, client, monkeypatch):
+        remote = LocalSupabaseClient(":memory:")
+        DatabaseRepository(client).insert_exam_record(exam("https://h/e1"))
+
+        mark_synced = client._mark_synced
+        monkeypatch.setattr(client, "_mark_synced", lambda *args: (_ for _ in ()).throw(KeyboardInterrupt()))
+        with pytest.raises(KeyboardInterrupt):
+            client.sync_to(remote, upsert=True)  # remote written, local commit lost
+        monkeypatch.setattr(client, "_mark_synced", mark_synced)
+
+        assert client.pending_sync() == 1
+        assert client.sync_to(remote, upsert=True) == 1
+        assert len(remote.table("exams").select("exam_id").execute().data) == 1
+        remote.close()
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from dom.driver_pool import DriverPool
+
+
+class FakeDriver:
+    """Stands in for SeleniumDriver - no browser needed"""
+    created = 0
+
+    def __init__(self, fail_get=False, fail_reset=False):
+        FakeDriver.created += 1
+        self.visited = []
+        self.resets = 0
+        self.closed = False
+        self.fail_get = fail_get
+        self.fail_reset = fail_reset
+
+    def get(self, url):
+        if self.fail_get:
+            raise ConnectionError("chrome not reachable")
+        self.visited.append(url)
+
+    def reset_state(self):
+        if self.fail_reset:
+            raise RuntimeError("invalid session id")
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    FakeDriver.created = 0
+
+
+class TestDriverPool:
+
+    def test_released_driver_is_reused_and_reset(self):
+        pool = DriverPool(max_size=1, driver_factory=FakeDriver)
+
+        first = pool.acquire("https://a")
+        pool.release(first)
+        second = pool.acquire("https://b")
+
+        assert second is first
+        assert first.visited == ["https://a", "https://b"]
+        assert first.resets == 1
+        assert FakeDriver.created == 1
+
+    def test_driver_recycled_after_max_uses(self):
+        pool = DriverPool(max_size=1, max_uses=2, driver_factory=FakeDriver)
+
+        first = pool.acquire("https://a")
+        pool.release(first)
+        assert pool.acquire("https://b") is first
+        pool.release(first)
+
+        assert first.closed is True
+        third = pool.acquire("https://c")
+        assert third is not first
+        assert FakeDriver.created == 2
+
+    def test_failed_reset_discards_driver(self):
+        pool = DriverPool(max_size=1, driver_factory=lambda: FakeDriver(fail_reset=True))
+
+        driver = pool.acquire("https://a")
+        pool.release(driver)
+
+        assert driver.closed is True
+        assert pool.size() == 0
+        assert pool.idle_count() == 0
+
+    def test_navigation_failure_frees_the_slot(self):
+        pool = DriverPool(max_size=1, driver_factory=lambda: FakeDriver(fail_get=True))
+
+        with pytest.raises(RuntimeError, match="Failed to navigate"):
+            pool.acquire("https://a")
+
+        assert pool.size() == 0
+
+    def test_acquire_blocks_until_release(self):
+        pool = DriverPool(max_size=1, driver_factory=FakeDriver)
+        held = pool.acquire("https://a")
+        acquired = []
+
+        worker = threading.Thread(target=lambda: acquired.append(pool.acquire("https://b", timeout=5)))
+        worker.start()
+        worker.join(0.1)
+        assert acquired == []
+
+        pool.release(held)
+        worker.join(5)
+        assert acquired == [held]
+
+    def test_acquire_times_out_when_pool_exhausted(self):
+        pool = DriverPool(max_size=1, driver_factory=FakeDriver)
+        pool.acquire("https://a")
+
+        with pytest.raises(TimeoutError):
+            pool.acquire("https://b", timeout=0.05)
+
+    def test_close_quits_idle_and_later_released_drivers(self):
+        pool = DriverPool(max_size=2, driver_factory=FakeDriver)
+        idle = pool.acquire("https://a")
+        leased = pool.acquire("https://b")
+        pool.release(idle)
+
+        pool.close()
+        assert idle.closed is True
+
+        pool.release(leased)
+        assert leased.closed is True
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.acquire("https://c")
+
+    def test_lease_context_manager_releases(self):
+        pool = DriverPool(max_size=1, driver_factory=FakeDriver)
+
+        with pool.lease("https://a") as driver:
+            assert pool.idle_count() == 0
+
+        assert pool.idle_count() == 1
+        assert driver.resets == 1
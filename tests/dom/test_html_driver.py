@@ -0,0 +1,115 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from dom.html_driver import HtmlDriver
+from dom_processing.dom_tree_builder.tree_building.tree_building_entry_point import BuildTree
+from dom_processing.json_parser import SchemaQueries
+from dom_processing.my_scraper.interfaces_implementations import ChineseDriverOperations
+from dom_processing.my_scraper.page_cache import PageCache
+from dom_processing.my_scraper.scraper_orchestrator.factory_functions import FactoryFunctions
+
+
+DOCUMENT_PAGE = """<!DOCTYPE html>
+<html><head>
+<meta http-equiv="Content-Type" content="text/html; charset=gb2312">
+<title>ignored</title>
+</head><body>
+<div class="main container">
+  <div class="perpage" id="perpage">
+    <script language="JavaScript">
+      var _PAGE_COUNT = 6;
+      var _CURRENT = 0
+    </script>
+  </div>
+  <div class="left">
+    <div class="TRS_Editor">
+      <p align="center"><img style="border-right-width: 0px; border-top-width: 0px; border-bottom-width: 0px; border-left-width: 0px" src="./W020250612_1.png"></p>
+    </div>
+    <div class="title">2025年高考<span>全国一卷</span><br>英语试题</div>
+    <p style="display: none">hidden</p>
+  </div>
+</div>
+</body></html>
+"""
+
+
+def response(html, encoding="gb18030", content_type="text/html"):
+    r = Mock()
+    r.content = html.encode(encoding)
+    r.headers = {"Content-Type": content_type}
+    r.url = "https://gaokao.eol.cn/shiti/yy/202506/t20250612_2674288.shtml"
+    r.raise_for_status.return_value = None
+    return r
+
+
+@pytest.fixture
+def driver():
+    session = Mock()
+    session.get.return_value = response(DOCUMENT_PAGE)
+    driver = HtmlDriver(session=session)
+    driver.get("https://gaokao.eol.cn/shiti/yy/202506/t20250612_2674288.shtml")
+    return driver
+
+
+class TestHtmlDriver:
+
+    def test_meta_charset_decodes_gbk(self, driver):
+        title = driver.find_element(By.CSS_SELECTOR, "div.title")
+        assert title.text == "2025年高考全国一卷\n英语试题"
+
+    def test_non_rendered_and_hidden_text_is_empty(self, driver):
+        assert driver.find_element(By.CSS_SELECTOR, "script").text == ""
+        assert driver.find_element(By.CSS_SELECTOR, 'p[style="display: none"]').text == ""
+
+    def test_src_resolved_against_page_url(self, driver):
+        img = driver.find_element(By.CSS_SELECTOR, "div.TRS_Editor img")
+        assert img.get_attribute("src") == "https://gaokao.eol.cn/shiti/yy/202506/W020250612_1.png"
+        assert img.get_attribute("style").startswith("border-right-width")
+
+    def test_page_count_read_from_inline_script(self, driver):
+        assert ChineseDriverOperations().get_page_count(driver) == 6
+        assert driver.execute_script("return _CURRENT;") == 0
+        assert driver.execute_script("return _MISSING;") is None
+        with pytest.raises(RuntimeError, match="cannot execute"):
+            driver.execute_script("return document.title;")
+
+    def test_implied_end_tags(self):
+        driver = HtmlDriver(session=Mock())
+        driver.load_html("<ul><li>a<li>b</ul><p>one<div>two</div>")
+
+        assert [li.text for li in driver.find_elements(By.XPATH, ".//li")] == ["a", "b"]
+        assert driver.find_element(By.CSS_SELECTOR, "p").children == []
+
+    def test_document_tree_built_without_browser(self, driver):
+        with open("json_schemas/pages_json_schemas/gaokao_document_page.json", encoding="utf-8") as f:
+            schema_queries = SchemaQueries(json.load(f))
+
+        root_element = BuildTree.get_root_web_element(driver, schema_queries, "html")
+        annotator, coordinator = FactoryFunctions.create_tree_annotator(None, None, schema_queries)
+        tree = BuildTree().build(driver, schema_queries, None, None, root_element)
+        annotator.annotate_tree(driver, tree, coordinator, schema_queries, None, None, root_element)
+
+        img_node = tree.find_in_node("tag", "img", True)[0]
+        assert img_node.web_element.get_attribute("src").endswith("/W020250612_1.png")
+
+    def test_fetch_goes_through_limiter_cache_and_configured_user_agent(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("DOWNLOAD_USER_AGENTS", "test-agent/1.0")
+        url = "https://gaokao.eol.cn/shiti/yy/202506/t20250612_2674288.shtml"
+        session = Mock()
+        session.get.return_value = response(DOCUMENT_PAGE)
+        limiter = Mock()
+
+        HtmlDriver(session=session, rate_limiter=limiter, page_cache=PageCache(str(tmp_path))).get(url)
+
+        limiter.acquire.assert_called_once_with(url)
+        assert session.get.call_args.kwargs["headers"]["User-Agent"] == "test-agent/1.0"
+
+        offline = HtmlDriver(session=Mock(), rate_limiter=limiter, page_cache=PageCache(str(tmp_path), offline=True))
+        offline.get(url)
+
+        assert offline.find_element(By.CSS_SELECTOR, "div.title").text == "2025年高考全国一卷\n英语试题"
+        offline._session.get.assert_not_called()
+        limiter.acquire.assert_called_once()
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from dom.my_queue import BlockingQueue, Queue, QueueClosed
+
+
+class TestQueue:
+
+    def test_fifo_order_and_empty_behaviour(self):
+        queue = Queue()
+        assert queue.dequeue() is None and queue.front() is None
+
+        for item in range(3):
+            queue.enqueue(item)
+
+        assert queue.front() == 0 and queue.size() == 3
+        assert [queue.dequeue() for _ in range(3)] == [0, 1, 2]
+        assert queue.is_empty()
+
+
+class TestBlockingQueue:
+
+    def test_close_drains_remaining_items_then_stops_iteration(self):
+        queue = BlockingQueue()
+        for item in range(3):
+            queue.put(item)
+        queue.close()
+
+        assert list(queue) == [0, 1, 2]
+        with pytest.raises(QueueClosed):
+            queue.get()
+        with pytest.raises(QueueClosed):
+            queue.put(4)
+
+    def test_timeouts(self):
+        queue = BlockingQueue(maxsize=1)
+        with pytest.raises(TimeoutError):
+            queue.get(timeout=0.01)
+
+        queue.put("a")
+        with pytest.raises(TimeoutError):
+            queue.put("b", timeout=0.01)
+
+    def test_full_queue_blocks_producer_until_consumed(self):
+        queue = BlockingQueue(maxsize=2)
+        produced = []
+
+        def produce():
+            for item in range(5):
+                queue.put(item)
+                produced.append(item)
+            queue.close()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        producer.join(timeout=0.1)
+        assert producer.is_alive() and len(produced) == 2  # held back by the bound
+
+        assert list(queue) == [0, 1, 2, 3, 4]
+        producer.join(timeout=1)
+        assert not producer.is_alive()
+
+    def test_workers_share_one_queue(self):
+        jobs, results = BlockingQueue(), BlockingQueue()
+        for item in range(100):
+            jobs.put(item)
+        jobs.close()
+
+        def worker():
+            for job in jobs:
+                results.put(job * 2)
+
+        workers = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        results.close()
+
+        assert sorted(results) == [item * 2 for item in range(100)]
+
+    def test_rejects_negative_maxsize(self):
+        with pytest.raises(ValueError):
+            BlockingQueue(-1)
@@ -0,0 +1,228 @@
+import copy
+import threading
+
+import pytest
+
+from dom.node import PageBindings, RegularNode, RootNode, TemplateNode
+from dom.tree_index import parse_selector_value
+from dom_processing.my_scraper.scraper_orchestrator.tree_utils import clone_tree_structure
+
+
+EXAM_SCHEMA = {"tag": "a", "annotation": ["target_element"], "target_types": ["exam", "image_url"]}
+
+
+def small_tree():
+    root = RootNode({"tag": "div"}, "div", classes=["center"])
+    variant = TemplateNode({"tag": "div"}, "div", root, attrs={"id": "st1"}, template_name="exam_variant")
+    root.add_child(variant)
+    for _ in range(2):
+        link = RegularNode(EXAM_SCHEMA, "a", variant, annotation=["target_element"])
+        variant.add_child(link)
+    return root
+
+
+class TestNodeLayout:
+
+    def test_nodes_have_no_instance_dict(self):
+        root = small_tree()
+        for node in (root, root.children[0], root.children[0].children[0]):
+            assert not hasattr(node, "__dict__")
+        with pytest.raises(AttributeError):
+            root.unknown_attribute = 1
+
+    def test_target_types_are_interned_tuples(self):
+        first, second = small_tree().children[0].children
+        other_tree_link = small_tree().children[0].children[0]
+
+        assert first.target_types == ("exam", "image_url")
+        assert first.target_types is second.target_types is other_tree_link.target_types
+
+    def test_css_selector_is_rebuilt_after_set_attr(self):
+        variant = small_tree().children[0]
+        assert variant.get_css_selector() == "div#st1"
+        variant.set_attr("data-k", "v")
+        assert variant.get_css_selector() == 'div#st1[data-k="v"]'
+
+
+class TestCloneStructure:
+
+    def test_clone_links_to_cloned_parents_and_drops_web_elements(self):
+        root = small_tree()
+        root.children[0].children[0].web_element = object()
+
+        clone = clone_tree_structure(root)
+        variant = clone.children[0]
+
+        assert clone is not root and variant is not root.children[0]
+        assert variant.parent is clone
+        assert all(link.parent is variant for link in variant.children)
+        assert variant.children[0].web_element is None
+        assert root.children[0].children[0].web_element is not None
+        assert variant.template_name == "exam_variant"
+
+    def test_clone_shares_structure_fields(self):
+        root = small_tree()
+        link = root.children[0].children[0]
+
+        cloned_link = root.clone_structure().children[0].children[0]
+
+        assert cloned_link.schema_node is link.schema_node
+        assert cloned_link.target_types is link.target_types
+        assert cloned_link.get_css_selector() == link.get_css_selector()
+
+    def test_clone_attrs_are_independent(self):
+        root = small_tree()
+        link = root.children[0].children[0]
+        selector = link.get_css_selector()
+
+        cloned_link = root.clone_structure().children[0].children[0]
+        cloned_link.set_attr("id", "other")
+
+        assert link.attrs.get("id") != "other"
+        assert link.get_css_selector() == selector
+
+    def test_shallow_copy_still_works(self):
+        variant = small_tree().children[0]
+        assert copy.copy(variant).template_name == "exam_variant"
+
+
+class TestPageBindings:
+
+    def test_elements_bound_inside_do_not_leak_into_the_tree(self):
+        link = small_tree().children[0].children[0]
+
+        with PageBindings() as bindings:
+            assert link.web_element is None
+            link.web_element = "page-element"
+            assert link.web_element == "page-element"
+            assert len(bindings) == 1
+
+        assert link.web_element is None
+
+    def test_tree_level_element_is_hidden_while_bound(self):
+        link = small_tree().children[0].children[0]
+        link.web_element = "main-page-element"
+
+        with PageBindings():
+            assert link.web_element is None
+
+        assert link.web_element == "main-page-element"
+
+    def test_threads_bind_the_same_tree_independently(self):
+        link = small_tree().children[0].children[0]
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def read_page(name):
+            with PageBindings():
+                link.web_element = name
+                barrier.wait()  # both pages bound before either reads back
+                seen[name] = link.web_element
+
+        threads = [threading.Thread(target=read_page, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen == {"a": "a", "b": "b"}
+        assert link.web_element is None
+
+
+def main_page_tree():
+    root = RootNode({"tag": "div"}, "div", classes=["center"])
+    for index in range(1, 8):
+        variant = TemplateNode({"tag": "div"}, "div", root, classes=["test"], attrs={"id": f"st{index}"},
+                               template_name="exam_variant")
+        root.add_child(variant)
+        for subject in range(3):
+            li = RegularNode({"tag": "li"}, "li", variant, description=f"subject {subject}")
+            variant.add_child(li)
+            li.add_child(RegularNode(EXAM_SCHEMA, "a", li, classes=["btn", "btn-exam"], annotation=["target_element"]))
+    return root
+
+
+QUERIES = [
+    ("id", "st{1-7!2,4}"),
+    ("id", "st{1-3}"),
+    ("id", "st5"),
+    ("id", "regex:st[13]"),
+    ("class", "btn"),
+    ("class", "regex:btn-.*"),
+    ("tag", "li"),
+    ("tag", "a"),
+    ("description", "subject 1"),
+    ("description", "regex:subject"),
+]
+
+
+class TestTreeIndex:
+
+    @pytest.mark.parametrize("selector_type,selector_value", QUERIES)
+    def test_indexed_results_match_tree_walk(self, selector_type, selector_value):
+        walked = main_page_tree()
+        indexed = main_page_tree()
+        indexed.build_index()
+
+        for walked_node, indexed_node in ((walked, indexed), (walked.children[2], indexed.children[2])):
+            expected = walked_node.find_in_node(selector_type, selector_value, True)
+            found = indexed_node.find_in_node(selector_type, selector_value, True)
+            assert [n.get_full_xpath() + str(n.description) for n in found] == \
+                   [n.get_full_xpath() + str(n.description) for n in expected]
+            first = indexed_node.find_in_node(selector_type, selector_value)
+            assert first is (found[0] if found else None)
+
+    def test_subtree_query_stays_inside_the_subtree(self):
+        root = main_page_tree()
+        root.build_index()
+        branch = root.find_in_node("id", "st3")
+
+        subjects = branch.find_in_node("tag", "li", True)
+
+        assert len(subjects) == 3 and all(li.parent is branch for li in subjects)
+
+    def test_tree_changes_are_picked_up(self):
+        root = main_page_tree()
+        root.build_index()
+        branch = root.children[0]
+
+        branch.add_child(RegularNode({"tag": "li"}, "li", branch))
+        assert len(branch.find_in_node("tag", "li", True)) == 4
+
+        branch.remove_child(branch.children[0])
+        assert len(branch.find_in_node("tag", "li", True)) == 3
+
+        branch.set_attr("id", "st99")
+        assert root.find_in_node("id", "st99") is branch
+
+    def test_remove_self_is_picked_up(self):
+        root = main_page_tree()
+        root.build_index()
+        branch = root.children[0]
+        li = branch.find_in_node("tag", "li")
+
+        li.remove_self()
+
+        assert len(branch.find_in_node("tag", "li", True)) == 2
+        assert li not in root.find_in_node("tag", "li", True)
+        assert li._tree_index is None
+
+        branch.remove_self(recursive=False)
+
+        assert root.find_in_node("id", branch.attrs["id"]) is None
+        assert branch.children[0]._tree_index is None
+
+    def test_clones_do_not_share_the_index(self):
+        root = main_page_tree()
+        index = root.build_index()
+
+        clone = root.clone_structure()
+
+        assert clone.children[0]._tree_index is None
+        assert len(clone.find_in_node("tag", "li", True)) == 21
+        assert root._tree_index is index
+
+    def test_patterns_are_parsed_once(self):
+        assert parse_selector_value("st{1-33!2,4}") is parse_selector_value("st{1-33!2,4}")
+        kind, values = parse_selector_value("st{1-33!2,4}")
+        assert kind == "set" and len(values) == 31 and "st2" not in values
@@ -0,0 +1,280 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from dom_processing.my_scraper.scraper_orchestrator.async_pipeline import AsyncPipeline, PipelineStage
+from dom_processing.my_scraper.scraper_orchestrator.scraper_orchestrator import ScraperOrchestrator
+from dom_processing.my_scraper.scraper_orchestrator.subject_jobs import RunSummary, SubjectJob, SubjectResult, SubjectWork
+
+
+class ConcurrencyProbe:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, item):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(self.delay)
+        with self._lock:
+            self.current -= 1
+        return item
+
+
+class TestAsyncPipeline:
+
+    def test_every_item_reaches_the_last_stage(self):
+        seen = []
+        pipeline = AsyncPipeline([
+            PipelineStage("double", lambda x: x * 2, workers=3),
+            PipelineStage("collect", seen.append, workers=1),
+        ], queue_size=2)
+
+        stats = pipeline.run(range(20))
+
+        assert sorted(seen) == [x * 2 for x in range(20)]
+        assert stats["double"].processed == 20
+        assert stats["collect"].dropped == 20  # list.append returns None
+
+    def test_stage_concurrency_is_bounded_by_workers(self):
+        probe = ConcurrencyProbe()
+        pipeline = AsyncPipeline([PipelineStage("slow", probe, workers=3)], queue_size=1)
+
+        stats = pipeline.run(range(12))
+
+        assert probe.peak == 3
+        assert stats["slow"].max_in_flight == 3
+
+    def test_failed_item_is_reported_and_dropped(self):
+        seen = []
+        on_error = Mock()
+
+        def check(x):
+            if x == 2:
+                raise ValueError("bad item")
+            return x
+
+        pipeline = AsyncPipeline([
+            PipelineStage("check", check, workers=2),
+            PipelineStage("collect", seen.append),
+        ], on_error=on_error)
+
+        stats = pipeline.run(range(4))
+
+        assert sorted(seen) == [0, 1, 3]
+        assert stats["check"].failed == 1
+        stage_name, item, error = on_error.call_args.args
+        assert (stage_name, item, str(error)) == ("check", 2, "bad item")
+
+    def test_source_error_still_finishes_the_run(self):
+        seen = []
+
+        def source():
+            yield 1
+            raise RuntimeError("listing failed")
+
+        on_error = Mock()
+        AsyncPipeline([PipelineStage("collect", seen.append)], on_error=on_error).run(source())
+
+        assert seen == [1]
+        assert on_error.call_args.args[0] == "source"
+
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            AsyncPipeline([PipelineStage("x", lambda x: x, workers=0)])
+
+
+class TestPipelineDocumentFallback:
+
+    def _orchestrator(self, primary, fallback):
+        orchestrator = ScraperOrchestrator.__new__(ScraperOrchestrator)
+        orchestrator._document_scraper = Mock(side_effect=lambda attempt, *_: (primary if attempt == 0 else fallback, Mock()))
+        return orchestrator
+
+    def _work(self):
+        job = SubjectJob(1, 1, exam_url="https://h/exam.shtml", scrape_exam=True)
+        return SubjectWork(result=SubjectResult(job=job))
+
+    def test_download_failure_replans_with_fallback(self):
+        primary, fallback = Mock(), Mock()
+        fallback_plan = Mock()
+        fallback.plan_page.return_value = fallback_plan
+        primary.instance_assembler.document_retriever.download_document.side_effect = OSError("404")
+        orchestrator = self._orchestrator(primary, fallback)
+        work = self._work()
+
+        orchestrator._pipeline_fetch(work, None, None)
+        orchestrator._pipeline_download(work, None, None)
+        orchestrator._pipeline_convert(work, None, None)
+
+        fallback.instance_assembler.document_retriever.download_document.assert_called_once_with(fallback_plan)
+        fallback.instance_assembler.document_retriever.convert_document.assert_called_once_with(fallback_plan)
+        fallback.instance_assembler.record_document.assert_called_once_with(
+            work.result.instance, "exam", fallback_plan.save_path, fallback_plan.page_urls
+        )
+        assert work.attempts["exam"] == 1
+        assert work.result.exam_success
+
+    def test_non_retryable_fetch_error_is_recorded(self):
+        primary = Mock()
+        primary.plan_page.side_effect = RuntimeError("database unavailable")
+        orchestrator = self._orchestrator(primary, Mock())
+        work = self._work()
+
+        orchestrator._pipeline_fetch(work, None, None)
+
+        assert "database unavailable" in work.result.error
+        assert not work.result.exam_success
+
+
+class TestRunOutcome:
+    """run() / run_pipeline() must raise when nothing was scraped, so the crawl ledger retries the page."""
+
+    def _orchestrator(self, branches):
+        orchestrator = ScraperOrchestrator.__new__(ScraperOrchestrator)
+        orchestrator.workers = 1
+        orchestrator.main_query_services = Mock(page_url="https://gaokao.eol.cn/e_html/gk/gkst/2019.shtml")
+        orchestrator._build_trees = Mock(return_value=(Mock(), Mock(), Mock(), Mock(), Mock()))
+        orchestrator._find_subject_type_branches = Mock(return_value=branches)
+        orchestrator._close_run_resources = Mock()
+        orchestrator._exams_in_flight = {}
+        orchestrator._exams_in_flight_lock = threading.Lock()
+        return orchestrator
+
+    @pytest.mark.parametrize("run", ["run", "run_pipeline"])
+    def test_page_without_branches_raises(self, run):
+        orchestrator = self._orchestrator([])
+
+        with pytest.raises(RuntimeError, match="No subject type branches"):
+            getattr(orchestrator, run)()
+        orchestrator._close_run_resources.assert_called_once()
+
+    def test_every_branch_failing_raises(self):
+        orchestrator = self._orchestrator([Mock(), Mock()])
+        orchestrator._process_branch = Mock(side_effect=RuntimeError("Failed to annotate branch tree"))
+
+        with pytest.raises(RuntimeError, match="All 2 subject type branch"):
+            orchestrator.run()
+
+    def test_one_scraped_subject_is_enough(self):
+        orchestrator = self._orchestrator([Mock()])
+        good = SubjectResult(SubjectJob(1, 2, exam_url="https://h/a.shtml", scrape_exam=True), exam_success=True)
+        bad = SubjectResult(SubjectJob(2, 2, exam_url="https://h/b.shtml", scrape_exam=True))
+        orchestrator._plan_branch_jobs = Mock(return_value=[good.job, bad.job])
+        orchestrator._run_subject_jobs = Mock(return_value=iter([good, bad]))
+        orchestrator._persist_subject_result = Mock()
+
+        summary = orchestrator.run()
+
+        assert (summary.subjects, summary.succeeded_subjects) == (2, 1)
+
+    def test_every_subject_failing_raises(self):
+        summary = RunSummary(branches=1, subjects=3)
+
+        with pytest.raises(RuntimeError, match="All 3 subject"):
+            summary.raise_if_nothing_done("https://h/2019.shtml")
+
+    def test_already_scraped_subjects_count_as_done(self):
+        assert not SubjectResult(SubjectJob(1, 1, exam_url="https://h/a.shtml")).failed
+
+    def test_failed_final_flush_raises_after_closing(self):
+        orchestrator = ScraperOrchestrator.__new__(ScraperOrchestrator)
+        orchestrator.batching = True
+        orchestrator.database_repository = Mock()
+        orchestrator.database_repository.flush.side_effect = RuntimeError("Failed to flush 2 subject(s)")
+        orchestrator.driver_pool = Mock()
+        orchestrator._owns_driver_pool = True
+        orchestrator._exams_in_flight = {}
+        main_driver = Mock()
+
+        with pytest.raises(RuntimeError, match="Failed to flush"):
+            orchestrator._close_run_resources(main_driver)
+        main_driver.close.assert_called_once()
+        orchestrator.driver_pool.close.assert_called_once()
+
+
+    def test_shared_driver_pool_is_left_open(self):
+        orchestrator = ScraperOrchestrator.__new__(ScraperOrchestrator)
+        orchestrator.batching = False
+        orchestrator.driver_pool = Mock()
+        orchestrator._owns_driver_pool = False
+        orchestrator._exams_in_flight = {}
+
+        orchestrator._close_run_resources(Mock())
+
+        orchestrator.driver_pool.close.assert_not_called()
+
+
+class TestSharedExamPersistence:
+    """A subject reusing another subject's exam page links its solution once that exam is stored."""
+
+    EXAM_URL = "https://h/exam.shtml"
+
+    def _orchestrator(self, batching):
+        orchestrator = ScraperOrchestrator.__new__(ScraperOrchestrator)
+        orchestrator._exams_in_flight = {}
+        orchestrator._exams_in_flight_lock = threading.Lock()
+        orchestrator.batching = batching
+        orchestrator.mapper = Mock()
+        orchestrator.mapper.map_to_single_exam_record.return_value = Mock(entry_page_url=self.EXAM_URL)
+        orchestrator.instance_tracker = Mock()
+        orchestrator.database_repository = Mock()
+        return orchestrator
+
+    def _results(self):
+        owner = SubjectResult(
+            SubjectJob(1, 2, exam_url=self.EXAM_URL, solution_url="https://h/s1.shtml", scrape_exam=True, scrape_solution=True),
+            exam_success=True, solution_success=True,
+        )
+        owner.instance.metadata.exam_variant = ["A"]
+        duplicate = SubjectResult(
+            SubjectJob(2, 2, exam_url=self.EXAM_URL, solution_url="https://h/s2.shtml", scrape_solution=True),
+            solution_success=True,
+        )
+        return owner, duplicate
+
+    def test_duplicate_persisted_first_waits_for_the_exam(self):
+        orchestrator = self._orchestrator(batching=False)
+        stored = {}
+        orchestrator.instance_tracker.record_exam.side_effect = lambda url, exam_id: stored.update({url: exam_id})
+        orchestrator.instance_tracker.get_exam_id_by_url.side_effect = stored.get
+        orchestrator.database_repository.insert_exam_record.return_value = 7
+        owner, duplicate = self._results()
+        orchestrator._track_exam_owner(owner.job)
+
+        orchestrator._persist_subject_result(duplicate)
+        orchestrator.database_repository.insert_solution_record.assert_not_called()
+        orchestrator._persist_subject_result(owner)
+
+        linked_exam_ids = [c.args[1] for c in orchestrator.database_repository.insert_solution_record.call_args_list]
+        assert linked_exam_ids == [7, 7]
+        assert orchestrator._exams_in_flight == {}
+
+    def test_duplicate_links_to_exam_still_buffered(self):
+        orchestrator = self._orchestrator(batching=True)
+        orchestrator.instance_tracker.get_exam_id_by_url.return_value = None
+        orchestrator.database_repository.has_exam.return_value = True
+        owner, duplicate = self._results()
+        orchestrator._track_exam_owner(owner.job)
+
+        orchestrator._persist_subject_result(owner)
+        orchestrator._persist_subject_result(duplicate)
+
+        duplicate_call = orchestrator.database_repository.add_subject.call_args_list[1]
+        assert duplicate_call.args[0] == []
+        assert duplicate_call.kwargs["exam_url"] == self.EXAM_URL
+
+    def test_unlinkable_solution_is_not_marked_visited(self):
+        orchestrator = self._orchestrator(batching=False)
+        orchestrator.instance_tracker.get_exam_id_by_url.return_value = None
+        _, duplicate = self._results()
+
+        orchestrator._persist_subject_result(duplicate)
+
+        orchestrator.database_repository.insert_solution_record.assert_not_called()
+        orchestrator.instance_tracker.add_solution_entry_page_to_visited_urls.assert_not_called()
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from dom_processing.my_scraper.crawl_manager import (
+    DONE,
+    FAILED,
+    IN_PROGRESS,
+    PENDING,
+    CrawlLedger,
+    CrawlManager,
+    expand_links,
+)
+
+
+LINKS = {
+    "2014": "https://h/2014.html",
+    "2015": ["https://h/2015a.html", "https://h/2015b.html"],
+    "2016": "https://h/2016.html",
+}
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = CrawlLedger(str(tmp_path / "ledger.sqlite"))
+    yield ledger
+    ledger.close()
+
+
+class TestExpandLinks:
+
+    def test_list_years_become_one_job_per_url(self):
+        jobs = expand_links(LINKS)
+
+        assert [job.job_id for job in jobs] == ["2016", "2015-1", "2015-2", "2014"]
+        assert jobs[2].url == "https://h/2015b.html"
+
+    def test_rejects_bad_values(self):
+        with pytest.raises(ValueError):
+            expand_links({"2020": 5})
+
+
+class TestCrawlManager:
+
+    def test_run_marks_jobs_done_and_failed(self, ledger):
+        def run_job(job):
+            if job.job_id == "2015-1":
+                raise RuntimeError("layout changed")
+
+        counts = CrawlManager(ledger, run_job, workers=2).run(expand_links(LINKS))
+
+        assert counts[DONE] == 3 and counts[FAILED] == 1
+        assert ledger.get("2015-1").last_error == "RuntimeError: layout changed"
+
+    def test_resume_after_crash_skips_finished_jobs(self, tmp_path):
+        path = str(tmp_path / "ledger.sqlite")
+        jobs = expand_links(LINKS)
+
+        first = CrawlLedger(path)
+        first.register(jobs)
+        first.mark_done(first.claim_next().job_id)  # 2016 finished
+        first.claim_next()  # 2015-1 was running when the process died
+        first.close()
+
+        crawled = []
+        second = CrawlLedger(path)
+        CrawlManager(second, lambda job: crawled.append(job.job_id)).run(jobs)
+
+        assert crawled == ["2015-1", "2015-2", "2014"]
+        assert second.get("2015-1").attempts == 2
+        assert second.counts()[DONE] == 4
+        second.close()
+
+    def test_failed_jobs_stop_after_max_attempts(self, ledger):
+        calls = []
+
+        def run_job(job):
+            calls.append(job.job_id)
+            raise RuntimeError("down")
+
+        manager = CrawlManager(ledger, run_job, max_attempts=2)
+        jobs = expand_links({"2020": "https://h/2020.html"})
+        for _ in range(3):
+            manager.run(jobs)
+
+        assert calls == ["2020", "2020"]
+        assert ledger.get("2020").status == FAILED
+
+    def test_parallelism_is_bounded(self, ledger):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def run_job(job):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        links = {str(year): f"https://h/{year}.html" for year in range(2010, 2020)}
+        CrawlManager(ledger, run_job, workers=3).run(expand_links(links))
+
+        assert peak[0] <= 3
+        assert ledger.counts() == {PENDING: 0, IN_PROGRESS: 0, DONE: 10, FAILED: 0}
@@ -0,0 +1,156 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from dom_processing.instance_tracker import Tracker
+
+
+class FakeQuery:
+    """Records the Supabase query chain and serves rows for .range() pages."""
+
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+        self.years = None
+        self.url = None
+        self.order_column = None
+        self.window = (0, len(rows) - 1)
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.years = set(values)
+        return self
+
+    def eq(self, column, value):
+        self.url = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    def order(self, column):
+        self.order_column = column
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def execute(self):
+        self.log.append((self.order_column, *self.window))
+        if self.url is not None:
+            return Mock(data=[row for row in self.rows if row["entry_page_url"] == self.url][:1])
+        rows = [row for row in self.rows if self.years is None or row.get("year") in self.years]
+        start, end = self.window
+        return Mock(data=rows[start:end + 1])
+
+
+def fake_supabase(tables):
+    log = {name: [] for name in tables}
+    supabase = Mock()
+    supabase.table.side_effect = lambda name: FakeQuery(tables[name], log[name])
+    return supabase, log
+
+
+EXAMS = [
+    {"exam_id": i, "entry_page_url": f"https://h/exam{i}.shtml", "year": 2024 if i % 2 else 2025}
+    for i in range(1, 6)
+]
+SOLUTIONS = [
+    {"exam_id": 1, "entry_page_url": "https://h/sol1.shtml"},
+    {"exam_id": 2, "entry_page_url": "https://h/sol2.shtml"},
+]
+
+
+class TestTrackerPreload:
+
+    def test_preload_pages_through_tables(self):
+        supabase, log = fake_supabase({"exams": EXAMS, "solutions": SOLUTIONS})
+        tracker = Tracker(supabase)
+
+        tracker.preload(page_size=2)
+
+        assert log["exams"] == [("exam_id", 0, 1), ("exam_id", 2, 3), ("exam_id", 4, 5)]
+        assert log["solutions"] == [("solution_id", 0, 1), ("solution_id", 2, 3)]
+        assert tracker.get_exam_id_by_url("https://h/exam4.shtml") == 4
+        assert tracker.check_entry_page_exists_in_solution_db("https://h/sol2.shtml")
+
+    def test_year_filter_keeps_matching_solutions_only(self):
+        supabase, _ = fake_supabase({"exams": EXAMS, "solutions": SOLUTIONS})
+        tracker = Tracker(supabase)
+
+        tracker.preload(years=[2024])
+
+        assert set(tracker.exam_ids.values()) == {1, 3, 5}
+        assert tracker.solution_urls == {"https://h/sol1.shtml"}
+
+    def test_preloaded_lookups_do_not_query(self):
+        supabase, _ = fake_supabase({"exams": EXAMS, "solutions": SOLUTIONS})
+        tracker = Tracker(supabase)
+        tracker.preload()
+        supabase.table.reset_mock()
+
+        assert not tracker.check_entry_page_exists_in_exam_db("https://h/new.shtml")
+        tracker.record_exam("https://h/new.shtml", 42)
+        tracker.record_solution("https://h/new_sol.shtml")
+
+        assert tracker.check_entry_page_exists_in_exam_db("https://h/new.shtml")
+        assert tracker.get_exam_id_by_url("https://h/new.shtml") == 42
+        assert tracker.check_entry_page_exists_in_solution_db("https://h/new_sol.shtml")
+        supabase.table.assert_not_called()
+
+    def test_year_preload_falls_back_to_queries_on_miss(self):
+        supabase, _ = fake_supabase({"exams": EXAMS, "solutions": SOLUTIONS})
+        tracker = Tracker(supabase)
+        tracker.preload(years=[2024])
+        supabase.table.reset_mock()
+
+        assert tracker.get_exam_id_by_url("https://h/exam1.shtml") == 1
+        supabase.table.assert_not_called()
+
+        assert tracker.get_exam_id_by_url("https://h/exam2.shtml") == 2  # a 2025 exam
+        assert tracker.check_entry_page_exists_in_solution_db("https://h/sol2.shtml")
+        assert not tracker.check_entry_page_exists_in_exam_db("https://h/new.shtml")
+        assert supabase.table.call_count == 3
+
+    def test_invalid_page_size(self):
+        with pytest.raises(ValueError):
+            Tracker(Mock()).preload(page_size=0)
+
+
+class TestTrackerQueries:
+
+    def test_solution_lookup_uses_solutions_table(self):
+        supabase = Mock()
+        supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value = Mock(data=[])
+
+        assert not Tracker(supabase).check_entry_page_exists_in_solution_db("https://h/sol.shtml")
+        supabase.table.assert_called_once_with("solutions")
+
+    def test_visited_urls(self):
+        tracker = Tracker(Mock())
+        tracker.add_exam_entry_page_to_visited_urls("https://h/a")
+
+        assert tracker.check_entry_page_exists_in_visited_urls("https://h/a")
+        assert not tracker.check_entry_page_exists_in_visited_urls("https://h/b")
+
+    def test_lookup_query_does_not_block_other_jobs(self):
+        tracker = Tracker(Mock())
+        tracker.preloaded = True
+        tracker.preloaded_years = [2024]
+
+        def query_while_another_job_records(url):
+            other = threading.Thread(target=tracker.record_solution, args=("https://h/other",))
+            other.start()
+            other.join(timeout=2)
+            assert not other.is_alive()
+            return 7
+
+        tracker._query_exam_id = query_while_another_job_records
+
+        assert tracker.get_exam_id_by_url("https://h/exam") == 7
+        assert tracker.exam_ids["https://h/exam"] == 7
+        assert "https://h/other" in tracker.solution_urls
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from dom_processing.instrumentation import Metrics, export_metrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def metrics(clock):
+    return Metrics(clock=clock)
+
+
+class TestMetrics:
+
+    def test_span_records_count_total_max_and_errors(self, metrics, clock):
+        with metrics.span("page_download", state="exam"):
+            clock.now += 2.0
+        with pytest.raises(ValueError):
+            with metrics.span("page_download", state="exam"):
+                clock.now += 3.0
+                raise ValueError("boom")
+
+        stats = metrics.span_stats("page_download", state="exam")
+        assert stats.count == 2
+        assert stats.errors == 1
+        assert stats.total_seconds == pytest.approx(5.0)
+        assert stats.max_seconds == pytest.approx(3.0)
+        assert metrics.span_stats("page_download", state="solution") is None
+
+    def test_counters_are_kept_per_label_set(self, metrics):
+        metrics.increment("bytes_downloaded", 100)
+        metrics.increment("bytes_downloaded", 50)
+        metrics.increment("webdriver_lookups", call="get")
+
+        assert metrics.counter("bytes_downloaded") == 150
+        assert metrics.counter("webdriver_lookups", call="get") == 1
+        assert metrics.counter("webdriver_lookups", call="find") == 0
+
+    def test_json_lines_export(self, metrics, clock, tmp_path):
+        with metrics.span("pdf_build"):
+            clock.now += 1.5
+        metrics.increment("document_retries", state="exam")
+
+        path = tmp_path / "metrics.jsonl"
+        metrics.export(str(path))
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+        assert records == [
+            {"type": "span", "name": "pdf_build", "labels": {}, "count": 1, "errors": 0,
+             "total_seconds": 1.5, "max_seconds": 1.5},
+            {"type": "counter", "name": "document_retries", "labels": {"state": "exam"}, "value": 1},
+        ]
+
+    def test_prometheus_export(self, metrics, clock, tmp_path):
+        with metrics.span("db_insert", table="exams"):
+            clock.now += 0.25
+        metrics.increment("bytes_downloaded", 10)
+
+        path = tmp_path / "metrics.prom"
+        metrics.export(str(path))
+        text = path.read_text(encoding="utf-8")
+
+        assert "# TYPE cee_scraper_db_insert_seconds summary" in text
+        assert 'cee_scraper_db_insert_seconds_count{table="exams"} 1' in text
+        assert 'cee_scraper_db_insert_seconds_sum{table="exams"} 0.25' in text
+        assert "cee_scraper_bytes_downloaded_total 10" in text
+
+    def test_reset(self, metrics):
+        metrics.increment("blank_pages")
+        metrics.reset()
+        assert metrics.to_records() == []
+
+
+class TestExportMetrics:
+
+    def test_no_path_does_nothing(self, monkeypatch):
+        monkeypatch.delenv("METRICS_PATH", raising=False)
+        assert export_metrics() is None
+
+    def test_path_from_env(self, monkeypatch, tmp_path):
+        path = tmp_path / "out" / "metrics.jsonl"
+        monkeypatch.setenv("METRICS_PATH", str(path))
+        assert export_metrics() == str(path)
+        assert path.exists()
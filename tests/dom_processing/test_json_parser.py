@@ -297,6 +297,41 @@ class TestTemplateRegistry:
         with pytest.raises(ValueError, match="Invalid or missing tag"):
             registry.form_template_selector("no_tag", ["tag"])
 
+    def test_get_template_selector_is_built_once_per_config(self):
+        """Should memoize the template selector and rebuild it for another config"""
+        templates = {
+            "exam": {
+                "tag": "li",
+                "classes": ["exam"],
+                "attrs": {"data-index": "{index}"}
+            }
+        }
+        registry = TemplateRegistry(templates)
+        mock_config = Mock()
+        mock_config.needs_indexing.return_value = True
+        mock_config.get_indexing_attribute.return_value = "data-index"
+
+        assert registry.get_template_selector("exam", mock_config) == "li.exam"
+        assert registry.get_template_selector("exam", mock_config) == "li.exam"
+        assert mock_config.needs_indexing.call_count == 1
+
+        other_config = Mock()
+        other_config.needs_indexing.return_value = False
+        assert registry.get_template_selector("exam", other_config) == "li.exam[data-index='{index}']"
+
+    def test_selector_builder_reads_the_registry_memo(self):
+        """Should serve repeated builder lookups from the registry memo"""
+        from dom_processing.dom_tree_builder.caching.selectors import SelectorBuilder
+
+        registry = TemplateRegistry({"row": {"tag": "tr", "attrs": {"id": "r"}}})
+        mock_config = Mock()
+        mock_config.needs_indexing.return_value = False
+        builder = SelectorBuilder(registry, mock_config)
+
+        assert builder.build_selector_for_template("row") == "tr#r"
+        assert registry.get_template_selector("row", mock_config) == "tr#r"
+        assert mock_config.needs_indexing.call_count == 1
+
 
 # ==================== TEST CONFIG QUERIES ====================
 
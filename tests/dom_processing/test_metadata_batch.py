@@ -0,0 +1,73 @@
+from unittest.mock import Mock
+
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement
+from dom_processing.my_scraper.instance_assembler import InstanceAssembler
+from dom_processing.my_scraper.interfaces_implementations import ChineseTextParser
+from dom_processing.my_scraper.models import Instance
+
+
+def meta_node(target_types, element):
+    node = Mock()
+    node.target_types = target_types
+    node.web_element = element
+    return node
+
+
+def live_driver(texts):
+    driver = Mock()
+    driver.driver.execute_script.return_value = texts
+    return driver
+
+
+class TestChineseTextParserBatch:
+
+    def test_live_texts_are_read_in_one_round_trip(self):
+        title = meta_node(["year", "exam_variant"], Mock())
+        subject = meta_node(["subject"], Mock())
+        driver = live_driver(["2023年高考数学黑龙江卷", "数学"])
+
+        batch = ChineseTextParser().get_metadata_values([title, title, subject], driver)
+
+        driver.driver.execute_script.assert_called_once()
+        [script, elements] = driver.driver.execute_script.call_args.args
+        assert elements == [title.web_element, subject.web_element]
+        assert batch.columns == {"year": ["2023"], "exam_variant": [["黑龙江卷"]], "subject": ["数学"]}
+        assert batch.errors == {}
+
+    def test_snapshot_texts_are_read_locally_and_failures_collected(self):
+        nodes = [
+            meta_node(["year"], SnapshotElement("h1", text="2024年 全国一卷")),
+            meta_node(["year", "subject"], SnapshotElement("h1", text="no year here")),
+        ]
+        driver = Mock()
+
+        batch = ChineseTextParser().get_metadata_values(nodes, driver)
+
+        driver.driver.execute_script.assert_not_called()
+        assert batch.columns == {"year": ["2024"]}
+        assert set(batch.errors) == {"year", "subject"}
+
+    def test_falls_back_to_element_text_when_script_fails(self):
+        first, second = Mock(text="2022年"), Mock(text="2021年")
+        driver = Mock()
+        driver.driver.execute_script.side_effect = RuntimeError("no js")
+
+        batch = ChineseTextParser().get_metadata_values([meta_node(["year"], first), meta_node(["year"], second)], driver)
+
+        assert batch.columns == {"year": ["2022", "2021"]}
+
+
+class TestInstanceAssemblerMetadata:
+
+    def test_batch_columns_are_set_on_instance(self):
+        assembler = InstanceAssembler(ChineseTextParser(), Mock(), Mock())
+        instance = Instance()
+        nodes = [meta_node(["year"], Mock()), meta_node(["subject", "exam_variant"], Mock())]
+
+        assembler._set_instance_metadata_attributes(
+            instance, nodes, assembler.text_parser, Mock(), live_driver(["2023年", "英语 新课标1"])
+        )
+
+        assert instance.metadata.year == "2023"
+        assert instance.metadata.subject == "英语"
+        assert instance.metadata.exam_variant == ["全国一卷"]
@@ -0,0 +1,110 @@
+from unittest.mock import Mock
+
+import pytest
+
+from dom_processing.my_scraper.page_cache import PageCache, PageCacheMiss
+from dom_processing.my_scraper.services import PageDownloader
+
+
+METADATA = {"year": "2025", "exam_variant": "X", "subject": "Math"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+def _response(content=b"", status_code=200, headers=None):
+    response = Mock()
+    response.content = content
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.raise_for_status.return_value = None
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(str(tmp_path / "cache"), max_bytes=1000, clock=Clock())
+
+
+class TestPageCache:
+
+    def test_store_and_lookup_roundtrip(self, cache):
+        cache.store("https://h/1.png", b"abc", content_type="image/png", etag='"e1"')
+
+        entry = cache.lookup("https://h/1.png")
+        assert entry.etag == '"e1"'
+        assert cache.read(entry) == b"abc"
+        assert cache.conditional_headers(entry) == {"If-None-Match": '"e1"'}
+
+    def test_identical_bodies_are_stored_once(self, cache):
+        cache.store("https://h/1.png", b"same")
+        cache.store("https://h/2.png", b"same")
+
+        assert cache.total_bytes() == 4
+        assert len(list(cache.objects_dir.rglob("*"))) == 2  # one shard dir + one body
+
+    def test_lru_eviction_keeps_recently_read(self, cache):
+        cache.store("https://h/old.png", b"a" * 400)
+        cache.store("https://h/used.png", b"b" * 400)
+        cache.read(cache.lookup("https://h/old.png"))
+
+        cache.store("https://h/new.png", b"c" * 400)
+
+        assert cache.lookup("https://h/used.png") is None
+        assert cache.lookup("https://h/old.png") is not None
+        assert cache.lookup("https://h/new.png") is not None
+        assert cache.total_bytes() == 800
+
+    def test_missing_body_is_treated_as_miss(self, cache):
+        entry = cache.store("https://h/1.png", b"abc")
+        (cache.objects_dir / entry.digest[:2] / entry.digest).unlink()
+
+        assert cache.lookup("https://h/1.png") is None
+
+
+class TestPageDownloaderWithCache:
+
+    def _download(self, downloader, session, tmp_path, url="https://h/p1.png"):
+        downloader.download_single_page(
+            index=1, url=url, session=session, user_agents=["ua"],
+            save_path=tmp_path, metadata=METADATA, state="exam",
+        )
+        return (tmp_path / "2025_X_Math_exam_1.jpg").read_bytes()
+
+    def test_not_modified_is_served_from_cache(self, cache, tmp_path):
+        cache.store("https://h/p1.png", b"cached", content_type="image/jpeg", etag='"v1"')
+        session = Mock()
+        session.get.return_value = _response(status_code=304)
+        downloader = PageDownloader(max_workers=1, rate_limiter=Mock(), page_cache=cache)
+
+        assert self._download(downloader, session, tmp_path) == b"cached"
+        assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    def test_fresh_response_is_cached(self, cache, tmp_path):
+        session = Mock()
+        session.get.return_value = _response(
+            b"fresh", headers={"Content-Type": "image/jpeg", "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        )
+        downloader = PageDownloader(max_workers=1, rate_limiter=Mock(), page_cache=cache)
+
+        assert self._download(downloader, session, tmp_path) == b"fresh"
+        entry = cache.lookup("https://h/p1.png")
+        assert entry.last_modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+        assert "If-Modified-Since" not in session.get.call_args.kwargs["headers"]
+
+    def test_offline_mode_never_calls_network(self, tmp_path):
+        cache = PageCache(str(tmp_path / "cache"), offline=True)
+        cache.store("https://h/p1.png", b"cached")
+        session = Mock()
+        downloader = PageDownloader(max_workers=1, rate_limiter=Mock(), page_cache=cache)
+
+        assert self._download(downloader, session, tmp_path) == b"cached"
+        with pytest.raises(PageCacheMiss):
+            self._download(downloader, session, tmp_path, url="https://h/unknown.png")
+        session.get.assert_not_called()
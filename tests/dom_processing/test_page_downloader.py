@@ -0,0 +1,130 @@
+import os
+from unittest.mock import Mock
+
+import requests
+
+from dom_processing.my_scraper import services
+from dom_processing.my_scraper.services import HostRateLimiter, PageDownloader
+
+
+class FakeClock:
+    def __init__(self, advance_on_sleep=True):
+        self.now = 0.0
+        self.sleeps = []
+        self.advance_on_sleep = advance_on_sleep
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        if self.advance_on_sleep:
+            self.now += seconds
+
+
+class TestHostRateLimiter:
+
+    def test_burst_then_throttle(self):
+        fake = FakeClock()
+        limiter = HostRateLimiter(rate=2.0, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+        waits = [limiter.acquire("https://img.eol.cn/a.png") for _ in range(4)]
+
+        assert waits == [0.0, 0.0, 0.5, 0.5]
+
+    def test_simultaneous_callers_queue_behind_reservations(self):
+        # clock does not move: every caller arrives at t=0, as with parallel workers
+        fake = FakeClock(advance_on_sleep=False)
+        limiter = HostRateLimiter(rate=2.0, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+        waits = [limiter.acquire("https://img.eol.cn/a.png") for _ in range(4)]
+
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+    def test_hosts_have_independent_buckets(self):
+        fake = FakeClock()
+        limiter = HostRateLimiter(rate=1.0, burst=1, clock=fake.clock, sleep=fake.sleep)
+
+        assert limiter.acquire("https://img.eol.cn/a.png") == 0.0
+        assert limiter.acquire("https://gaokao.eol.cn/b.png") == 0.0
+        assert limiter.acquire("https://img.eol.cn/c.png") == 1.0
+
+    def test_tokens_refill_over_time(self):
+        fake = FakeClock()
+        limiter = HostRateLimiter(rate=1.0, burst=1, clock=fake.clock, sleep=fake.sleep)
+
+        limiter.acquire("https://img.eol.cn/a.png")
+        fake.now += 1.0
+        assert limiter.acquire("https://img.eol.cn/b.png") == 0.0
+
+    def test_shared_limiter_reads_env_on_first_use(self, monkeypatch):
+        monkeypatch.setattr(services, "_HOST_RATE_LIMITER", None)
+        monkeypatch.setenv("DOWNLOAD_HOST_RATE", "0.5")  # e.g. loaded from .env after import
+
+        limiter = services.shared_host_rate_limiter()
+
+        assert limiter.rate == 0.5
+        assert services.shared_host_rate_limiter() is limiter
+
+
+class TestSharedPageCache:
+
+    def test_opened_on_first_use(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(services, "_PAGE_CACHE", None)
+        monkeypatch.setattr(services, "_PAGE_CACHE_LOADED", False)
+        monkeypatch.setenv("PAGE_CACHE_DIR", str(tmp_path / "cache"))
+
+        cache = services.shared_page_cache()
+
+        assert cache is not None
+        assert services.shared_page_cache() is cache
+
+
+class TestPageDownloaderConcurrency:
+
+    def _response(self, content):
+        response = Mock()
+        response.content = content
+        response.headers = {"Content-Type": "image/jpeg"}
+        response.raise_for_status.return_value = None
+        return response
+
+    def test_indexed_pages_keep_file_naming(self, tmp_path):
+        session = Mock()
+        session.get.side_effect = lambda url, **kwargs: self._response(url.encode())
+        limiter = Mock()
+        downloader = PageDownloader(max_workers=3, rate_limiter=limiter)
+        metadata = {"year": "2025", "exam_variant": "X", "subject": "Math"}
+
+        failures = downloader.download_indexed_pages(
+            indexed_urls=[(1, "https://h/p1.png"), (2, "https://h/p2.png"), (3, "https://h/p3.png")],
+            session=session,
+            user_agents=["ua"],
+            save_path=tmp_path,
+            metadata=metadata,
+            state="exam",
+        )
+
+        assert failures == []
+        assert limiter.acquire.call_count == 3
+        for index in (1, 2, 3):
+            with open(tmp_path / f"2025_X_Math_exam_{index}.jpg", "rb") as f:
+                assert f.read() == f"https://h/p{index}.png".encode()
+
+    def test_failed_request_falls_back_to_blank_page(self, tmp_path):
+        session = Mock()
+        session.get.side_effect = requests.exceptions.ConnectionError("boom")
+        downloader = PageDownloader(max_workers=2, rate_limiter=Mock())
+        metadata = {"year": "2025", "exam_variant": "X", "subject": "Math"}
+
+        failures = downloader.download_indexed_pages(
+            indexed_urls=[(1, "https://h/p1.png")],
+            session=session,
+            user_agents=["ua"],
+            save_path=tmp_path,
+            metadata=metadata,
+            state="solution",
+        )
+
+        assert failures == []
+        assert os.path.getsize(tmp_path / "2025_X_Math_solution_1.jpg") > 0
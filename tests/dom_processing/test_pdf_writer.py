@@ -0,0 +1,94 @@
+import os
+import re
+
+import pytest
+from PIL import Image
+
+from dom_processing.my_scraper.pdf_writer import StreamingPDFWriter
+from dom_processing.my_scraper.services import PDFConverter
+
+
+def _save(path, size=(40, 60), mode="RGB", fmt="JPEG", color="white"):
+    Image.new(mode, size, color).save(path, fmt)
+    return str(path)
+
+
+def _object_offsets(pdf_bytes):
+    xref_start = int(re.search(rb"startxref\n(\d+)\n%%EOF", pdf_bytes).group(1))
+    xref = pdf_bytes[xref_start:].split(b"trailer")[0].splitlines()
+    count = int(xref[1].split()[1])
+    return {i: int(line.split()[0]) for i, line in enumerate(xref[2:2 + count]) if i > 0}
+
+
+class TestStreamingPDFWriter:
+
+    def test_xref_offsets_point_at_objects(self, tmp_path):
+        pdf_path = tmp_path / "out.pdf"
+        with StreamingPDFWriter(str(pdf_path)) as writer:
+            writer.add_image_file(_save(tmp_path / "a.jpg"))
+            writer.add_image_file(_save(tmp_path / "b.jpg", size=(30, 20)))
+
+        data = pdf_path.read_bytes()
+        assert data.startswith(b"%PDF-1.4")
+        for object_id, offset in _object_offsets(data).items():
+            assert data[offset:].startswith(f"{object_id} 0 obj".encode())
+        assert b"/Count 2" in data
+
+    def test_jpeg_embedded_without_reencoding(self, tmp_path):
+        jpeg_path = _save(tmp_path / "page.jpg", mode="L")
+        pdf_path = tmp_path / "out.pdf"
+
+        with StreamingPDFWriter(str(pdf_path)) as writer:
+            writer.add_image_file(jpeg_path)
+
+        with open(jpeg_path, "rb") as f:
+            assert f.read() in pdf_path.read_bytes()
+        assert b"/DeviceGray" in pdf_path.read_bytes()
+
+    def test_non_jpeg_is_reencoded_as_rgb(self, tmp_path):
+        png_path = _save(tmp_path / "page.jpg", mode="RGBA", fmt="PNG")
+        pdf_path = tmp_path / "out.pdf"
+
+        with StreamingPDFWriter(str(pdf_path)) as writer:
+            writer.add_image_file(png_path)
+
+        data = pdf_path.read_bytes()
+        assert b"/DeviceRGB" in data
+        assert b"/Width 40 /Height 60" in data
+
+    def test_exception_removes_partial_file(self, tmp_path):
+        pdf_path = tmp_path / "out.pdf"
+
+        with pytest.raises(FileNotFoundError):
+            with StreamingPDFWriter(str(pdf_path)) as writer:
+                writer.add_image_file(str(tmp_path / "missing.jpg"))
+
+        assert not pdf_path.exists()
+
+
+class TestPDFConverter:
+
+    def test_converts_and_deletes_pages(self, tmp_path):
+        for index in (2, 1, 10):
+            _save(tmp_path / f"2025_X_Math_exam_{index}.jpg")
+
+        PDFConverter().convert_document_pdf(str(tmp_path))
+
+        assert os.listdir(tmp_path) == ["2025_X_Math_exam.pdf"]
+        assert b"/Count 3" in (tmp_path / "2025_X_Math_exam.pdf").read_bytes()
+
+    def test_undecodable_page_is_skipped(self, tmp_path):
+        _save(tmp_path / "2025_X_Math_exam_1.jpg")
+        (tmp_path / "2025_X_Math_exam_2.jpg").write_bytes(b"not an image")
+
+        PDFConverter().convert_document_pdf(str(tmp_path))
+
+        assert b"/Count 1" in (tmp_path / "2025_X_Math_exam.pdf").read_bytes()
+
+    def test_no_decodable_pages_raises(self, tmp_path):
+        (tmp_path / "2025_X_Math_exam_1.jpg").write_bytes(b"not an image")
+
+        with pytest.raises(ValueError, match="No images loaded"):
+            PDFConverter().convert_document_pdf(str(tmp_path))
+
+        assert not (tmp_path / "2025_X_Math_exam.pdf").exists()
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from dom_processing.json_parser import SchemaQueries, TemplateRegistry, ValidationError
+from dom_processing.schema_compiler import compile_schema
+
+
+SCHEMA_DIR = Path(__file__).resolve().parents[2] / "json_schemas"
+
+
+def page_schema():
+    return {
+        "main_schema": {
+            "tag": "div",
+            "classes": ["center"],
+            "description": "root",
+            "children": [
+                {
+                    "tag": "div",
+                    "classes": ["sline"],
+                    "annotation": ["landmark_element"],
+                    "children": [{"repeat": {"template": "row", "count": 3}}],
+                },
+                {"tag": "a", "annotation": ["target_element"], "target_types": ["exam"]},
+            ],
+        },
+        "exam_schema": {"tag": "a", "annotation": ["target_element"], "target_types": ["exam"]},
+    }
+
+
+def registry():
+    return TemplateRegistry({
+        "row": {
+            "tag": "li",
+            "attrs": {"id": "r{index}"},
+            "annotation": ["landmark_element"],
+            "children": [{"conditional": {"condition_id": 1}}],
+        }
+    })
+
+
+class TestCompileSchema:
+
+    def test_nodes_carry_query_flags(self):
+        schema = page_schema()
+        compiled = compile_schema(SchemaQueries(schema), registry())
+
+        root = compiled.section_root("main_schema")
+        landmark, target = schema["main_schema"]["children"]
+        repeat = landmark["children"][0]
+
+        assert root.schema_node is schema["main_schema"] and root.has_children
+        assert compiled.lookup(landmark).is_landmark and compiled.lookup(landmark).has_children
+        assert compiled.lookup(target).is_target and not compiled.lookup(target).has_children
+        assert compiled.lookup(repeat).has_repeat
+        assert compiled.has_repeat
+
+        row = compiled.section_root("template:row")
+        assert compiled.lookup(row.schema_node["children"][0]).has_conditional
+        assert set(compiled.sections) == {"main_schema", "exam_schema", "template:row"}
+        assert compiled.lookup({"tag": "div"}) is None
+
+    def test_schema_queries_answer_from_attached_ir(self):
+        schema = page_schema()
+        queries = SchemaQueries(schema)
+        queries.attach_compiled(compile_schema(queries, registry()))
+
+        landmark = schema["main_schema"]["children"][0]
+        landmark["annotation"] = []  # the IR is the source of truth once attached
+
+        assert queries.is_landmark(landmark) is True
+        assert queries.has_children(landmark) is True
+        assert queries.has_repeat(landmark["children"][0]) is True
+        assert queries.json_schema_has_repeat() is True
+        # dicts the IR never saw are still answered from the dict
+        assert queries.is_target({"annotation": ["target_element"]}) is True
+
+    @pytest.mark.parametrize("mutate,message", [
+        (lambda s: s["main_schema"]["children"][0]["children"][0]["repeat"].update(template="missing"), "does not exist"),
+        (lambda s: s["main_schema"]["children"][0].update(annotation=[]), "must be a landmark"),
+        (lambda s: s["main_schema"]["children"][1].update(tag="blink"), "invalid or missing tag"),
+        (lambda s: s["exam_schema"].pop("target_types"), "target_types"),
+        (lambda s: s["main_schema"]["children"][0]["children"][0]["repeat"].update(count=0), "positive integer"),
+    ])
+    def test_static_validation(self, mutate, message):
+        schema = page_schema()
+        mutate(schema)
+
+        with pytest.raises(ValidationError, match=message):
+            compile_schema(SchemaQueries(schema), registry())
+
+    def test_project_main_page_schema_compiles(self):
+        def load(name):
+            with open(SCHEMA_DIR / "main_page_schemas" / name, encoding="utf-8") as f:
+                return json.load(f)
+
+        queries = SchemaQueries(load("gaokao_main_page.json"))
+        compiled = compile_schema(queries, TemplateRegistry(load("templates.json")))
+
+        assert compiled.has_repeat == SchemaQueries(load("gaokao_main_page.json")).json_schema_has_repeat()
+        assert {"main_schema", "exam_schema", "solution_schema"} <= set(compiled.sections)
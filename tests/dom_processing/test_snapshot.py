@@ -0,0 +1,132 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from dom_processing.dom_tree_builder.caching.snapshot import (
+    DOMSnapshot,
+    SnapshotElement,
+    UnsupportedSelectorError,
+)
+from dom_processing.dom_tree_builder.tree_building.tree_building_entry_point import BuildTree
+from dom_processing.json_parser import ConfigQueries, SchemaQueries, TemplateRegistry
+from dom_processing.my_scraper.scraper_orchestrator.factory_functions import FactoryFunctions
+from dom_processing.my_scraper.scraper_orchestrator.subject_navigator import SubjectNavigator
+from utils import generate_selector_from_webelement, get_direct_children_in_range
+
+
+def el(tag, attrs=None, children=None, text="", **properties):
+    return {"tag": tag, "attrs": attrs or {}, "text": text, "properties": properties, "children": children or []}
+
+
+def subject_li(variant, subject):
+    base = f"https://gaokao.eol.cn/{variant}/{subject}"
+    return el("li", children=[
+        el("div", {"class": "word-xueke"}, [
+            el("div", {"class": "xueke-a"}, [
+                el("a", {"href": f"{subject}_exam.shtml"}, text="真题", href=f"{base}_exam.shtml"),
+                el("a", {"href": f"{subject}_answer.shtml"}, text="答案", href=f"{base}_answer.shtml"),
+            ]),
+        ]),
+    ])
+
+
+def exam_variant(index, subjects=("math", "english")):
+    return el("div", {"class": "test", "id": f"st{index}"}, [
+        el("div", {"class": "sline"}, [
+            el("div", {"class": "gkzt-xueke mtT_30 clearfix"}, [subject_li(index, s) for s in subjects]),
+        ]),
+    ])
+
+
+def main_page():
+    indices = [i for i in range(1, 34) if i not in (2, 4)]
+    first, rest = [i for i in indices if i <= 8], [i for i in indices if i > 8]
+    return el("div", {"class": "center point-center"}, [
+        el("div", {"class": "sline"}, [exam_variant(i) for i in first]),
+        *[exam_variant(i) for i in rest],
+    ])
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def root():
+    return SnapshotElement.from_dict(el("div", {"id": "root"}, [
+        el("p", {"class": "a b", "style": "border: 0px; margin: 1px"}, [
+            el("span", {"class": "b"}, text="x"),
+        ]),
+        el("span", {"class": "c", "data-k": "v"}),
+    ]))
+
+
+class TestSnapshotElement:
+
+    def test_css_compound_descendant_and_child(self, root):
+        assert [e.tag_name for e in root.find_elements(By.CSS_SELECTOR, ".b")] == ["p", "span"]
+        assert root.find_element(By.CSS_SELECTOR, "div#root > p.a span").text == "x"
+        assert root.find_elements(By.CSS_SELECTOR, "div > span") == [root.children[1]]
+        assert root.find_element(By.CSS_SELECTOR, 'p[style="border: 0px; margin: 1px"]').tag_name == "p"
+        assert root.find_element(By.CSS_SELECTOR, "span[data-k='v'], em").attributes["class"] == "c"
+
+    def test_xpath_children(self, root):
+        assert [e.tag_name for e in root.find_elements(By.XPATH, "./*")] == ["p", "span"]
+        assert len(root.find_elements(By.XPATH, ".//span")) == 2
+        assert root.find_elements(By.XPATH, "./a") == []
+
+    def test_missing_and_unsupported(self, root):
+        with pytest.raises(NoSuchElementException):
+            root.find_element(By.CSS_SELECTOR, "table")
+        with pytest.raises(UnsupportedSelectorError):
+            root.find_elements(By.CSS_SELECTOR, "p:first-child")
+
+    def test_selector_generation_matches_live_format(self, root):
+        assert generate_selector_from_webelement(root.children[1]) == 'span.c[data-k="v"]'
+        assert get_direct_children_in_range(root, "ALL", "span") == [root.children[1]]
+
+    def test_href_is_resolved_property(self):
+        a = SnapshotElement.from_dict(el("a", {"href": "x.html"}, href="https://h/x.html"))
+        assert a.get_attribute("href") == "https://h/x.html"
+        assert a.get_attribute("target") is None
+
+
+class TestSnapshotTreeBuilding:
+
+    def test_main_tree_built_and_annotated_from_one_script_call(self):
+        schema_queries = SchemaQueries(load("json_schemas/main_page_schemas/gaokao_main_page.json"))
+        config_queries = ConfigQueries(load("json_schemas/main_page_schemas/templates_config.json"))
+        template_registry = TemplateRegistry(load("json_schemas/main_page_schemas/templates.json"))
+        driver = Mock()
+        driver.driver.execute_script.return_value = main_page()
+
+        root_element = BuildTree.get_root_web_element(driver, schema_queries, "snapshot")
+        tree = BuildTree().build(driver, schema_queries, config_queries, template_registry, root_element)
+
+        branch = tree.find_in_node("id", "st9", True)[0]
+        annotator, coordinator = FactoryFunctions.create_tree_annotator(
+            template_registry, config_queries, schema_queries
+        )
+        annotator.annotate_tree(
+            driver, branch, coordinator, schema_queries, config_queries, template_registry, root_element
+        )
+
+        subjects = branch.find_in_node("tag", "li", True)
+        assert len(subjects) == 2
+        assert SubjectNavigator.get_documents_url(subjects[0]) == {
+            "exam_page_url": "https://gaokao.eol.cn/9/math_exam.shtml",
+            "solution_page_url": "https://gaokao.eol.cn/9/math_answer.shtml",
+        }
+        driver.driver.execute_script.assert_called_once()
+        driver.driver.find_element.assert_not_called()
+
+    def test_capture_missing_root(self):
+        driver = Mock()
+        driver.driver.execute_script.return_value = None
+
+        with pytest.raises(NoSuchElementException):
+            DOMSnapshot.capture(driver, "div.center")
@@ -0,0 +1,74 @@
+import random
+from unittest.mock import Mock
+
+import pytest
+
+from dom_processing.my_scraper.interfaces_implementations import ChineseTextParser
+from dom_processing.my_scraper.text_matching import AliasMatcher
+
+
+def naive_leftmost_longest(aliases, text):
+    hits, position = [], 0
+    while position < len(text):
+        candidates = [alias for alias in aliases if text.startswith(alias, position)]
+        if candidates:
+            longest = max(candidates, key=len)
+            hits.append((position, longest))
+            position += len(longest)
+        else:
+            position += 1
+    return hits
+
+
+def text_node(text):
+    node = Mock()
+    node.web_element.text = text
+    return node
+
+
+class TestAliasMatcher:
+
+    def test_longest_alias_wins_and_hits_do_not_overlap(self):
+        matcher = AliasMatcher({"ab": "AB", "abc": "ABC", "bcd": "BCD", "d": "D"})
+
+        assert matcher.find("xabcdx") == [(1, "abc"), (4, "d")]
+        assert matcher.find_values("abc abc ab") == ["ABC", "AB"]
+
+    def test_matches_naive_scan(self):
+        aliases = ["a", "ab", "bab", "bc", "c", "caa", "abcab"]
+        matcher = AliasMatcher({alias: alias.upper() for alias in aliases})
+        rng = random.Random(7)
+
+        for _ in range(300):
+            text = "".join(rng.choice("abcx") for _ in range(rng.randint(0, 20)))
+            assert matcher.find(text) == naive_leftmost_longest(aliases, text)
+
+    def test_isolated_single_chars_need_non_word_neighbours(self):
+        matcher = AliasMatcher({"京": "北京卷", "北京": "北京卷"}, isolate_single_chars=True)
+
+        assert matcher.find("南京") == []
+        assert matcher.find("京 语文") == [(0, "京")]
+        assert matcher.find("（京）北京") == [(1, "京"), (3, "北京")]
+
+    def test_rejects_empty_aliases(self):
+        with pytest.raises(ValueError):
+            AliasMatcher({})
+        with pytest.raises(ValueError):
+            AliasMatcher({"": "x"})
+
+
+class TestExamVariantParsing:
+
+    @pytest.mark.parametrize("text,expected", [
+        ("2023年高考黑龙江卷数学试题", ["黑龙江卷"]),
+        ("2023年全国卷1 新课标2 英语", ["全国一卷", "全国二卷"]),
+        ("2022年北京卷 京 语文", ["北京卷"]),
+        ("2022年高考语文", []),
+        ("2025年高考数学试题及答案（新课标Ⅰ卷）", []),
+        ("新高考一卷", []),
+        ("南京", []),
+        ("青岛", []),
+    ])
+    def test_returns_canonical_variants_in_text_order(self, text, expected):
+        result = ChineseTextParser().get_metadata_value(text_node(text), "exam_variant", driver=None)
+        assert result == ("exam_variant", expected)
@@ -0,0 +1,50 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from dom_processing.my_scraper.interfaces_implementations import (
+    ChineseContentTransformer,
+    TranslationTable,
+    load_translation_table,
+)
+
+
+TRANSLATIONS = {"黑": "Heilongjiang Paper", "黑龙江卷": "Heilongjiang Paper", "全国一卷": "National Paper I", "数学": "Mathematics"}
+
+
+class TestTranslationTable:
+
+    def test_table_is_read_only(self):
+        table = TranslationTable(TRANSLATIONS)
+        with pytest.raises(TypeError):
+            table.translations["新"] = "x"
+
+    @pytest.mark.parametrize("text", ["黑龙江", "全国", "2023数学卷", "黑龙江卷数学", "江苏"])
+    def test_similar_keys_match_linear_scan(self, text):
+        table = TranslationTable(TRANSLATIONS)
+        expected = tuple(key for key in TRANSLATIONS if text in key or key in text)
+        assert table.similar_keys(text) == expected
+
+    def test_dictionary_file_is_read_once_per_process(self, tmp_path):
+        path = tmp_path / "dictionary.json"
+        path.write_text(json.dumps({"chinese_to_english": TRANSLATIONS}), encoding="utf-8")
+
+        with patch("builtins.print"):
+            first = ChineseContentTransformer(dict_path=str(path))
+            second = ChineseContentTransformer(dict_path=str(path))
+            assert first.translate_to_english("数学") == "Mathematics"
+            assert second.translate_to_english("黑龙江卷") == "Heilongjiang Paper"
+
+        assert first.table is second.table is load_translation_table(str(path))
+
+    def test_construction_does_not_load(self):
+        with patch("dom_processing.my_scraper.interfaces_implementations.load_translation_table") as load:
+            ChineseContentTransformer()
+        load.assert_not_called()
+
+    def test_miss_returns_text(self):
+        transformer = ChineseContentTransformer(table=TranslationTable(TRANSLATIONS))
+        with patch("builtins.print") as printed:
+            assert transformer.translate_to_english("黑龙江") == "黑龙江"
+        assert "['黑', '黑龙江卷']" in printed.call_args_list[-1].args[0]
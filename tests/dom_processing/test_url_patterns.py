@@ -0,0 +1,121 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from dom_processing.my_scraper.url_patterns import PagePatternEngine, UrlProber, infer_numbering
+
+
+BASE = "https://img.eol.cn/e_images/gk/2025/st/qg1/"
+
+
+class FakeSession:
+    """Answers HEAD from a set of existing URLs; records every probed URL."""
+
+    def __init__(self, existing, status_for_missing=404):
+        self.existing = set(existing)
+        self.status_for_missing = status_for_missing
+        self.heads = []
+
+    def head(self, url, timeout, allow_redirects):
+        self.heads.append(url)
+        return Mock(status_code=200 if url in self.existing else self.status_for_missing)
+
+    def close(self):
+        pass
+
+
+def engine_for(session):
+    return PagePatternEngine(UrlProber(session_factory=lambda: session))
+
+
+class TestInferNumbering:
+
+    @pytest.mark.parametrize("sample,prefix,number,width,extension,page_3", [
+        (BASE + "yy01.png", "yy", 1, 2, "png", BASE + "yy03.png"),
+        (BASE + "sx_001.jpg", "sx_", 1, 3, "jpg", BASE + "sx_003.jpg"),
+        (BASE + "wl1.png", "wl", 1, 1, "png", BASE + "wl3.png"),
+        (BASE + "00.png?v=2", "", 0, 2, "png", BASE + "03.png"),
+    ])
+    def test_scheme_is_learned_from_sample(self, sample, prefix, number, width, extension, page_3):
+        scheme = infer_numbering(sample)
+        assert (scheme.prefix, scheme.sample_number, scheme.width, scheme.extension) == (prefix, number, width, extension)
+        assert scheme.url(3) == page_3
+
+    def test_unnumbered_sample_is_rejected(self):
+        with pytest.raises(ValueError, match="no page number"):
+            infer_numbering(BASE + "cover.png")
+
+
+class TestPagePatternEngine:
+
+    def test_boundary_pages_verify_the_whole_list(self):
+        session = FakeSession(BASE + f"yy{n:02d}.png" for n in range(1, 5))
+
+        pages = engine_for(session).resolve(BASE + "yy01.png", 4)
+
+        assert pages.verified
+        assert pages.urls == [BASE + f"yy{n:02d}.png" for n in range(1, 5)]
+        assert sorted(session.heads) == [BASE + "yy01.png", BASE + "yy04.png", BASE + "yy05.png"]
+
+    def test_other_start_index_wins_when_it_holds_every_page(self):
+        session = FakeSession(BASE + f"yy{n:02d}.png" for n in range(0, 3))
+
+        pages = engine_for(session).resolve(BASE + "yy01.png", 3)
+
+        assert pages.verified and pages.urls[0] == BASE + "yy00.png" and len(pages.urls) == 3
+
+    def test_missing_tail_is_found_by_binary_search(self):
+        session = FakeSession(BASE + f"yy{n:02d}.png" for n in range(1, 8))
+
+        pages = engine_for(session).resolve(BASE + "yy01.png", 20)
+
+        assert pages.verified
+        assert pages.urls[-1] == BASE + "yy07.png" and len(pages.urls) == 7
+        assert len(session.heads) <= 11  # boundary probes for both starts + log2(20) search probes
+
+    def test_inconclusive_other_start_keeps_the_confirmed_one(self):
+        class RefusesPageZero(FakeSession):
+            def head(self, url, timeout, allow_redirects):
+                if url == BASE + "yy00.png":
+                    self.heads.append(url)
+                    return Mock(status_code=405)
+                return super().head(url, timeout, allow_redirects)
+
+        session = RefusesPageZero(BASE + f"yy{n:02d}.png" for n in range(1, 4))
+
+        pages = engine_for(session).resolve(BASE + "yy01.png", 5)
+
+        assert pages.verified
+        assert pages.urls == [BASE + "yy01.png", BASE + "yy02.png", BASE + "yy03.png"]
+
+    def test_inconclusive_server_falls_back_to_unverified_list(self):
+        session = FakeSession([], status_for_missing=405)
+
+        pages = engine_for(session).resolve(BASE + "yy01.png", 3)
+
+        assert not pages.verified
+        assert pages.urls == [BASE + "yy01.png", BASE + "yy02.png", BASE + "yy03.png"]
+
+    def test_no_first_page_on_server_raises(self):
+        with pytest.raises(ValueError, match="No first page"):
+            engine_for(FakeSession([])).resolve(BASE + "yy01.png", 3)
+
+    def test_without_prober_nothing_is_requested(self):
+        pages = PagePatternEngine().resolve(BASE + "yy00.png", 2)
+        assert pages.urls == [BASE + "yy00.png", BASE + "yy01.png"] and not pages.verified
+
+
+class TestUrlProber:
+
+    def test_network_errors_and_offline_are_inconclusive(self):
+        session = Mock()
+        session.head.side_effect = requests.exceptions.ConnectionError("down")
+
+        assert UrlProber(session_factory=lambda: session).probe([BASE + "a.png"]) == {BASE + "a.png": None}
+        assert UrlProber(offline=True).probe([BASE + "a.png"]) == {BASE + "a.png": None}
+
+    def test_rate_limiter_is_asked_per_probe(self):
+        limiter = Mock()
+        UrlProber(session_factory=lambda: FakeSession([]), rate_limiter=limiter).probe([BASE + "a.png", BASE + "b.png"])
+        assert limiter.acquire.call_count == 2
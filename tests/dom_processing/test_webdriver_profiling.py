@@ -0,0 +1,115 @@
+import itertools
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from dom_processing.dom_tree_builder.caching.finders import SeleniumElementFinder
+from dom_processing.dom_tree_builder.caching.interfaces import WebElementInterface
+from dom_processing.dom_tree_builder.caching.profiling import (
+    ProfilingWebDriver,
+    ProfilingWebElement,
+    WebDriverProfiler,
+)
+from utils import matches_css_selector
+
+
+class FakeElement(WebElement):
+    """WebElement answering locally instead of over the wire."""
+
+    @property
+    def text(self):
+        return f"text of {self._id}"
+
+    def get_attribute(self, name):
+        return f"{self._id}:{name}"
+
+    def find_element(self, by, value):
+        return FakeElement(self._parent, value)
+
+    def find_elements(self, by, value):
+        return [FakeElement(self._parent, f"{value}-{i}") for i in range(3)]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.script_args = []
+
+    def find_element(self, by, value):
+        return FakeElement(self, value)
+
+    def execute_script(self, script, *args):
+        self.script_args.append(args)
+        return True
+
+
+def annotate(element):
+    children = element.find_elements("css selector", "li")
+    return [child.text for child in children]
+
+
+def precache(finder, element):
+    return finder.find_single(element, "CSS_SELECTOR", "a")
+
+
+def make_profiled_root():
+    profiler = WebDriverProfiler(clock=itertools.count().__next__)
+    driver = FakeDriver()
+    return profiler, driver, ProfilingWebDriver(driver, profiler).find_element("css selector", "#root")
+
+
+class TestWebDriverProfiler:
+
+    def test_calls_are_counted_per_call_site_and_method(self):
+        profiler, _, root = make_profiled_root()
+        profiler.begin_page("https://h/page")
+
+        annotate(root)
+        annotate(root)
+        page = profiler.end_page()
+
+        assert page.url == "https://h/page"
+        counts = {(stats.call_site, stats.method): stats.count for stats in page.calls}
+        assert counts == {
+            ("test_webdriver_profiling.annotate", "find_elements"): 2,
+            ("test_webdriver_profiling.annotate", "text"): 6,
+        }
+        assert page.total_calls == 8
+        assert page.total_seconds == 8  # the fake clock ticks once per read
+        assert page.by_call_site() == {"test_webdriver_profiling.annotate": 8}
+
+    def test_finder_frames_are_attributed_to_their_caller(self):
+        profiler, _, root = make_profiled_root()
+        profiler.begin_page("https://h/page")
+
+        found = precache(SeleniumElementFinder(), root)
+
+        assert isinstance(found, ProfilingWebElement)
+        assert isinstance(found, WebElementInterface)
+        [stats] = profiler.end_page().calls
+        assert (stats.call_site, stats.method) == ("test_webdriver_profiling.precache", "find_element")
+
+    def test_execute_script_receives_raw_elements(self):
+        profiler, driver, root = make_profiled_root()
+        profiler.begin_page("https://h/page")
+
+        assert matches_css_selector(root, "div") is True
+
+        [args] = driver.script_args
+        assert type(args[0]) is FakeElement and args[1] == "div"
+        [stats] = profiler.end_page().calls
+        assert (stats.call_site, stats.method) == ("utils.matches_css_selector", "execute_script")
+
+    def test_begin_page_returns_previous_page_and_resets(self):
+        profiler, _, root = make_profiled_root()
+        profiler.begin_page("https://h/a")
+        root.get_attribute("href")
+
+        previous = profiler.begin_page("https://h/b")
+
+        assert previous.url == "https://h/a" and previous.total_calls == 1
+        assert profiler.end_page() is None
+        assert "1 round trips" in previous.format()
+
+    def test_proxy_compares_equal_to_wrapped_element(self):
+        _, _, root = make_profiled_root()
+        assert root == root._target
+        assert root.id == "#root"
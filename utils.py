@@ -6,10 +6,14 @@ import json
 from pathlib import Path
 
 from dom_processing.dom_tree_builder.caching.interfaces import WebElementInterface
+from dom_processing.dom_tree_builder.caching.snapshot import SnapshotElement, format_selector, generate_snapshot_selector
 
 def generate_selector_from_webelement(web_element:WebElementInterface):
+    if isinstance(web_element, SnapshotElement):
+        # attributes were serialised with the snapshot: no round trip
+        return generate_snapshot_selector(web_element)
+
     tag = web_element.tag_name.lower()
-    selector_parts = [tag]
 
     driver = web_element.parent
     attrs = driver.execute_script(
@@ -23,22 +27,7 @@ def generate_selector_from_webelement(web_element:WebElementInterface):
         web_element
     )
 
-    # Classes
-    if 'class' in attrs and attrs['class'].strip():
-        classes = attrs['class'].split()
-        selector_parts.append(''.join(f'.{cls}' for cls in classes))
-        del attrs['class']
-
-    # ID
-    if 'id' in attrs:
-        selector_parts.append(f"#{attrs['id']}")
-        del attrs['id']
-
-    # Other attributes
-    for key, value in sorted(attrs.items()):
-        selector_parts.append(f'[{key}="{value}"]')
-
-    return ''.join(selector_parts)
+    return format_selector(tag, attrs)
 
 
 def get_direct_children_in_range(
@@ -81,6 +70,9 @@ def matches_css_selector(element: WebElementInterface, selector: str) -> bool:
     Handles complex selectors like: div.class1.class2#id[attr='value']
     """
     try:
+        if isinstance(element, SnapshotElement):
+            return element.matches(selector)
+
         # Use JavaScript to check if element matches the selector
         driver = element.parent
         result = driver.execute_script(